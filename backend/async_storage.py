@@ -0,0 +1,106 @@
+"""Awaitable Storage API that keeps SQLite work off the event loop."""
+
+import asyncio
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional, Union
+
+# Storage methods with these prefixes write and go through the single writer thread
+WRITE_PREFIXES = (
+    "add_", "update_", "save_", "delete_", "set_", "archive_", "reset_",
+    "create_", "end_", "track_", "export_", "claim_",
+)
+
+
+def is_write(name: str) -> bool:
+    return name.startswith(WRITE_PREFIXES)
+
+
+def _report_failure(name: str):
+    def report(future: Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"Background storage write {name} failed: {future.exception()}")
+    return report
+
+
+class AsyncStorage:
+    """
+    `await storage.get_conversation(id)` runs Storage.get_conversation in a
+    thread. Writes are serialized on one writer thread (SQLite allows one
+    writer anyway) so they apply in submission order; reads run on a small
+    reader pool and first wait for writes submitted before them, so a
+    caller always reads its own writes.
+
+    The target is looked up on every call, so patching backend.storage.storage
+    (as the tests do) is honoured.
+    """
+
+    def __init__(self, max_readers: int = 4):
+        self.max_readers = max_readers
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._readers: Optional[ThreadPoolExecutor] = None
+        self._last_write: Optional[Future] = None
+
+    def _executor(self, write: bool) -> ThreadPoolExecutor:
+        if write:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-writer")
+            return self._writer
+        if self._readers is None:
+            self._readers = ThreadPoolExecutor(max_workers=self.max_readers, thread_name_prefix="storage-reader")
+        return self._readers
+
+    @staticmethod
+    def _target():
+        from . import storage as storage_module
+        return storage_module.storage
+
+    def submit(self, method: Union[str, Callable[..., Any]], *args, **kwargs) -> Future:
+        """
+        Queue a write without waiting for it (for sync callbacks on the loop).
+        method is a Storage method name or a callable to run on the writer thread.
+        """
+        fn = getattr(self._target(), method) if isinstance(method, str) else method
+        future = self._executor(True).submit(fn, *args, **kwargs)
+        future.add_done_callback(_report_failure(getattr(fn, "__name__", str(method))))
+        self._last_write = future
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, write: bool = False, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the writer thread or the reader pool."""
+        loop = asyncio.get_running_loop()
+        if write:
+            future = self._executor(True).submit(fn, *args, **kwargs)
+            self._last_write = future
+            return await asyncio.wrap_future(future, loop=loop)
+
+        pending = self._last_write
+        # A write cancelled before it ran is done, but the writes queued ahead of it may not be
+        if pending is not None and (not pending.done() or pending.cancelled()):
+            # Read-your-writes: don't read past a write that is still queued
+            barrier = self._executor(True).submit(lambda: None)
+            if self._last_write is pending:
+                self._last_write = barrier
+            await asyncio.wrap_future(barrier, loop=loop)
+        return await loop.run_in_executor(self._executor(False), functools.partial(fn, *args, **kwargs))
+
+    async def call(self, name: str, *args, **kwargs) -> Any:
+        return await self.run(getattr(self._target(), name), *args, write=is_write(name), **kwargs)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return functools.partial(self.call, name)
+
+    def shutdown(self):
+        """Finish queued writes and stop the threads."""
+        for attr in ("_writer", "_readers"):
+            executor = getattr(self, attr)
+            if executor is not None:
+                executor.shutdown(wait=True)
+                setattr(self, attr, None)
+        self._last_write = None
+
+
+# Global instance
+storage = AsyncStorage()
@@ -2,60 +2,132 @@ import os
 import json
 import zipfile
 from datetime import datetime
-from .storage import storage
+from typing import Iterator, List
+from . import storage as storage_module
 
-def export_audit_archive(conversation_id: str, output_dir: str = "audits") -> str:
+# How audit payloads go into the archive
+RAW_MODES = (
+    "pretty",    # decoded and re-encoded with the rest of the entry, indented (the original layout)
+    "verbatim",  # the stored JSON text spliced in as is, no decode/re-encode
+    "none",      # left out
+)
+
+
+class _ChunkSink:
     """
-    Creates a ZIP archive for a conversation containing all logs and data.
+    Write-only stream for zipfile that keeps written bytes until drained.
+    It has no tell()/seek(), so zipfile writes entries with data descriptors
+    and never needs to go back, which is what makes streaming possible.
     """
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Get all relevant data
-    logs = storage.get_audit_logs(conversation_id)
-    session_state = storage.get_session_state(conversation_id)
-    messages = storage.get_messages(conversation_id)
-    
-    # Filename format: audit_CONVID_TIMESTAMP.zip
-    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
-    archive_name = f"audit_{conversation_id}_{timestamp_str}.zip"
-    archive_path = os.path.join(output_dir, archive_name)
-    
-    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+def log_entry_name(index: int, log: dict) -> str:
+    # Prefix with timestamp for chronological order
+    ts = log['timestamp'].replace(':', '-').replace('.', '-')
+    step = log['step']
+    model = (log['model_id'] or "unknown").split('/')[-1]
+    return f"logs/{ts}_{index:03d}_{step}_{model}.json"
+
+
+def log_entry(log: dict, raw: str) -> bytes:
+    entry = {
+        "timestamp": log['timestamp'],
+        "step": log['step'],
+        "task_id": log['task_id'],
+        "model": log['model_id'],
+        "message": log['log_message'],
+    }
+    metadata = json.loads(log['metadata']) if log['metadata'] else None
+    if raw == "pretty":
+        entry["raw_data"] = json.loads(log['raw_data']) if log['raw_data'] else None
+        entry["metadata"] = metadata
+        return json.dumps(entry, indent=2).encode("utf-8")
+
+    entry["metadata"] = metadata
+    encoded = json.dumps(entry)
+    if raw == "verbatim":
+        # raw_data is stored as JSON text already: splice it in instead of parsing it
+        encoded = encoded[:-1] + ', "raw_data": ' + (log['raw_data'] or "null") + "}"
+    return encoded.encode("utf-8")
+
+
+def iter_audit_archive(conversation_id: str, raw: str = "pretty", batch_size: int = 200) -> Iterator[bytes]:
+    """
+    The audit ZIP of a conversation as a stream of chunks, built while
+    audit logs and messages are read batch by batch, so memory stays at one
+    batch whatever the mission size. Blocking: iterate it in a thread
+    (StreamingResponse does that for sync iterators).
+    """
+    if raw not in RAW_MODES:
+        raise ValueError(f"Unknown raw mode '{raw}'. Use one of {list(RAW_MODES)}")
+    storage = storage_module.storage
+    sink = _ChunkSink()
+
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zipf:
         # 1. Export Audit Logs as individual files
-        for i, log in enumerate(logs):
-            # Prefix with timestamp for chronological order
-            ts = log['timestamp'].replace(':', '-').replace('.', '-')
-            step = log['step']
-            model = (log['model_id'] or "unknown").split('/')[-1]
-            filename = f"logs/{ts}_{i:03d}_{step}_{model}.json"
-            
-            # Prepare log content
-            log_content = {
-                "timestamp": log['timestamp'],
-                "step": log['step'],
-                "task_id": log['task_id'],
-                "model": log['model_id'],
-                "message": log['log_message'],
-                "raw_data": json.loads(log['raw_data']) if log['raw_data'] else None,
-                "metadata": json.loads(log['metadata']) if log['metadata'] else None
-            }
-            zipf.writestr(filename, json.dumps(log_content, indent=2))
-            
-        # 2. Export full conversation history
-        chat_history = []
-        for msg in messages:
-            chat_history.append({
-                "role": msg['role'],
-                "content": msg['content'],
-                "timestamp": msg['created_at']
-            })
-        zipf.writestr("conversation_history.json", json.dumps(chat_history, indent=2))
-        
+        for i, log in enumerate(storage.iter_audit_logs(conversation_id, batch_size=batch_size)):
+            zipf.writestr(log_entry_name(i, log), log_entry(log, raw))
+            if i % batch_size == batch_size - 1:
+                yield sink.drain()
+        yield sink.drain()
+
+        # 2. Export full conversation history, one page of messages at a time
+        with zipf.open("conversation_history.json", 'w', force_zip64=True) as history:
+            history.write(b"[")
+            after_id, first = None, True
+            while True:
+                page = storage.get_messages(conversation_id, after_id=after_id, limit=batch_size,
+                                            fields=["role", "content", "created_at"])
+                for msg in page:
+                    item = {"role": msg['role'], "content": msg['content'], "timestamp": msg['created_at']}
+                    history.write((b"" if first else b",") + b"\n  " + json.dumps(item).encode("utf-8"))
+                    first = False
+                if len(page) < batch_size:
+                    break
+                after_id = page[-1]["id"]
+                yield sink.drain()
+            history.write(b"\n]")
+        yield sink.drain()
+
         # 3. Export Session State (includes Analysis Result)
+        session_state = storage.get_session_state(conversation_id)
         zipf.writestr("session_state.json", json.dumps(session_state, indent=2))
-        
+
         # 4. Export Analysis Result specifically if it exists
         if session_state and "analysis_result" in session_state:
             zipf.writestr("ANALYSIS_RESULT.txt", session_state["analysis_result"])
-            
+
+    # Central directory, written on close
+    yield sink.drain()
+
+
+def archive_name(conversation_id: str) -> str:
+    # Filename format: audit_CONVID_TIMESTAMP.zip
+    timestamp_str = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return f"audit_{conversation_id}_{timestamp_str}.zip"
+
+
+def export_audit_archive(conversation_id: str, output_dir: str = "audits", raw: str = "pretty") -> str:
+    """
+    Creates a ZIP archive for a conversation containing all logs and data.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    archive_path = os.path.join(output_dir, archive_name(conversation_id))
+    with open(archive_path, 'wb') as f:
+        for chunk in iter_audit_archive(conversation_id, raw=raw):
+            f.write(chunk)
     return archive_path
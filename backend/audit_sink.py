@@ -0,0 +1,92 @@
+"""Buffered audit log writer: model responses are logged without waiting on SQLite."""
+
+import asyncio
+import threading
+from typing import Any, Dict, List
+
+from . import config
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["audit_log"], **(config.get_config().get("audit_log") or {})}
+
+
+class AuditSink:
+    """
+    add() only appends a serialized row to an in-memory buffer. The buffer
+    is written with one executemany transaction when it reaches batch_size
+    (on the storage writer thread), flush_interval seconds after the first
+    buffered entry, or when flush() is called: at the end of a mission, on
+    shutdown and by Storage.get_audit_logs, so reads see every entry added
+    before them.
+    """
+
+    def __init__(self):
+        self._buffer: List[tuple] = []
+        self._lock = threading.Lock()
+        # Held while a batch is taken and written, so batches land in order
+        self._write_lock = threading.Lock()
+        self._timer_armed = False
+        self.batches = 0
+        self.entries = 0
+
+    def add(self, conversation_id: str, step: str, task_id: str = None, model_id: str = None,
+            log_message: str = None, raw_data: Any = None, metadata: Dict = None):
+        """Same arguments as Storage.add_audit_log."""
+        from .storage import audit_row
+
+        row = audit_row(conversation_id, step, task_id, model_id, log_message, raw_data, metadata)
+        settings = get_settings()
+        with self._lock:
+            self._buffer.append(row)
+            full = len(self._buffer) >= int(settings["batch_size"])
+            arm_timer = not full and not self._timer_armed
+            if arm_timer:
+                self._timer_armed = True
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts, worker threads): nothing to keep responsive
+            self.flush()
+            return
+
+        if full:
+            self._flush_in_background()
+        elif arm_timer:
+            loop.call_later(float(settings["flush_interval"]), self._flush_in_background)
+
+    def _flush_in_background(self):
+        from . import async_storage
+        async_storage.storage.submit(self.flush)
+
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def flush(self):
+        """Write everything buffered so far (blocking; call off the event loop)."""
+        from .storage import storage
+
+        with self._write_lock:
+            with self._lock:
+                rows, self._buffer = self._buffer, []
+                self._timer_armed = False
+            if rows:
+                try:
+                    storage.add_audit_logs(rows)
+                except Exception:
+                    # Keep the entries for the next flush
+                    with self._lock:
+                        self._buffer[:0] = rows
+                    raise
+                self.batches += 1
+                self.entries += len(rows)
+
+    async def aflush(self):
+        """flush() on the storage writer thread."""
+        from . import async_storage
+        await async_storage.storage.run(self.flush, write=True)
+
+
+# Global instance
+audit_sink = AuditSink()
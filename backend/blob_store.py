@@ -0,0 +1,87 @@
+"""Compressed, content-addressed payloads for audit_logs.raw_data."""
+
+import hashlib
+import importlib.util
+import zlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from . import config
+
+ZLIB = "zlib"
+ZSTD = "zstd"
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["audit_blobs"], **(config.get_config().get("audit_blobs") or {})}
+
+
+def zstd_available() -> bool:
+    """zstd needs the optional 'zstandard' package."""
+    return importlib.util.find_spec("zstandard") is not None
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def compress(text: str, codec: Optional[str] = None, level: Optional[int] = None) -> Tuple[str, bytes]:
+    """(codec, compressed bytes); falls back to zlib when zstd is unavailable."""
+    settings = get_settings()
+    codec = codec or settings["codec"]
+    level = settings["level"] if level is None else level
+    raw = text.encode("utf-8")
+    if codec == ZSTD and zstd_available():
+        import zstandard
+        return ZSTD, zstandard.ZstdCompressor(level=level).compress(raw)
+    return ZLIB, zlib.compress(raw, min(int(level), 9))
+
+
+def decompress(codec: str, data: bytes) -> str:
+    if codec == ZSTD:
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def store(cursor, text: str) -> str:
+    """
+    Insert text into audit_blobs unless the same content is already there; returns its hash.
+    Call it inside the write transaction that inserts the row referring to the
+    hash, so a concurrent prune cannot remove the blob in between.
+    """
+    digest = content_hash(text)
+    if cursor.execute("SELECT 1 FROM audit_blobs WHERE hash = ?", (digest,)).fetchone() is None:
+        codec, data = compress(text)
+        cursor.execute(
+            "INSERT OR IGNORE INTO audit_blobs (hash, codec, size, stored_size, data) VALUES (?, ?, ?, ?, ?)",
+            (digest, codec, len(text.encode("utf-8")), len(data), data)
+        )
+    return digest
+
+
+def prune(cursor, hashes: Iterable[str]) -> int:
+    """Delete those of the given blobs that no audit log refers to any more; returns how many."""
+    hashes = list(set(hashes))
+    deleted = 0
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        deleted += cursor.execute(
+            f"""DELETE FROM audit_blobs WHERE hash IN ({placeholders})
+                AND NOT EXISTS (SELECT 1 FROM audit_logs WHERE audit_logs.raw_hash = audit_blobs.hash)""",
+            chunk
+        ).rowcount
+    return deleted
+
+
+def load(cursor, hashes: Iterable[str]) -> Dict[str, str]:
+    """Decompressed payloads for the given hashes."""
+    hashes = list(set(hashes))
+    found: Dict[str, str] = {}
+    # Stay below SQLite's bound-parameter limit
+    for start in range(0, len(hashes), 500):
+        chunk = hashes[start:start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for row in cursor.execute(f"SELECT hash, codec, data FROM audit_blobs WHERE hash IN ({placeholders})", chunk):
+            found[row[0]] = decompress(row[1], row[2])
+    return found
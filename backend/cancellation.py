@@ -0,0 +1,176 @@
+"""Cancelling a running mission: stop every model call it has in flight and account for what that saved."""
+
+import asyncio
+import contextvars
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from . import config
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["cancellation"], **(config.get_config().get("cancellation") or {})}
+
+
+class ModelCall:
+    """One request to a model made on behalf of a mission."""
+
+    def __init__(self, model: str, task: Optional[asyncio.Task], on_delta: Optional[Callable[[str], None]]):
+        self.model = model
+        self.task = task
+        self.started = time.monotonic()
+        self.streamed_chars = 0
+        self._on_delta = on_delta
+        # Counting wrapper for streamed calls; None keeps the call non-streaming
+        self.on_delta = self._count if on_delta else None
+
+    def _count(self, text: str):
+        self.streamed_chars += len(text)
+        self._on_delta(text)
+
+
+class Mission:
+    """
+    The model calls one mission has in flight, wherever they run: stage
+    gathers, hedges, substitutes and stragglers left running after a quorum
+    all inherit the mission through the context. cancel() takes the
+    inventory before anything is torn down, then cancels those calls and the
+    mission task.
+    """
+
+    def __init__(self, conversation_id: str, task: Optional[asyncio.Task]):
+        self.conversation_id = conversation_id
+        self.task = task
+        self.calls: List[ModelCall] = []
+        # completion tokens of the calls that finished, per model
+        self.completion_tokens: Dict[str, List[int]] = {}
+        self.report: Optional[Dict[str, Any]] = None
+
+    def call_started(self, model: str, on_delta: Optional[Callable[[str], None]] = None) -> ModelCall:
+        call = ModelCall(model, asyncio.current_task(), on_delta)
+        self.calls.append(call)
+        return call
+
+    def call_ended(self, call: ModelCall, response: Any):
+        if call in self.calls:
+            self.calls.remove(call)
+        if isinstance(response, dict):
+            tokens = (response.get("usage") or {}).get("completion_tokens")
+            if tokens:
+                self.completion_tokens.setdefault(call.model, []).append(int(tokens))
+
+    def expected_completion_tokens(self, model: str) -> int:
+        """What a call to model usually produces: its mean in this mission, else the mission mean, else the configured default."""
+        own = self.completion_tokens.get(model)
+        if own:
+            return round(sum(own) / len(own))
+        every = [t for tokens in self.completion_tokens.values() for t in tokens]
+        if every:
+            return round(sum(every) / len(every))
+        return int(get_settings()["default_completion_tokens"])
+
+    def cancel(self, reason: str) -> Dict[str, Any]:
+        """Cancel the mission (once) and return what was cancelled, with the estimated tokens saved."""
+        if self.report is not None:
+            return self.report
+        chars_per_token = float(get_settings()["chars_per_token"])
+        now = time.monotonic()
+        calls = []
+        for call in self.calls:
+            streamed = round(call.streamed_chars / chars_per_token)
+            calls.append({
+                "model": call.model,
+                "elapsed_seconds": round(now - call.started, 2),
+                "streamed_tokens": streamed,
+                "estimated_tokens_saved": max(0, self.expected_completion_tokens(call.model) - streamed),
+            })
+        self.report = {
+            "reason": reason,
+            "calls_cancelled": calls,
+            "estimated_tokens_saved": sum(c["estimated_tokens_saved"] for c in calls),
+        }
+        for call in list(self.calls):
+            if call.task is not None and call.task is not self.task:
+                call.task.cancel()
+        if self.task is not None:
+            self.task.cancel()
+        return self.report
+
+
+# The mission whose model calls the current task makes
+current_mission: contextvars.ContextVar[Optional[Mission]] = contextvars.ContextVar("current_mission", default=None)
+
+
+class MissionRegistry:
+    """
+    Running missions by conversation, so a disconnect or a cancel request can
+    reach them, and the conversations reserved for a mission that is about
+    to start.
+    """
+
+    def __init__(self):
+        self._missions: Dict[str, Mission] = {}
+        self._reserved: Set[str] = set()
+
+    def reserve(self, conversation_id: str) -> bool:
+        """
+        Claim the conversation for a new mission; False if it is already
+        reserved or has a mission running. Checked and claimed in one
+        synchronous step, so concurrent requests cannot both succeed.
+        """
+        if conversation_id in self._reserved or conversation_id in self._missions:
+            return False
+        self._reserved.add(conversation_id)
+        return True
+
+    def release(self, conversation_id: str):
+        self._reserved.discard(conversation_id)
+
+    def begin(self, conversation_id: str) -> Mission:
+        """Register a mission run by the current task; calls it makes from here on are tracked."""
+        mission = Mission(conversation_id, asyncio.current_task())
+        self._missions[conversation_id] = mission
+        current_mission.set(mission)
+        return mission
+
+    def end(self, mission: Mission):
+        if self._missions.get(mission.conversation_id) is mission:
+            del self._missions[mission.conversation_id]
+
+    def get(self, conversation_id: str) -> Optional[Mission]:
+        return self._missions.get(conversation_id)
+
+    def cancel(self, conversation_id: str, reason: str) -> Optional[Dict[str, Any]]:
+        """Cancel the conversation's running mission; None if there is none."""
+        mission = self._missions.get(conversation_id)
+        return mission.cancel(reason) if mission else None
+
+
+async def record_cancellation(mission: Mission, publish: Callable[[Dict[str, Any]], None]):
+    """Audit a cancelled mission, mark its session cancelled and tell the client."""
+    from . import async_storage
+    from .audit_sink import audit_sink
+    from .scheduler import DONE
+
+    conversation_id = mission.conversation_id
+    report = dict(mission.report)
+    state = await async_storage.storage.get_session_state(conversation_id)
+    if state:
+        report["unfinished_tasks"] = [key for key, status in (state.get("task_status") or {}).items() if status != DONE]
+        await async_storage.storage.update_session_delta(conversation_id, header={"status": "cancelled"})
+
+    audit_sink.add(
+        conversation_id,
+        step="mission_cancelled",
+        log_message=(
+            f"Mission cancelled ({report['reason']}): {len(report['calls_cancelled'])} model call(s) stopped, "
+            f"~{report['estimated_tokens_saved']} tokens saved."
+        ),
+        metadata=report
+    )
+    await audit_sink.aflush()
+    publish({"type": "cancelled", **report})
+
+
+# Global instance
+missions = MissionRegistry()
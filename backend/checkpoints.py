@@ -0,0 +1,75 @@
+"""Checkpoints of unfinished mission tasks, and recovery of the missions a restart interrupted."""
+
+from typing import Any, Dict, Optional
+
+from . import async_storage, config
+
+# The model column of the row that holds a whole stage's result
+STAGE = ""
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["checkpoints"], **(config.get_config().get("checkpoints") or {})}
+
+
+class TaskCheckpoint:
+    """
+    What one blueprint task has produced so far: each model's response per
+    stage, and the result of each finished stage. Saves are queued on the
+    storage writer as they happen; when the task runs again (after a restart
+    or a failure) the stages restore them instead of querying those models
+    again.
+    """
+
+    def __init__(self, conversation_id: str, task_key: str, saved: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.conversation_id = conversation_id
+        self.task_key = task_key
+        self.saved = saved or {}
+
+    @classmethod
+    async def load(cls, conversation_id: Optional[str], task_key: str) -> Optional["TaskCheckpoint"]:
+        """The task's checkpoint; None without a conversation or with checkpoints disabled."""
+        if not conversation_id or not get_settings()["enabled"]:
+            return None
+        return cls(conversation_id, task_key, await async_storage.storage.get_checkpoints(conversation_id, task_key))
+
+    def response(self, stage: str, model: str) -> Optional[Dict[str, Any]]:
+        return self.saved.get(stage, {}).get(model)
+
+    def stage_result(self, stage: str) -> Any:
+        return self.saved.get(stage, {}).get(STAGE)
+
+    def save_response(self, stage: str, model: str, response: Dict[str, Any]):
+        self._save(stage, model, response)
+
+    def save_stage(self, stage: str, result: Any):
+        self._save(stage, STAGE, result)
+
+    def _save(self, stage: str, model: str, result: Any):
+        self.saved.setdefault(stage, {})[model] = result
+        async_storage.storage.submit("save_checkpoint", self.conversation_id, self.task_key, stage, model, result)
+
+
+async def recover_interrupted_missions(queue) -> Dict[str, int]:
+    """
+    Find the missions a restart interrupted (their run never ended and
+    their session is still 'in_progress') and, per the on_startup setting,
+    resume each as a job of queue or mark it 'interrupted'. Missions whose job the queue requeued
+    resume with that job. Call after queue.start().
+    """
+    settings = get_settings()
+    counts = {"resumed": 0, "marked": 0}
+    for mission in await async_storage.storage.list_interrupted_missions():
+        conversation_id = mission["conversation_id"]
+        if queue.has_active_job(conversation_id):
+            continue
+        if settings["on_startup"] == "resume" and mission["unfinished_tasks"] and mission["user_query"]:
+            await queue.submit(conversation_id, mission["user_query"], resume=True)
+            counts["resumed"] += 1
+        else:
+            await async_storage.storage.update_session_delta(conversation_id, header={"status": "interrupted"})
+            await async_storage.storage.set_mission_running(conversation_id, False)
+            counts["marked"] += 1
+    if counts["resumed"] or counts["marked"]:
+        print(f"[MISSIONS] Interrupted missions: {counts['resumed']} resumed, {counts['marked']} marked interrupted")
+    return counts
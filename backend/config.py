@@ -25,7 +25,103 @@ DEFAULT_CONFIG = {
     "chairman_model": "z-ai/glm-4.5-air:free",
     "consensus_strategy": "borda",
     "response_timeout": 60,  # Default timeout in seconds
+    "stream_tokens": True,   # Forward token deltas (stage1_delta/stage3_delta) over SSE
     "substitute_models": {},
+    "model_catalog": {
+        "ttl_seconds": 3600                # How long the /models catalog and the skill index are reused
+    },
+    "scheduler": {
+        "max_parallel_tasks": 3            # Blueprint tasks without dependencies between them run concurrently up to this cap
+    },
+    "quorum": {
+        "enabled": False,                  # Close Stage 1/2 early once enough members answered
+        "min_responses": 3,                # k: successful answers needed (0 = all)
+        "grace_seconds": 10.0,             # G: extra wait for the rest after k answers
+        "late_policy": "cancel"            # "cancel" stragglers or "record" their late answers in the audit log
+    },
+    "hedging": {
+        "enabled": False,                  # Race the substitute model against a primary slower than usual
+        "percentile": 95,                  # Hedge after this percentile of the primary's recorded latency
+        "min_samples": 5,                  # Below this many samples, use unified_models.latency_ms instead
+        "default_delay_seconds": 15.0,     # Hedge delay when no latency is known at all
+        "min_delay_seconds": 2.0,          # Never hedge sooner than this
+        "max_extra_tokens": 50000          # Cap on estimated duplicate tokens per conversation (0 = no cap)
+    },
+    "response_cache": {
+        "mode": "off",                     # off | read_through | replay_only (per conversation/message overridable)
+        "max_bytes": 268435456,            # LRU-evict cached responses beyond 256 MB
+        "ttl_seconds": 604800              # Cached responses expire after 7 days (0 = never)
+    },
+    "single_flight": {
+        "enabled": True                    # Identical concurrent model requests share one upstream call
+    },
+    "retry": {
+        "base_delay": 0.5,                 # Seconds; decorrelated jitter grows from here
+        "max_delay": 20.0,                 # Upper bound for jittered backoff
+        "max_retry_after": 60.0            # Upper bound for server-requested waits (Retry-After / X-RateLimit-Reset)
+    },
+    "rate_limits": {
+        "enabled": True,                   # Queue model calls per (API key, model) instead of hitting 429s
+        "default": {"requests_per_minute": 0},       # 0 = unlimited until X-RateLimit-* headers teach us a limit
+        "free_models": {"requests_per_minute": 20},  # Applies to ':free' model ids
+        "models": {}                       # Per-model overrides: {"model/id": {"requests_per_minute": 60, "burst": 10}}
+    },
+    "key_pool": {
+        "rate_limited_seconds": 60.0,      # Bench a key after a 429 without Retry-After
+        "payment_required_seconds": 3600.0 # Bench a key after a 402 (out of credit) until re-checked or this elapses
+    },
+    "sqlite": {
+        "journal_mode": "WAL",             # Readers no longer block the writer
+        "synchronous": "NORMAL",           # Safe with WAL; fsync at checkpoints instead of every commit
+        "cache_size_kb": 16384,            # Page cache per connection
+        "mmap_size": 268435456,            # Bytes of the database file memory-mapped for reads
+        "busy_timeout_ms": 5000,           # Wait this long for a lock instead of failing with 'database is locked'
+        "statement_cache_size": 256,       # Prepared statements kept per pooled connection
+        "max_idle_connections": 8          # Pooled connections kept open
+    },
+    "audit_log": {
+        "batch_size": 50,                  # Buffered audit entries written per transaction
+        "flush_interval": 0.5              # Seconds an entry may wait in the buffer
+    },
+    "audit_blobs": {
+        "codec": "zlib",                   # 'zstd' needs the optional 'zstandard' package; falls back to zlib
+        "level": 6                         # Compression level
+    },
+    "search": {
+        "rank_window": 2000                # Newest matches per kind ranked by bm25 (bounds the cost of common terms)
+    },
+    "cancellation": {
+        "disconnect_poll_interval": 1.0,   # Seconds between checks whether a streaming client is still connected
+        "default_completion_tokens": 800,  # Expected output of a cancelled call before the mission has any to average
+        "chars_per_token": 4.0             # Converts streamed characters into tokens already generated
+    },
+    "jobs": {
+        "workers": 4,                      # Missions run in parallel by the background job queue
+        "poll_interval": 2.0,              # Seconds between checks for queued jobs when not woken by a submit
+        "max_attempts": 3                  # Starts before a job interrupted by a restart is failed instead of requeued
+    },
+    "checkpoints": {
+        "enabled": True,                   # Save each model response and stage result so a restarted mission only re-issues missing calls
+        "on_startup": "resume"             # Interrupted missions found at startup: "resume" (as a job) or "mark" them interrupted
+    },
+    "circuit_breaker": {
+        "enabled": True,                   # Fail fast on models that keep failing and use their substitute
+        "failure_threshold": 5,            # Consecutive failed calls before the breaker opens
+        "open_seconds": 30.0,              # Cool-down before a single probe call is allowed
+        "max_open_seconds": 300.0          # Cool-down doubles after each failed probe, up to this
+    },
+    "event_bus": {
+        "max_queued_events": 1000,         # Per-stream buffer; logs/deltas are dropped first when full
+        "heartbeat_interval": 15.0         # Seconds of silence before a heartbeat event is sent
+    },
+    "http_pool": {
+        "max_connections": 100,            # Total pooled connections
+        "max_keepalive_connections": 20,   # Idle connections kept warm
+        "keepalive_expiry": 30.0,          # Seconds an idle connection is kept
+        "max_connections_per_host": 20,    # Concurrent requests per host
+        "connect_timeout": 10.0,           # Seconds to establish a connection
+        "http2": True                      # Multiplex over HTTP/2 when 'h2' is installed
+    },
     "model_personalities": {
         "xiaomi/mimo-v2-flash:free": "Fast multimodal reasoning",
         "tngtech/deepseek-r1t2-chimera:free": "Deep analytical reasoning",
@@ -1,8 +1,17 @@
 """3-stage LLM Council orchestration."""
 
+import asyncio
+import copy
+import time
 from typing import List, Dict, Any, Tuple
-from .openrouter import query_models_parallel, query_model
-from . import config
+from .openrouter import query_models_parallel, query_model, query_model_streaming
+from .quorum import QuorumPolicy, QuorumOutcome, gather_with_quorum
+from .hedging import HedgePolicy
+from .scheduler import task_key, init_task_status, first_unfinished_index, run_blueprint
+from .audit_sink import audit_sink
+from .storage import SESSION_SPLIT_KEYS
+from .checkpoints import TaskCheckpoint
+from . import config, metrics, hedging, response_cache, resilience, async_storage, cancellation
 
 
 async def stage0_analyze_and_plan(user_query: str, log_callback=None, conversation_id: str = None) -> Dict[str, Any]:
@@ -67,11 +76,11 @@ Your output must be a JSON object. Do not include any introductory or concluding
     import json
     # Get specific key for the chairman model
     api_key = storage.get_key_for_model(chairman_model)
-    response = await query_model(chairman_model, messages, timeout=float(timeout), api_key=api_key)
+    response = await _query(chairman_model, messages, float(timeout), api_key=api_key)
     
     # Audit log for planning
     if conversation_id:
-        storage.add_audit_log(
+        audit_sink.add(
             conversation_id, 
             step="stage0_plan", 
             model_id=chairman_model, 
@@ -126,65 +135,152 @@ async def route_models_by_skills(required_skills: List[str], available_models: L
     Select models from available_models that best match the required_skills.
     If no models match perfectly, returns the original council_models.
     """
-    if not required_skills:
-        return available_models
-
-    from .models_service import models_service
-    metadata_list = await models_service.fetch_model_metadata()
-    metadata_map = {m['id']: m for m in metadata_list}
-
-    scored_models = []
-    for model_id in available_models:
-        meta = metadata_map.get(model_id, {})
-        description = meta.get('description', '').lower()
-        name = meta.get('name', '').lower()
-        tags = [t.lower() for t in meta.get('tags', [])]
-        
-        score = 0
-        for skill in required_skills:
-            skill = skill.lower()
-            if skill in description or skill in name or skill in tags:
-                score += 1
-            # Add specific capability checks
-            if skill == 'vision' and meta.get('capabilities', {}).get('vision'):
-                score += 2
-            if skill == 'reasoning' and meta.get('capabilities', {}).get('thinking'):
-                score += 2
-        
-        scored_models.append((model_id, score))
+    from .skill_router import skill_router
+    return await skill_router.route(required_skills, available_models)
 
-    # Sort by score descending
-    scored_models.sort(key=lambda x: x[1], reverse=True)
-    
-    # Return top matches (at least 3 if possible for consensus, or top 1 for specialist)
-    # For now, let's just return those with score > 0, or all if none scored.
-    matches = [m[0] for m in scored_models if m[1] > 0]
-    return matches if matches else available_models
 
+def streaming_enabled(event_callback=None) -> bool:
+    """Token streaming is used when someone listens for events and it is not disabled in config."""
+    return event_callback is not None and config.get_config().get("stream_tokens", True)
 
-async def query_with_substitute(model: str, messages: List[Dict[str, Any]], timeout: float, substitutes: Dict[str, str], log_callback=None) -> Any:
-    """Query a model and fall back to a substitute if it fails."""
-    if log_callback:
-        log_callback(f"Waiting for response from: {model.split('/')[-1]}...")
-        
+
+async def _query(model: str, messages: List[Dict[str, Any]], timeout: float, api_key: str = None, on_delta=None):
+    """
+    Query a model, streaming token deltas to on_delta when given. While it
+    runs, the call is part of the current mission, so cancelling the mission
+    stops it.
+    """
+    mission = cancellation.current_mission.get()
+    call = mission.call_started(model, on_delta) if mission else None
+    if call:
+        on_delta = call.on_delta
+    res = None
+    try:
+        if on_delta:
+            res = await query_model_streaming(model, messages, on_delta, timeout=timeout, api_key=api_key)
+        else:
+            res = await query_model(model, messages, timeout=timeout, api_key=api_key)
+        return res
+    finally:
+        if call:
+            mission.call_ended(call, res)
+
+
+async def _timed_query(model: str, messages: List[Dict[str, Any]], timeout: float, on_delta=None):
+    """Query a model with its own API key and record its response time on success."""
     from .storage import storage
-    
-    # Get specific key for the primary model
+
     api_key = storage.get_key_for_model(model)
-    res = await query_model(model, messages, timeout=timeout, api_key=api_key)
-    
-    if res is None and substitutes and model in substitutes:
-        sub = substitutes[model]
-        if sub and sub != model:
-            if log_callback:
-                log_callback(f"⚠️ Model {model.split('/')[-1]} failed. Switching to substitute {sub.split('/')[-1]}...")
-            
-            # Get specific key for the substitute model
-            sub_api_key = storage.get_key_for_model(sub)
-            res = await query_model(sub, messages, timeout=timeout, api_key=sub_api_key)
-            if res:
-                res["is_substitute"] = True
-                res["original_model"] = model
+    started = time.monotonic()
+    res = await _query(model, messages, timeout, api_key=api_key, on_delta=on_delta)
+    if res is not None:
+        metrics.model_latency.record(model, time.monotonic() - started)
+    return res
+
+
+def _stream_gate(on_delta):
+    """Let only the first racer that produces tokens stream them, so hedged deltas never interleave."""
+    owner = []
+
+    def forwarder(model: str):
+        if not on_delta:
+            return None
+
+        def forward(delta: str):
+            if not owner:
+                owner.append(model)
+            if owner[0] == model:
+                on_delta(delta)
+        return forward
+    return forwarder
+
+
+async def _hedged_query(model: str, sub: str, messages: List[Dict[str, Any]], timeout: float, policy: HedgePolicy,
+                        log_callback=None, on_delta=None, conversation_id: str = None) -> Tuple[Any, bool]:
+    """
+    Start the substitute if the primary is slower than usual and keep whichever answers first.
+    Returns the response and whether the substitute was already tried.
+    """
+    gate = _stream_gate(on_delta)
+    primary = asyncio.ensure_future(_timed_query(model, messages, timeout, on_delta=gate(model)))
+
+    try:
+        delay = await policy.delay_for(model)
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done or not hedging.ledger.allow(conversation_id, policy):
+            return await primary, False
+
+        hedging.ledger.fired += 1
+        if log_callback:
+            log_callback(f"⏱️ {model.split('/')[-1]} has not answered after {delay:.1f}s. Hedging with substitute {sub.split('/')[-1]}...")
+        secondary = asyncio.ensure_future(_timed_query(sub, messages, timeout, on_delta=gate(sub)))
+    except BaseException:
+        primary.cancel()
+        raise
+
+    racers = {primary: model, secondary: sub}
+    pending = set(racers)
+    winner = None
+    try:
+        while pending and winner is None:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if winner is None and task.result() is not None:
+                    winner = task
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if winner is None:
+        return None, True
+
+    res = winner.result()
+    # A loser cancelled mid-flight was billed for roughly what the winner used
+    extra_tokens = (res.get("usage") or {}).get("total_tokens", 0) if pending else 0
+    hedging.ledger.record(conversation_id, substitute_won=winner is secondary, extra_tokens=extra_tokens)
+    res["hedged"] = True
+    res["hedge_extra_tokens"] = extra_tokens
+    if winner is secondary:
+        res["is_substitute"] = True
+        res["original_model"] = model
+    if log_callback:
+        log_callback(f"Hedge for {model.split('/')[-1]} won by {racers[winner].split('/')[-1]}.")
+    return res, True
+
+
+async def query_with_substitute(model: str, messages: List[Dict[str, Any]], timeout: float, substitutes: Dict[str, str], log_callback=None, on_delta=None, conversation_id: str = None) -> Any:
+    """
+    Query a model and fall back to a substitute if it fails.
+    With hedging enabled, the substitute is raced against a slow primary instead of waiting for it to fail.
+    """
+    if log_callback:
+        log_callback(f"Waiting for response from: {model.split('/')[-1]}...")
+
+    sub = substitutes.get(model) if substitutes else None
+    if sub == model:
+        sub = None
+
+    policy = HedgePolicy.from_config()
+    substitute_tried = False
+    circuit_open = bool(sub) and resilience.breakers.is_open(model)
+    if circuit_open:
+        # The model has been failing; go straight to its substitute instead of waiting for another failure
+        res = None
+        if log_callback:
+            log_callback(f"⚡ {model.split('/')[-1]} is marked unhealthy (circuit open). Using substitute {sub.split('/')[-1]} directly...")
+    elif sub and policy.enabled:
+        res, substitute_tried = await _hedged_query(model, sub, messages, timeout, policy, log_callback, on_delta, conversation_id)
+    else:
+        res = await _timed_query(model, messages, timeout, on_delta=on_delta)
+
+    if res is None and sub and not substitute_tried:
+        if log_callback and not circuit_open:
+            log_callback(f"⚠️ Model {model.split('/')[-1]} failed. Switching to substitute {sub.split('/')[-1]}...")
+
+        res = await _timed_query(sub, messages, timeout, on_delta=on_delta)
+        if res:
+            res["is_substitute"] = True
+            res["original_model"] = model
 
     if log_callback:
         if res:
@@ -194,11 +290,121 @@ async def query_with_substitute(model: str, messages: List[Dict[str, Any]], time
     return res
 
 
-async def stage1_collect_responses(user_query: str, log_callback=None, instruction=None, target_models=None, human_feedback=None, conversation_id: str = None, task_id: str = None) -> List[Dict[str, Any]]:
+def _late_response_recorder(stage: str, models: List[str], conversation_id: str = None, task_id: str = None):
+    """Build the callback that audits answers arriving after a stage's quorum closed."""
+    if not conversation_id:
+        return None
+
+    def record(index: int, response: Any, elapsed: float):
+        model = models[index]
+        audit_sink.add(
+            conversation_id,
+            step=f"{stage}_late",
+            task_id=task_id,
+            model_id=model,
+            log_message=f"Model {model.split('/')[-1]} answered {elapsed:.1f}s after {stage} started, after the quorum closed. Response not used.",
+            raw_data=response,
+            metadata={"elapsed_seconds": elapsed}
+        )
+    return record
+
+
+def _record_stage_latency(stage: str, outcome: QuorumOutcome, policy: QuorumPolicy, models: List[str],
+                          conversation_id: str = None, task_id: str = None, log_callback=None):
+    """Record how long a stage took and which models were left behind by the quorum."""
+    metrics.stage_latency.record(stage, outcome.elapsed)
+    late_models = [models[i] for i in outcome.late]
+    responded = sum(1 for r in outcome.results if r is not None)
+
+    if late_models and log_callback:
+        action = "cancelled" if policy.late_policy == "cancel" else "left running"
+        log_callback(
+            f"Quorum reached for {stage}: continuing with {responded}/{len(models)} responses, "
+            f"{len(late_models)} straggler(s) {action}: {[m.split('/')[-1] for m in late_models]}"
+        )
+
+    if conversation_id:
+        audit_sink.add(
+            conversation_id,
+            step=f"{stage}_latency",
+            task_id=task_id,
+            log_message=f"{stage} finished in {outcome.elapsed:.2f}s with {responded}/{len(models)} responses.",
+            metadata={
+                "elapsed_seconds": outcome.elapsed,
+                "quorum_elapsed_seconds": outcome.quorum_elapsed,
+                "responded": responded,
+                "total": len(models),
+                "late_models": late_models,
+                "policy": policy.as_dict()
+            }
+        )
+
+
+async def _restored(response: Dict[str, Any]) -> Dict[str, Any]:
+    """A checkpointed response, in place of the call that produced it."""
+    return response
+
+
+async def _checkpointed(call, checkpoint: TaskCheckpoint, stage: str, model: str, on_arrival=None) -> Any:
+    """
+    Await a model call and checkpoint its response as soon as it arrives.
+    on_arrival(model, response) audits it at the same time, so a response
+    restored later has already been audited.
+    """
+    response = await call
+    if on_arrival:
+        on_arrival(model, response)
+    if response is not None:
+        checkpoint.save_response(stage, model, response)
+    return response
+
+
+def _arrival_auditor(step: str, describe, conversation_id: str = None, task_id: str = None):
+    """
+    Build the on_arrival callback for _checkpointed: audits each response as
+    it arrives, until close() is called when the stage's quorum closed
+    (stragglers are audited by _late_response_recorder).
+    """
+    is_open = True
+
+    def audit(model: str, response: Any):
+        if conversation_id and is_open:
+            audit_sink.add(
+                conversation_id,
+                step=step,
+                task_id=task_id,
+                model_id=model,
+                log_message=describe(model),
+                raw_data=response
+            )
+
+    def close():
+        nonlocal is_open
+        is_open = False
+
+    audit.close = close
+    return audit
+
+
+def _delta_forwarder(event_callback, event_type: str, model: str, task_id: str = None):
+    """Build an on_delta callback that forwards token deltas as stage events."""
+    def on_delta(text: str):
+        event_callback({"type": event_type, "model": model, "task_id": task_id, "delta": text})
+    return on_delta
+
+
+async def stage1_collect_responses(user_query: str, log_callback=None, instruction=None, target_models=None, human_feedback=None, conversation_id: str = None, task_id: str = None, event_callback=None, checkpoint: TaskCheckpoint = None) -> List[Dict[str, Any]]:
     """
     Stage 1: Collect individual responses from all council models or specific target models.
+    If event_callback is given, token deltas are forwarded as 'stage1_delta' events.
+    With a checkpoint, each response and the stage result are saved as they
+    arrive, and whatever an earlier run saved is restored instead of queried.
     """
-    from .storage import storage
+    if checkpoint and checkpoint.stage_result("stage1") is not None:
+        if log_callback:
+            log_callback("Stage 1 restored from checkpoint.")
+        return checkpoint.stage_result("stage1")
+
     current_config = config.get_config()
     council_models = target_models if target_models else current_config["council_models"]
     personalities = current_config.get("model_personalities", {})
@@ -207,7 +413,19 @@ async def stage1_collect_responses(user_query: str, log_callback=None, instructi
 
     # Create tasks for all models
     tasks = []
+    # Restored responses were audited when they first arrived
+    restored = 0
+    audit_arrival = _arrival_auditor(
+        "stage1_query", lambda model: f"Model {model.split('/')[-1]} provided an individual response.",
+        conversation_id, task_id
+    )
     for model in council_models:
+        saved = checkpoint.response("stage1", model) if checkpoint else None
+        if saved is not None:
+            tasks.append(_restored(saved))
+            restored += 1
+            continue
+
         # ToBeDeleted_start
         # personality = personalities.get(model, "Expert AI Assistant")
         # ToBeDeleted_end
@@ -233,19 +451,42 @@ async def stage1_collect_responses(user_query: str, log_callback=None, instructi
             {"role": "user", "content": user_query}
         ]
         
-        tasks.append(query_with_substitute(model, messages, float(timeout), substitutes, log_callback))
-
-    # Query all models in parallel
-    import asyncio
-    responses_list = await asyncio.gather(*tasks)
-    responses = {model: resp for model, resp in zip(council_models, responses_list)}
+        on_delta = None
+        if streaming_enabled(event_callback):
+            on_delta = _delta_forwarder(event_callback, "stage1_delta", model, task_id)
+
+        call = query_with_substitute(model, messages, float(timeout), substitutes, log_callback, on_delta=on_delta, conversation_id=conversation_id)
+        tasks.append(_checkpointed(call, checkpoint, "stage1", model, audit_arrival) if checkpoint else call)
+
+    if restored and log_callback:
+        log_callback(f"Resuming Stage 1: {restored} response(s) restored from checkpoint, {len(council_models) - restored} to query.")
+
+    # Query all models in parallel, closing the stage once the quorum is met
+    policy = QuorumPolicy.from_config("stage1")
+    outcome = await gather_with_quorum(
+        tasks, policy,
+        on_late_result=_late_response_recorder("stage1", council_models, conversation_id, task_id)
+    )
+    audit_arrival.close()
+    responses_list = outcome.results
+    _record_stage_latency("stage1", outcome, policy, council_models, conversation_id, task_id, log_callback)
 
     # Format results
     stage1_results = []
-    for model, response in zip(council_models, responses_list):
-        # Audit log for each individual response
-        if conversation_id:
-            storage.add_audit_log(
+    for i, (model, response) in enumerate(zip(council_models, responses_list)):
+        if i in outcome.late:
+            stage1_results.append({
+                "model": model,
+                "response": "Error: This model did not respond before the council quorum was reached.",
+                "usage": {"total_tokens": 0},
+                "error": True,
+                "late": True
+            })
+            continue
+
+        # Audit log for each individual response (checkpointed ones were audited as they arrived)
+        if conversation_id and not checkpoint:
+            audit_sink.add(
                 conversation_id,
                 step="stage1_query",
                 task_id=task_id,
@@ -254,11 +495,15 @@ async def stage1_collect_responses(user_query: str, log_callback=None, instructi
                 raw_data=response
             )
         if response is not None:
-            stage1_results.append({
+            result = {
                 "model": model,
                 "response": response.get('content', ''),
                 "usage": response.get('usage', {})
-            })
+            }
+            for tag in ("is_substitute", "hedged"):
+                if response.get(tag):
+                    result[tag] = True
+            stage1_results.append(result)
         else:
             # Include a placeholder for failed models so they don't just disappear
             stage1_results.append({
@@ -268,6 +513,8 @@ async def stage1_collect_responses(user_query: str, log_callback=None, instructi
                 "error": True
             })
 
+    if checkpoint:
+        checkpoint.save_stage("stage1", stage1_results)
     return stage1_results
 
 
@@ -276,7 +523,8 @@ async def stage2_collect_rankings(
     stage1_results: List[Dict[str, Any]],
     log_callback=None,
     conversation_id: str = None,
-    task_id: str = None
+    task_id: str = None,
+    checkpoint: TaskCheckpoint = None
 ) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
     """
     Stage 2: Each model ranks the anonymized responses.
@@ -287,10 +535,18 @@ async def stage2_collect_rankings(
         log_callback: Optional callback for logging events
         conversation_id: Optional conversation ID for auditing
         task_id: Optional task ID for auditing
+        checkpoint: Optional checkpoint of the task; rankings saved by an
+            earlier run are restored instead of queried
 
     Returns:
         Tuple of (rankings list, label_to_model mapping)
     """
+    saved_stage = checkpoint.stage_result("stage2") if checkpoint else None
+    if saved_stage is not None:
+        if log_callback:
+            log_callback("Stage 2 restored from checkpoint.")
+        return saved_stage["results"], saved_stage["label_to_model"]
+
     # Create anonymized labels for responses (Response A, Response B, etc.)
     labels = [chr(65 + i) for i in range(len(stage1_results))]  # A, B, C, ...
 
@@ -332,26 +588,49 @@ Ranking: Response B > Response A > Response C
 
     # Create tasks for ranking
     tasks = []
+    # Restored responses were audited when they first arrived
+    restored = 0
+    audit_arrival = _arrival_auditor(
+        "stage2_ranking", lambda model: f"Judge {model.split('/')[-1]} provided peer evaluations and rankings.",
+        conversation_id, task_id
+    )
     for model in council_models:
+        saved = checkpoint.response("stage2", model) if checkpoint else None
+        if saved is not None:
+            tasks.append(_restored(saved))
+            restored += 1
+            continue
+
         messages = [
             {"role": "system", "content": "You are a critical judge evaluating multiple AI responses."},
             {"role": "user", "content": ranking_prompt}
         ]
         
-        tasks.append(query_with_substitute(model, messages, float(timeout), substitutes, log_callback))
-
-    # Query all models in parallel
-    import asyncio
-    responses_list = await asyncio.gather(*tasks)
-    responses = {model: resp for model, resp in zip(council_models, responses_list)}
+        call = query_with_substitute(model, messages, float(timeout), substitutes, log_callback, conversation_id=conversation_id)
+        tasks.append(_checkpointed(call, checkpoint, "stage2", model, audit_arrival) if checkpoint else call)
+
+    if restored and log_callback:
+        log_callback(f"Resuming Stage 2: {restored} ranking(s) restored from checkpoint, {len(council_models) - restored} to query.")
+
+    # Query all models in parallel, closing the stage once the quorum is met
+    policy = QuorumPolicy.from_config("stage2")
+    outcome = await gather_with_quorum(
+        tasks, policy,
+        on_late_result=_late_response_recorder("stage2", council_models, conversation_id, task_id)
+    )
+    audit_arrival.close()
+    responses_list = outcome.results
+    _record_stage_latency("stage2", outcome, policy, council_models, conversation_id, task_id, log_callback)
 
     # Format results
     stage2_results = []
-    from .storage import storage
-    for model, response in zip(council_models, responses_list):
-        # Audit log for each ranking
-        if conversation_id:
-            storage.add_audit_log(
+    for i, (model, response) in enumerate(zip(council_models, responses_list)):
+        if i in outcome.late:
+            continue
+
+        # Audit log for each ranking (checkpointed ones were audited as they arrived)
+        if conversation_id and not checkpoint:
+            audit_sink.add(
                 conversation_id,
                 step="stage2_ranking",
                 task_id=task_id,
@@ -369,6 +648,8 @@ Ranking: Response B > Response A > Response C
                 "parsed_ranking": parsed
             })
 
+    if checkpoint:
+        checkpoint.save_stage("stage2", {"results": stage2_results, "label_to_model": label_to_model})
     return stage2_results, label_to_model
 
 
@@ -380,11 +661,15 @@ async def stage3_synthesize_final(
     log_callback=None,
     human_feedback=None,
     conversation_id: str = None,
-    task_id: str = None
+    task_id: str = None,
+    event_callback=None,
+    checkpoint: TaskCheckpoint = None
 ) -> Dict[str, Any]:
     """
     Stage 3: A chairman model synthesizes all responses and rankings.
     Can decide to continue the consensus loop if necessary.
+    If event_callback is given, token deltas are forwarded as 'stage3_delta' events.
+    With a checkpoint, a chairman decision saved by an earlier run is reused.
     """
     current_config = config.get_config()
     chairman_model = current_config.get("chairman_model")
@@ -455,12 +740,20 @@ Your output must be a JSON object:
     ]
 
     import json
-    response = await query_with_substitute(chairman_model, messages, float(timeout), substitutes, log_callback)
+    on_delta = None
+    if streaming_enabled(event_callback):
+        on_delta = _delta_forwarder(event_callback, "stage3_delta", chairman_model, task_id)
+    saved = checkpoint.response("stage3", chairman_model) if checkpoint else None
+    if saved is not None:
+        if log_callback:
+            log_callback("Chairman decision restored from checkpoint.")
+        response = saved
+    else:
+        response = await query_with_substitute(chairman_model, messages, float(timeout), substitutes, log_callback, on_delta=on_delta, conversation_id=conversation_id)
     
-    # Audit log for synthesis
-    if conversation_id:
-        from .storage import storage
-        storage.add_audit_log(
+    # Audit log for synthesis (a restored decision was audited when it arrived)
+    if conversation_id and saved is None:
+        audit_sink.add(
             conversation_id,
             step="stage3_synthesis",
             task_id=task_id,
@@ -481,6 +774,9 @@ Your output must be a JSON object:
             raw_content = raw_content.split("```")[1].split("```")[0].strip()
         
         decision = json.loads(raw_content, strict=False)
+        # Only a decision that parses is worth restoring
+        if checkpoint and saved is None:
+            checkpoint.save_response("stage3", chairman_model, response)
         
         if log_callback:
             # ToBeDeleted_start
@@ -645,18 +941,226 @@ Title:"""
     return title
 
 
-async def run_full_council(user_query: str, conversation_id: str = None, log_callback=None) -> Tuple[List, List, Dict, Dict]:
+async def execute_blueprint_task(
+    task: Dict[str, Any],
+    idx: int,
+    user_query: str,
+    session_state: Dict[str, Any],
+    conversation_id: str = None,
+    log_callback=None,
+    event_callback=None
+) -> Tuple[List, List, Dict, Dict]:
+    """Run a single Mission Blueprint task and return its stage 1/2/3 results and metadata."""
+    def emit(event: Dict[str, Any]):
+        if event_callback:
+            event_callback(event)
+
+    current_config = config.get_config()
+    all_council_models = current_config["council_models"]
+
+    last_stage1 = []
+    last_stage2 = []
+    last_stage3 = {}
+    last_metadata = {}
+
+    if log_callback:
+        # ToBeDeleted_start
+        # log_callback(f"🚀 Executing Task {idx+1}/{len(tasks)}: {task.get('label')}")
+        # ToBeDeleted_end
+        task_label = task.get('label', f'Task {idx+1}')
+        log_callback(f"🚀 Executing {task_label}...")
+        log_callback(f"Context: {task.get('description', 'No description provided.')}")
+
+    # Skill-based routing
+    required_skills = task.get("required_skills", [])
+    target_models = await route_models_by_skills(required_skills, all_council_models)
+    
+    if log_callback:
+        log_callback(f"Selected experts: {[m.split('/')[-1] for m in target_models]}")
+
+    # What an interrupted or failed earlier run of this task already produced
+    checkpoint = await TaskCheckpoint.load(conversation_id, task_key(task, idx))
+
+    # Execute task based on type
+    task_type = task.get("type")
+    if not task_type:
+        raise ValueError(f"Task {idx+1} is missing a 'type' field.")
+    
+    if task_type == "COUNCIL_CONSENSUS":
+        # Run Stage 1: Collect responses
+        emit({"type": "stage1_start", "task_id": task.get("id")})
+        stage1_results = await stage1_collect_responses(
+            user_query, 
+            log_callback=log_callback, 
+            instruction=task.get("description"),
+            target_models=target_models,
+            human_feedback=session_state.get("human_feedback"),
+            conversation_id=conversation_id,
+            task_id=task.get("id"),
+            event_callback=event_callback,
+            checkpoint=checkpoint
+        )
+        last_stage1 = stage1_results
+        emit({"type": "stage1_complete", "data": stage1_results, "task_id": task.get("id")})
+
+        # Run Stage 2: Collect rankings
+        emit({"type": "stage2_start", "task_id": task.get("id")})
+        stage2_results, label_to_model = await stage2_collect_rankings(
+            user_query, 
+            stage1_results,
+            log_callback=log_callback,
+            conversation_id=conversation_id,
+            task_id=task.get("id"),
+            checkpoint=checkpoint
+        )
+        last_stage2 = stage2_results
+        
+        consensus_strategy = current_config.get("consensus_strategy")
+        if not consensus_strategy:
+            raise ValueError("Consensus strategy not configured in settings.")
+
+        # Calculate aggregate rankings
+        aggregate_rankings = calculate_aggregate_rankings(
+            stage2_results,
+            label_to_model,
+            consensus_strategy
+        )
+        last_metadata = {
+            "label_to_model": label_to_model,
+            "aggregate_rankings": aggregate_rankings,
+            "task_id": task.get("id")
+        }
+        emit({"type": "stage2_complete", "data": stage2_results, "metadata": last_metadata, "task_id": task.get("id")})
+
+        # Run Stage 3: Synthesize
+        emit({"type": "stage3_start", "task_id": task.get("id")})
+        stage3_result = await stage3_synthesize_final(
+            user_query,
+            stage1_results,
+            stage2_results,
+            plan={"current_goal": task.get("description")},
+            log_callback=log_callback,
+            human_feedback=session_state.get("human_feedback"),
+            conversation_id=conversation_id,
+            task_id=task.get("id"),
+            event_callback=event_callback,
+            checkpoint=checkpoint
+        )
+        last_stage3 = stage3_result
+        emit({"type": "stage3_complete", "data": stage3_result, "task_id": task.get("id")})
+        
+    elif task_type == "SINGLE_SPECIALIST":
+        # Run only Stage 1 with the top expert
+        specialist = [target_models[0]]
+        emit({"type": "stage1_start", "task_id": task.get("id")})
+        stage1_results = await stage1_collect_responses(
+            user_query, 
+            log_callback=log_callback, 
+            instruction=task.get("description"),
+            target_models=specialist,
+            human_feedback=session_state.get("human_feedback"),
+            conversation_id=conversation_id,
+            task_id=task.get("id"),
+            event_callback=event_callback,
+            checkpoint=checkpoint
+        )
+        last_stage1 = stage1_results
+        # ToBeDeleted_start
+        # last_stage3 = {
+        #     "action": "FINAL_ANSWER",
+        #     "response": stage1_results[0].get("response", ""),
+        #     "reasoning": f"Specialist {specialist[0].split('/')[-1]} completed the task."
+        # }
+        # ToBeDeleted_end
+        
+        response_content = stage1_results[0].get("response") if stage1_results else None
+        if not response_content:
+            response_content = "Error: Specialist failed to provide a response."
+            
+        last_stage3 = {
+            "action": "FINAL_ANSWER",
+            "response": response_content,
+            "reasoning": f"Specialist {specialist[0].split('/')[-1]} completed the task."
+        }
+        last_metadata = {"task_id": task.get("id"), "specialist": specialist[0]}
+        emit({"type": "stage1_complete", "data": stage1_results, "task_id": task.get("id")})
+        emit({"type": "stage3_complete", "data": last_stage3, "task_id": task.get("id")})
+
+    return last_stage1, last_stage2, last_stage3, last_metadata
+
+
+async def run_full_council(user_query: str, conversation_id: str = None, log_callback=None, event_callback=None, cache_mode: str = None, resume: bool = False) -> Tuple[List, List, Dict, Dict]:
     """
     Run the complete council process based on the Mission Blueprint.
+    event_callback receives structured events (stage results, session state,
+    token deltas) as soon as they are available. cache_mode overrides the
+    conversation's response cache mode for this run.
+
+    Unfinished tasks of an existing mission continue from their checkpoints.
+    resume=True re-runs an interrupted mission with the user message that
+    started it, so that message is never taken as a reset request.
+
+    While it runs, the mission is recorded in mission_runs. The record is
+    removed when the run returns or fails (a failed mission gets status
+    'failed'); only a cancelled run leaves it, so a mission stopped by a
+    restart is found by checkpoints.recover_interrupted_missions.
     """
-    from .storage import storage
+    if not conversation_id:
+        return await _run_council(user_query, None, log_callback, event_callback, cache_mode, resume)
+
+    await async_storage.storage.set_mission_running(conversation_id, True)
+    try:
+        result = await _run_council(user_query, conversation_id, log_callback, event_callback, cache_mode, resume)
+    except Exception:
+        state = await async_storage.storage.get_session_state(conversation_id)
+        if state and state.get("status") == "in_progress":
+            await async_storage.storage.update_session_delta(conversation_id, header={"status": "failed"})
+        await async_storage.storage.set_mission_running(conversation_id, False)
+        raise
+    await async_storage.storage.set_mission_running(conversation_id, False)
+    return result
+
+
+async def _run_council(user_query: str, conversation_id: str, log_callback, event_callback,
+                       cache_mode: str, resume: bool) -> Tuple[List, List, Dict, Dict]:
+    """The body of run_full_council."""
+    # Every model call made below (including in child tasks) sees this mode
+    mode = cache_mode or ((await async_storage.storage.get_cache_mode(conversation_id)) if conversation_id else None)
+    if mode:
+        response_cache.conversation_mode.set(mode)
+
+    def emit(event: Dict[str, Any]):
+        if event_callback:
+            event_callback(event)
+
+    def save_session_state():
+        """Write the whole state: a new or reset mission."""
+        if conversation_id:
+            # Called from sync scheduler hooks: queue the write on the writer thread
+            async_storage.storage.submit("update_session_state", conversation_id, copy.deepcopy(session_state))
+            saved_status.clear()
+            saved_status.update(session_state.get("task_status") or {})
+        emit({"type": "session_state", "data": session_state})
+
+    def save_session_delta(tasks: Dict[str, Dict[str, Any]] = None):
+        """Write the (small) header and the given task rows; the blueprint and other tasks are untouched."""
+        if conversation_id:
+            header = {k: v for k, v in session_state.items() if k not in SESSION_SPLIT_KEYS}
+            async_storage.storage.submit("update_session_delta", conversation_id, copy.deepcopy(header), tasks)
+        emit({"type": "session_state", "data": session_state})
     
     # Try to load existing session state
-    session_state = storage.get_session_state(conversation_id) if conversation_id else None
+    session_state = await async_storage.storage.get_session_state(conversation_id) if conversation_id else None
+    # Task statuses as stored, so progress updates only write the ones that changed
+    saved_status: Dict[str, str] = dict((session_state or {}).get("task_status") or {})
     
     # Heuristic for reset - improved slightly
-    is_reset = any(word in user_query.lower() for word in ["reset", "neustart", "verwerfen"]) and \
+    is_reset = not resume and \
+               any(word in user_query.lower() for word in ["reset", "neustart", "verwerfen"]) and \
                any(word in user_query.lower() for word in ["mission", "blueprint", "projekt", "plan"])
+
+    if resume and session_state and log_callback:
+        log_callback("Resuming the interrupted mission from its last checkpoint...")
     
     # Handle paused state (Breakpoint)
     if session_state and session_state.get("status") == "paused" and not is_reset:
@@ -671,8 +1175,11 @@ async def run_full_council(user_query: str, conversation_id: str = None, log_cal
             session_state["human_feedback"] = session_state.get("human_feedback", "") + "\nHuman Chair Feedback: " + user_query
         
         session_state["status"] = "in_progress"
-        if conversation_id:
-            storage.update_session_state(conversation_id, session_state)
+        save_session_delta()
+    elif session_state and not is_reset and session_state.get("status") in ("failed", "interrupted", "cancelled"):
+        # Continuing a mission that stopped early
+        session_state["status"] = "in_progress"
+        save_session_delta()
 
     if not session_state or is_reset:
         # Stage 0: Analysis & Planning
@@ -709,155 +1216,82 @@ async def run_full_council(user_query: str, conversation_id: str = None, log_cal
             "results": {},
             "status": "in_progress"
         }
-        if conversation_id:
-            storage.update_session_state(conversation_id, session_state)
+        save_session_state()
     
     blueprint = session_state.get("blueprint", {"tasks": []})
     tasks = blueprint.get("tasks", [])
-    
-    current_config = config.get_config()
-    all_council_models = current_config["council_models"]
-    
-    last_stage1 = []
-    last_stage2 = []
-    last_stage3 = {}
-    last_metadata = {}
+    task_status = init_task_status(session_state)
 
-    while session_state["current_task_index"] < len(tasks):
-        idx = session_state["current_task_index"]
-        task = tasks[idx]
-        
-        if log_callback:
-            # ToBeDeleted_start
-            # log_callback(f"🚀 Executing Task {idx+1}/{len(tasks)}: {task.get('label')}")
-            # ToBeDeleted_end
-            task_label = task.get('label', f'Task {idx+1}')
-            log_callback(f"🚀 Executing {task_label}...")
-            log_callback(f"Context: {task.get('description', 'No description provided.')}")
+    current_config = config.get_config()
+    max_parallel = (current_config.get("scheduler") or {}).get(
+        "max_parallel_tasks", config.DEFAULT_CONFIG["scheduler"]["max_parallel_tasks"]
+    )
 
-        # Skill-based routing
-        required_skills = task.get("required_skills", [])
-        target_models = await route_models_by_skills(required_skills, all_council_models)
-        
-        if log_callback:
-            log_callback(f"Selected experts: {[m.split('/')[-1] for m in target_models]}")
+    # Results of the latest blueprint task finished in this run (by blueprint order)
+    last = {"index": -1, "results": ([], [], {}, {})}
 
-        # Execute task based on type
-        task_type = task.get("type")
-        if not task_type:
-            raise ValueError(f"Task {idx+1} is missing a 'type' field.")
-        
-        if task_type == "COUNCIL_CONSENSUS":
-            # Run Stage 1: Collect responses
-            stage1_results = await stage1_collect_responses(
-                user_query, 
-                log_callback=log_callback, 
-                instruction=task.get("description"),
-                target_models=target_models,
-                human_feedback=session_state.get("human_feedback"),
-                conversation_id=conversation_id,
-                task_id=task.get("id")
-            )
-            last_stage1 = stage1_results
-
-            # Run Stage 2: Collect rankings
-            stage2_results, label_to_model = await stage2_collect_rankings(
-                user_query, 
-                stage1_results,
-                log_callback=log_callback,
-                conversation_id=conversation_id,
-                task_id=task.get("id")
-            )
-            last_stage2 = stage2_results
-            
-            consensus_strategy = current_config.get("consensus_strategy")
-            if not consensus_strategy:
-                raise ValueError("Consensus strategy not configured in settings.")
-
-            # Calculate aggregate rankings
-            aggregate_rankings = calculate_aggregate_rankings(
-                stage2_results,
-                label_to_model,
-                consensus_strategy
-            )
-            last_metadata = {
-                "label_to_model": label_to_model,
-                "aggregate_rankings": aggregate_rankings,
-                "task_id": task.get("id")
+    async def run_task(idx: int):
+        task = tasks[idx]
+        results = await execute_blueprint_task(
+            task, idx, user_query, session_state,
+            conversation_id=conversation_id,
+            log_callback=log_callback,
+            event_callback=event_callback
+        )
+        # Save result for this task in session state
+        key = task_key(task, idx)
+        session_state["results"][key] = results[2].get("response")
+        if conversation_id:
+            # Its own row plus an append-only snapshot of the node (prompt, models, result)
+            snapshot = {
+                "task_key": key,
+                "task": task,
+                "models": [r.get("model") for r in results[0]],
+                "chairman": results[2].get("model"),
+                "result": results[2].get("response"),
+                "human_feedback": session_state.get("human_feedback"),
             }
-
-            # Run Stage 3: Synthesize
-            stage3_result = await stage3_synthesize_final(
-                user_query,
-                stage1_results,
-                stage2_results,
-                plan={"current_goal": task.get("description")},
-                log_callback=log_callback,
-                human_feedback=session_state.get("human_feedback"),
-                conversation_id=conversation_id,
-                task_id=task.get("id")
+            async_storage.storage.submit(
+                "update_session_delta", conversation_id, None, {key: {"result": snapshot["result"]}}, copy.deepcopy(snapshot)
             )
-            last_stage3 = stage3_result
-            
-        elif task_type == "SINGLE_SPECIALIST":
-            # Run only Stage 1 with the top expert
-            specialist = [target_models[0]]
-            stage1_results = await stage1_collect_responses(
-                user_query, 
-                log_callback=log_callback, 
-                instruction=task.get("description"),
-                target_models=specialist,
-                human_feedback=session_state.get("human_feedback"),
-                conversation_id=conversation_id,
-                task_id=task.get("id")
-            )
-            last_stage1 = stage1_results
-            # ToBeDeleted_start
-            # last_stage3 = {
-            #     "action": "FINAL_ANSWER",
-            #     "response": stage1_results[0].get("response", ""),
-            #     "reasoning": f"Specialist {specialist[0].split('/')[-1]} completed the task."
-            # }
-            # ToBeDeleted_end
-            
-            response_content = stage1_results[0].get("response") if stage1_results else None
-            if not response_content:
-                response_content = "Error: Specialist failed to provide a response."
-                
-            last_stage3 = {
-                "action": "FINAL_ANSWER",
-                "response": response_content,
-                "reasoning": f"Specialist {specialist[0].split('/')[-1]} completed the task."
-            }
-            last_metadata = {"task_id": task.get("id"), "specialist": specialist[0]}
+        if idx > last["index"]:
+            last["index"], last["results"] = idx, results
 
-        # Save result for this task in session state
-        session_state["results"][task.get("id")] = last_stage3.get("response")
-        session_state["current_task_index"] += 1
-        
-        if conversation_id:
-            storage.update_session_state(conversation_id, session_state)
+        if task.get("breakpoint") and log_callback:
+            log_callback(f"🛑 Breakpoint reached at task '{task.get('label')}'. Awaiting user approval.")
+
+    def on_task_change():
+        session_state["current_task_index"] = first_unfinished_index(tasks, task_status)
+        changed = {key: {"status": status} for key, status in task_status.items() if saved_status.get(key) != status}
+        saved_status.update(task_status)
+        save_session_delta(changed)
+
+    try:
+        paused = await run_blueprint(
+            tasks, task_status, run_task,
+            max_parallel=max_parallel,
+            on_change=on_task_change,
+            log_callback=log_callback
+        )
+    finally:
+        # The mission's audit trail is complete once it stops, even on failure
+        await audit_sink.aflush()
+    last_stage1, last_stage2, last_stage3, last_metadata = last["results"]
 
-        # Check for breakpoint
-        if task.get("breakpoint"):
-            if log_callback:
-                log_callback(f"🛑 Breakpoint reached at task '{task.get('label')}'. Awaiting user approval.")
-            session_state["status"] = "paused"
-            if conversation_id:
-                storage.update_session_state(conversation_id, session_state)
-            break
+    if paused:
+        session_state["status"] = "paused"
+        save_session_delta()
 
     # If all tasks finished
     if session_state["current_task_index"] >= len(tasks):
         session_state["status"] = "completed"
+        save_session_delta()
         if conversation_id:
-            storage.update_session_state(conversation_id, session_state)
-            
             # Export to markdown if we have a final answer
             final_ans = last_stage3.get("response") or last_stage3.get("content")
             if final_ans:
                 try:
-                    filepath = storage.export_to_markdown(conversation_id, final_ans, user_query)
+                    filepath = await async_storage.storage.export_to_markdown(conversation_id, final_ans, user_query)
                     if log_callback:
                         log_callback(f"📄 Result exported to {filepath}")
                 except Exception as e:
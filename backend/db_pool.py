@@ -0,0 +1,112 @@
+"""Pooled, WAL-mode SQLite connections shared by all storage code."""
+
+import sqlite3
+import threading
+from typing import Any, Dict, List
+
+from . import config
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["sqlite"], **(config.get_config().get("sqlite") or {})}
+
+
+class PooledConnection:
+    """
+    A checked-out sqlite3.Connection. Everything is delegated to the real
+    connection except close(), which rolls back anything left uncommitted
+    (as a real close would) and hands the connection back to the pool.
+    """
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, conn: sqlite3.Connection, pool: "ConnectionPool"):
+        object.__setattr__(self, "_conn", conn)
+        object.__setattr__(self, "_pool", pool)
+
+    def __getattr__(self, name):
+        if self._conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._conn.__exit__(*exc_info)
+
+    def close(self):
+        conn = self._conn
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+
+class ConnectionPool:
+    """
+    Idle connections to one database file, reused across calls so the
+    pragmas and sqlite3's prepared-statement cache survive between them.
+    A checked-out connection belongs to one caller at a time, so nested
+    storage calls still get separate connections.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+
+    def _open(self) -> sqlite3.Connection:
+        settings = get_settings()
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=settings["busy_timeout_ms"] / 1000.0,
+            cached_statements=int(settings["statement_cache_size"]),
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        conn.execute(f"PRAGMA cache_size = {-int(settings['cache_size_kb'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+        conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        self.opened += 1
+        return conn
+
+    def connect(self) -> PooledConnection:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._open()
+        else:
+            self.reused += 1
+        conn.row_factory = sqlite3.Row
+        return PooledConnection(conn, self)
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < int(get_settings()["max_idle_connections"]):
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        """Close idle connections; ones still checked out are pooled again when closed."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def stats(self) -> Dict[str, int]:
+        return {"opened": self.opened, "reused": self.reused, "idle": len(self._idle)}
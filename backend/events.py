@@ -0,0 +1,97 @@
+"""Bounded in-process event bus feeding the council SSE streams."""
+
+import asyncio
+import json
+from collections import deque
+from typing import Any, AsyncIterator, Dict
+
+from . import config
+
+# Events that may be dropped when a slow client lets the queue fill up.
+# Everything else (stage results, session state, completion, errors) is kept.
+LOSSY_EVENT_TYPES = {"log", "stage1_delta", "stage3_delta", "heartbeat"}
+
+_CLOSED = object()
+
+
+class EventBus:
+    """
+    A single-consumer event queue with bounded memory.
+
+    Producers call publish() synchronously from the orchestrator; the SSE
+    generator drains stream(), which emits heartbeat events while idle so
+    proxies do not time out the connection.
+    """
+
+    def __init__(self, max_events: int = 1000, heartbeat_interval: float = 15.0):
+        self._items: deque = deque()
+        self._ready = asyncio.Event()
+        self.max_events = max_events
+        self.heartbeat_interval = heartbeat_interval
+        self.dropped = 0
+        self.closed = False
+
+    @classmethod
+    def from_config(cls) -> "EventBus":
+        settings = config.get_config().get("event_bus", {}) or {}
+        defaults = config.DEFAULT_CONFIG["event_bus"]
+        return cls(
+            max_events=int(settings.get("max_queued_events", defaults["max_queued_events"])),
+            heartbeat_interval=float(settings.get("heartbeat_interval", defaults["heartbeat_interval"])),
+        )
+
+    def publish(self, event: Dict[str, Any]):
+        """Enqueue an event without blocking the producer."""
+        if self.closed:
+            return
+        self._put(event, lossy=event.get("type") in LOSSY_EVENT_TYPES)
+
+    def close(self):
+        """Signal the end of the stream once all queued events are drained."""
+        if not self.closed:
+            self.closed = True
+            # The end-of-stream marker never displaces a queued event
+            self._items.append(_CLOSED)
+            self._ready.set()
+
+    def _put(self, item: Any, lossy: bool):
+        if len(self._items) >= self.max_events:
+            self.dropped += 1
+            if lossy:
+                return
+            # Make room for an event that must not be lost: evict the oldest
+            # lossy event, and only fall back to the oldest event if none is queued
+            for index, queued in enumerate(self._items):
+                if queued is not _CLOSED and queued.get("type") in LOSSY_EVENT_TYPES:
+                    del self._items[index]
+                    break
+            else:
+                self._items.popleft()
+        self._items.append(item)
+        self._ready.set()
+
+    async def stream(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield events as they arrive until the bus is closed."""
+        reported_drops = 0
+        while True:
+            if not self._items:
+                self._ready.clear()
+                try:
+                    await asyncio.wait_for(self._ready.wait(), timeout=self.heartbeat_interval)
+                except asyncio.TimeoutError:
+                    yield {"type": "heartbeat"}
+                    continue
+            item = self._items.popleft()
+
+            if self.dropped > reported_drops:
+                yield {"type": "events_dropped", "count": self.dropped - reported_drops}
+                reported_drops = self.dropped
+
+            if item is _CLOSED:
+                return
+            yield item
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event as a server-sent event frame."""
+    return f"data: {json.dumps(event)}\n\n"
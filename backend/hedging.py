@@ -0,0 +1,85 @@
+"""Hedged requests: race a substitute model against a slow primary."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from . import config, metrics, async_storage
+
+
+@dataclass
+class HedgePolicy:
+    """
+    If the primary has not answered within its usual latency (the given
+    percentile of recorded response times, or the catalogue latency while
+    there is too little history), the substitute is started in parallel and
+    the first successful answer wins. max_extra_tokens caps the estimated
+    duplicate spend per conversation (0 = no cap).
+    """
+    enabled: bool = False
+    percentile: float = 95.0
+    min_samples: int = 5
+    default_delay_seconds: float = 15.0
+    min_delay_seconds: float = 2.0
+    max_extra_tokens: int = 50000
+
+    @classmethod
+    def from_config(cls) -> "HedgePolicy":
+        settings = config.get_config().get("hedging", {}) or {}
+        return cls(**{k: v for k, v in settings.items() if k in cls.__dataclass_fields__})
+
+    async def delay_for(self, model: str) -> float:
+        """Seconds to wait for the primary before hedging; the catalogue lookup runs off the event loop."""
+        delay = None
+        if metrics.model_latency.count(model) >= self.min_samples:
+            delay = metrics.model_latency.percentile(model, self.percentile)
+        else:
+            from .unified_model_service import unified_model_service
+            latency_ms = await async_storage.storage.run(unified_model_service.get_latency_for_model, model)
+            if latency_ms:
+                delay = latency_ms / 1000.0
+        if delay is None:
+            delay = self.default_delay_seconds
+        return max(self.min_delay_seconds, delay)
+
+
+class HedgeLedger:
+    """Counts hedges and the extra tokens they cost, per conversation and in total."""
+
+    def __init__(self):
+        self.fired = 0
+        self.primary_won = 0
+        self.substitute_won = 0
+        self.skipped_over_budget = 0
+        self.extra_tokens = 0
+        self._spent: Dict[Optional[str], int] = {}
+
+    def allow(self, conversation_id: Optional[str], policy: HedgePolicy) -> bool:
+        if policy.max_extra_tokens <= 0:
+            return True
+        if self._spent.get(conversation_id, 0) < policy.max_extra_tokens:
+            return True
+        self.skipped_over_budget += 1
+        return False
+
+    def record(self, conversation_id: Optional[str], substitute_won: bool, extra_tokens: int):
+        if substitute_won:
+            self.substitute_won += 1
+        else:
+            self.primary_won += 1
+        self.extra_tokens += extra_tokens
+        self._spent[conversation_id] = self._spent.get(conversation_id, 0) + extra_tokens
+
+    def spent(self, conversation_id: Optional[str]) -> int:
+        return self._spent.get(conversation_id, 0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "fired": self.fired,
+            "primary_won": self.primary_won,
+            "substitute_won": self.substitute_won,
+            "skipped_over_budget": self.skipped_over_budget,
+            "extra_tokens": self.extra_tokens,
+        }
+
+
+ledger = HedgeLedger()
@@ -0,0 +1,105 @@
+"""Shared, lifecycle-managed HTTP client for all outbound provider traffic."""
+
+import asyncio
+import importlib.util
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import config
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_slots: Dict[str, asyncio.Semaphore] = {}
+
+
+def get_pool_settings() -> Dict[str, object]:
+    """Merge configured pool settings over the defaults."""
+    settings = config.DEFAULT_CONFIG["http_pool"].copy()
+    settings.update(config.get_config().get("http_pool", {}) or {})
+    return settings
+
+
+def http2_available() -> bool:
+    """HTTP/2 needs the optional 'h2' package (httpx[http2])."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_pool_settings()
+    limits = httpx.Limits(
+        max_connections=settings["max_connections"],
+        max_keepalive_connections=settings["max_keepalive_connections"],
+        keepalive_expiry=settings["keepalive_expiry"],
+    )
+    # Per-request timeouts are passed by the callers; this is only the fallback.
+    timeout = httpx.Timeout(120.0, connect=settings["connect_timeout"])
+    use_http2 = bool(settings["http2"]) and http2_available()
+    if settings["http2"] and not use_http2:
+        print("HTTP/2 requested but 'h2' is not installed; falling back to HTTP/1.1.")
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=use_http2)
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the shared client (called on application startup)."""
+    global _client, _client_loop
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        _client_loop = asyncio.get_running_loop()
+        _host_slots.clear()
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client and drop all pooled connections (called on shutdown)."""
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _host_slots.clear()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it lazily when used outside the FastAPI
+    lifecycle (scripts, tests). Pooled connections are bound to the event loop
+    they were opened on, so a new loop gets a fresh client.
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = _build_client()
+        _client_loop = loop
+        _host_slots.clear()
+    return _client
+
+
+@asynccontextmanager
+async def host_slot(url: str):
+    """Cap the number of concurrent requests per host."""
+    host = urlsplit(url).netloc
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = asyncio.Semaphore(int(get_pool_settings()["max_connections_per_host"]))
+        _host_slots[host] = slot
+    async with slot:
+        yield
+
+
+async def request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request through the shared client, respecting the per-host cap."""
+    client = get_http_client()
+    async with host_slot(url):
+        return await client.request(method, url, **kwargs)
+
+
+@asynccontextmanager
+async def stream(method: str, url: str, **kwargs):
+    """Open a streaming response through the shared client, respecting the per-host cap."""
+    client = get_http_client()
+    async with host_slot(url):
+        async with client.stream(method, url, **kwargs) as response:
+            yield response
@@ -0,0 +1,293 @@
+"""Durable background queue for council missions, detached from the HTTP request that submitted them."""
+
+import asyncio
+import os
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set
+
+from . import async_storage, cancellation, config
+from .events import EventBus, LOSSY_EVENT_TYPES
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["jobs"], **(config.get_config().get("jobs") or {})}
+
+
+async def run_mission(conversation_id: str, content: str, publish: Callable[[Dict[str, Any]], None],
+                      cache_mode: Optional[str] = None, resume: bool = False,
+                      on_begin: Optional[Callable[[cancellation.Mission], None]] = None):
+    """
+    Run the council on a user message that is already stored, save the
+    assistant message and publish the mission's events, ending with
+    'complete'. Errors propagate to the caller. resume continues an
+    interrupted mission (see council.run_full_council).
+
+    The mission is registered in cancellation.missions while it runs; when
+    it is cancelled through there, the cancellation is audited and published
+    as a 'cancelled' event before CancelledError propagates. on_begin
+    receives the Mission as soon as it is registered, so the caller can
+    cancel exactly this run.
+    """
+    from . import council
+
+    def sync_log(msg):
+        print(f"[COUNCIL] {msg}")
+        publish({"type": "log", "message": msg})
+
+    mission = cancellation.missions.begin(conversation_id)
+    if on_begin:
+        on_begin(mission)
+    try:
+        # Run the council process via the orchestrator; stage results,
+        # session state and token deltas are published as they happen
+        stage1_results, stage2_results, stage3_result, metadata = await council.run_full_council(
+            content,
+            conversation_id=conversation_id,
+            log_callback=sync_log,
+            event_callback=publish,
+            cache_mode=cache_mode,
+            resume=resume
+        )
+
+        # Add assistant message to history
+        await async_storage.storage.add_assistant_message(
+            conversation_id,
+            stage1_results,
+            stage2_results,
+            stage3_result,
+            metadata
+        )
+    except asyncio.CancelledError:
+        if mission.report is not None:
+            await cancellation.record_cancellation(mission, publish)
+        raise
+    finally:
+        cancellation.missions.end(mission)
+
+    # Handle Breakpoints
+    session_state = await async_storage.storage.get_session_state(conversation_id)
+    if session_state and session_state.get("status") == "paused":
+        publish({"type": "human_input_required", "reason": "breakpoint"})
+
+    publish({"type": "complete"})
+
+
+class JobStream:
+    """
+    Events of a job that is queued or running in this process. Every event
+    gets the next seq; all but the lossy ones are kept in history (and
+    stored in job_events) so a client attaching late, from any tab, can
+    replay them before following the live ones.
+    """
+
+    def __init__(self, conversation_id: str, last_seq: int = 0):
+        self.conversation_id = conversation_id
+        # Events up to base_seq were published by an earlier run and only exist in job_events
+        self.base_seq = last_seq
+        self.seq = last_seq
+        self.history: List[Dict[str, Any]] = []
+        self.subscribers: List[EventBus] = []
+        self.closed = False
+
+
+class JobQueue:
+    """
+    Missions submitted as jobs are stored in the jobs table and run by
+    `workers` worker coroutines, independent of any client connection.
+    A restart re-queues jobs that were running (see
+    Storage.reset_interrupted_jobs). Jobs of one conversation run one at a
+    time, in submission order.
+    """
+
+    def __init__(self):
+        self._streams: Dict[str, JobStream] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._workers: List[asyncio.Task] = []
+        # Jobs cancelled between being claimed and their task starting
+        self._cancel_requested: Set[str] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self.worker_prefix = f"{os.getpid()}"
+
+    async def start(self):
+        """Requeue interrupted jobs and start the workers."""
+        if self._workers:
+            return
+        settings = get_settings()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        recovered = await async_storage.storage.reset_interrupted_jobs(int(settings["max_attempts"]))
+        if recovered["requeued"] or recovered["failed"]:
+            print(f"[JOBS] Interrupted jobs: {recovered['requeued']} requeued, {recovered['failed']} failed")
+        for job in await async_storage.storage.list_jobs(status="queued", limit=-1):
+            self._streams.setdefault(job["id"], JobStream(job["conversation_id"], job["last_seq"]))
+        loop = asyncio.get_running_loop()
+        self._workers = [
+            loop.create_task(self._worker(f"{self.worker_prefix}-{i}"))
+            for i in range(int(settings["workers"]))
+        ]
+
+    async def stop(self):
+        """Stop the workers; running jobs are put back in the queue for the next start."""
+        self._stopping = True
+        tasks = list(self._running.values()) + self._workers
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, conversation_id: str, content: str, cache_mode: Optional[str] = None,
+                     resume: bool = False) -> Dict[str, Any]:
+        """Queue a mission for a user message that is already stored (resume: continue an interrupted one)."""
+        job_id = str(uuid.uuid4())
+        self._streams[job_id] = JobStream(conversation_id)
+        job = await async_storage.storage.create_job(
+            job_id, conversation_id, {"content": content, "cache_mode": cache_mode, "resume": resume}
+        )
+        self.publish(job_id, {"type": "job_status", "status": "queued"})
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it had already finished (or does not exist)."""
+        task = self._running.get(job_id)
+        if task is not None:
+            # Through the mission, so its calls stop too and the cancellation is audited
+            stream = self._streams.get(job_id)
+            if not (stream and cancellation.missions.cancel(stream.conversation_id, "job cancelled")):
+                task.cancel()
+            return True
+        if await async_storage.storage.update_job_status(job_id, "cancelled", only_from=["queued"]):
+            self._finish(job_id, "cancelled")
+            return True
+        if job_id in self._streams:
+            # A worker claimed it while we were updating; cancel it as soon as it starts
+            self._cancel_requested.add(job_id)
+            return True
+        return False
+
+    def has_active_job(self, conversation_id: str) -> bool:
+        """Whether this process has a queued or running job for the conversation."""
+        return any(stream.conversation_id == conversation_id for stream in self._streams.values())
+
+    def publish(self, job_id: str, event: Dict[str, Any]):
+        stream = self._streams.get(job_id)
+        if stream is None or stream.closed:
+            return
+        stream.seq += 1
+        event = {**event, "seq": stream.seq}
+        if event.get("type") not in LOSSY_EVENT_TYPES:
+            stream.history.append(event)
+            async_storage.storage.submit("add_job_event", job_id, stream.seq, event)
+        for bus in stream.subscribers:
+            bus.publish(event)
+
+    def _finish(self, job_id: str, status: str, **details):
+        self.publish(job_id, {"type": "job_status", "status": status, **details})
+        self._close(job_id)
+
+    def _close(self, job_id: str):
+        """End the live stream: attached clients get the rest of their queue, later ones read job_events."""
+        stream = self._streams.pop(job_id, None)
+        if stream is not None:
+            stream.closed = True
+            for bus in stream.subscribers:
+                bus.close()
+
+    async def attach(self, job_id: str, after: int = 0) -> AsyncIterator[Dict[str, Any]]:
+        """
+        A job's events with seq > after: stored ones first, then live ones
+        until the job finishes. Closing the iterator only detaches the client;
+        the job keeps running.
+        """
+        stream = self._streams.get(job_id)
+        if stream is None:
+            # Finished, or run by another process: everything there is is stored
+            for event in await async_storage.storage.get_job_events(job_id, after):
+                yield event
+            return
+
+        if after < stream.base_seq:
+            for event in await async_storage.storage.get_job_events(job_id, after, stream.base_seq):
+                yield event
+            after = stream.base_seq
+
+        # Snapshot the history and subscribe without awaiting in between, so no event is missed
+        backlog = [event for event in stream.history if event["seq"] > after]
+        bus = None
+        if not stream.closed:
+            bus = EventBus.from_config()
+            stream.subscribers.append(bus)
+        try:
+            for event in backlog:
+                yield event
+            if bus is not None:
+                async for event in bus.stream():
+                    if event.get("seq", after + 1) > after:
+                        yield event
+        finally:
+            if bus is not None and bus in stream.subscribers:
+                stream.subscribers.remove(bus)
+
+    async def _worker(self, name: str):
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                job = await async_storage.storage.claim_next_job(name)
+            except Exception as e:
+                print(f"[JOBS] {name} could not claim a job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=float(get_settings()["poll_interval"]))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            task = asyncio.create_task(self._execute(job))
+            self._running[job["id"]] = task
+            try:
+                await task
+            finally:
+                self._running.pop(job["id"], None)
+            # The conversation may have more jobs that waited for this one
+            self._wakeup.set()
+
+    async def _execute(self, job: Dict[str, Any]):
+        job_id = job["id"]
+        self._streams.setdefault(job_id, JobStream(job["conversation_id"], job["last_seq"]))
+        self.publish(job_id, {"type": "job_status", "status": "running", "attempt": job["attempts"]})
+        payload = job["payload"]
+        try:
+            if job_id in self._cancel_requested:
+                self._cancel_requested.discard(job_id)
+                raise asyncio.CancelledError()
+            await run_mission(
+                job["conversation_id"],
+                payload["content"],
+                lambda event: self.publish(job_id, event),
+                cache_mode=payload.get("cache_mode"),
+                resume=payload.get("resume", False)
+            )
+        except asyncio.CancelledError:
+            if self._stopping:
+                # Shutting down: leave the job for the next start, where it is picked up again
+                await async_storage.storage.update_job_status(job_id, "queued", only_from=["running"])
+                self._close(job_id)
+                return
+            await async_storage.storage.update_job_status(job_id, "cancelled", only_from=["running"])
+            self._finish(job_id, "cancelled")
+            return
+        except Exception as e:
+            print(f"[JOBS] Job {job_id} failed: {e}")
+            self.publish(job_id, {"type": "error", "message": str(e)})
+            await async_storage.storage.update_job_status(job_id, "failed", error=str(e))
+            self._finish(job_id, "failed", error=str(e))
+            return
+        await async_storage.storage.update_job_status(job_id, "completed")
+        self._finish(job_id, "completed")
+
+
+# Global instance
+job_queue = JobQueue()
@@ -0,0 +1,115 @@
+"""Spread model calls across all eligible OpenRouter keys."""
+
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Mapping, Optional
+
+from . import config
+from .rate_limiter import key_label
+from .resilience import retry_after_seconds
+
+# Statuses that mean "this key is out of quota", not "this model is down"
+KEY_EXHAUSTED_STATUS = {402, 429}
+
+
+def _settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["key_pool"], **(config.get_config().get("key_pool") or {})}
+
+
+class KeyPool:
+    """
+    Least-in-flight selection over the eligible keys, ties going to the key
+    picked least recently (round-robin). Keys that return 402/429 are benched
+    for a while and only used again when every eligible key is benched.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[str, int] = {}
+        self._last_pick: Dict[str, int] = {}
+        self._benched_until: Dict[str, float] = {}
+        self._picks: Dict[str, int] = {}
+        self._benchings: Dict[str, int] = {}
+        self._seq = 0
+
+    def is_benched(self, key_value: str, now: Optional[float] = None) -> bool:
+        until = self._benched_until.get(key_value)
+        return until is not None and until > (time.monotonic() if now is None else now)
+
+    def choose(self, keys: List[Dict[str, Any]]) -> Optional[str]:
+        """Pick one key_value from the eligible api_keys rows."""
+        if not keys:
+            return None
+        now = time.monotonic()
+        available = [k for k in keys if not self.is_benched(k["key_value"], now)]
+        if not available:
+            # Every eligible key is benched; use the one that comes back first
+            return min(keys, key=lambda k: self._benched_until[k["key_value"]])["key_value"]
+
+        chosen = min(
+            available,
+            key=lambda k: (self._in_flight.get(k["key_value"], 0), self._last_pick.get(k["key_value"], 0))
+        )["key_value"]
+        self._seq += 1
+        self._last_pick[chosen] = self._seq
+        self._picks[chosen] = self._picks.get(chosen, 0) + 1
+        return chosen
+
+    @contextmanager
+    def lease(self, key_value: Optional[str]):
+        """Count a request against key_value while it is in flight."""
+        if not key_value:
+            yield
+            return
+        self._in_flight[key_value] = self._in_flight.get(key_value, 0) + 1
+        try:
+            yield
+        finally:
+            self._in_flight[key_value] -= 1
+
+    def bench(self, key_value: str, status_code: int, headers: Optional[Mapping[str, str]] = None):
+        """Take a key out of rotation after a 402 (no credit) or 429 (rate limited)."""
+        settings = _settings()
+        if status_code == 402:
+            seconds = float(settings["payment_required_seconds"])
+        else:
+            hinted = retry_after_seconds(headers) if headers is not None else None
+            seconds = hinted if hinted is not None else float(settings["rate_limited_seconds"])
+        self._benched_until[key_value] = time.monotonic() + seconds
+        self._benchings[key_value] = self._benchings.get(key_value, 0) + 1
+
+    def reinstate(self, key_value: Optional[str] = None):
+        """Put one key (e.g. after it was re-checked or edited) or all keys back in rotation."""
+        if key_value is None:
+            self._benched_until.clear()
+        else:
+            self._benched_until.pop(key_value, None)
+
+    def replacement(self, key_value: str, model: str, status_code: int, headers: Optional[Mapping[str, str]] = None) -> Optional[str]:
+        """
+        Bench key_value and return another eligible, non-benched key for
+        model, or None when there is no other key to fail over to.
+        """
+        from .storage import storage
+
+        self.bench(key_value, status_code, headers)
+        candidate = storage.get_key_for_model(model)
+        if candidate and candidate != key_value and not self.is_benched(candidate):
+            return candidate
+        return None
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        keys = set(self._picks) | set(self._in_flight) | set(self._benched_until)
+        return {
+            key_label(k): {
+                "in_flight": self._in_flight.get(k, 0),
+                "picks": self._picks.get(k, 0),
+                "benched_for_seconds": max(0.0, self._benched_until[k] - now) if self.is_benched(k, now) else 0.0,
+                "times_benched": self._benchings.get(k, 0),
+            }
+            for k in keys
+        }
+
+
+# Global instance
+pool = KeyPool()
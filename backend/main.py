@@ -1,31 +1,48 @@
 """FastAPI backend for LLM Council."""
 
-from fastapi import FastAPI, HTTPException, Header
+from fastapi import FastAPI, HTTPException, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import uuid
 import json
 import os
 import asyncio
 from datetime import datetime
 
-from . import storage, config, models_service, audit_service
-from .council import (
-    run_full_council, 
-    generate_conversation_title, 
-    stage0_analyze_and_plan,
-    stage1_collect_responses, 
-    stage2_collect_rankings, 
-    stage3_synthesize_final, 
-    calculate_aggregate_rankings
-)
+from . import storage, config, models_service, audit_service, http_client, metrics, hedging, response_cache, single_flight, resilience, rate_limiter, key_pool, async_storage, audit_sink, job_queue, cancellation, checkpoints
+from .council import generate_conversation_title
 from .openrouter import query_model
+from .events import EventBus, format_sse
 from .version import PRINTNAME, VERSION
 
 app = FastAPI(title=PRINTNAME)
 
+
+@app.on_event("startup")
+async def on_startup():
+    """
+    Open the shared HTTP client, start the loop-lag monitor and the job
+    workers, and recover missions a restart interrupted.
+    """
+    await http_client.start_http_client()
+    metrics.loop_lag_monitor.start()
+    await job_queue.job_queue.start()
+    await checkpoints.recover_interrupted_missions(job_queue.job_queue)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    """Stop the job workers and the monitor, close pooled connections, and finish queued audit and storage writes."""
+    # Running jobs go back to the queue and continue on the next start
+    await job_queue.job_queue.stop()
+    metrics.loop_lag_monitor.stop()
+    await http_client.close_http_client()
+    await audit_sink.audit_sink.aflush()
+    async_storage.storage.shutdown()
+
+
 # Add a version endpoint
 @app.get("/api/version")
 async def get_version():
@@ -59,6 +76,12 @@ class CreateConversationRequest(BaseModel):
 class SendMessageRequest(BaseModel):
     """Request to send a message in a conversation."""
     content: str
+    cache_mode: Optional[str] = None  # Response cache mode for this message only
+
+
+class CacheModeRequest(BaseModel):
+    """Response cache mode for a conversation (None = configured default)."""
+    mode: Optional[str] = None
 
 
 class ConversationMetadata(BaseModel):
@@ -67,6 +90,14 @@ class ConversationMetadata(BaseModel):
     created_at: str
     title: str
     message_count: int
+    revision_count: int = 0
+    last_modified: Optional[str] = None
+
+
+class ConversationPage(BaseModel):
+    """A page of the conversation list; next_cursor is None on the last page."""
+    conversations: List[ConversationMetadata]
+    next_cursor: Optional[str] = None
 
 
 class Conversation(BaseModel):
@@ -75,6 +106,8 @@ class Conversation(BaseModel):
     created_at: str
     title: str
     messages: List[Dict[str, Any]]
+    message_count: Optional[int] = None
+    next_cursor: Optional[int] = None
 
 
 class CouncilConfig(BaseModel):
@@ -85,6 +118,26 @@ class CouncilConfig(BaseModel):
     substitute_models: Dict[str, str] = {}
     consensus_strategy: str = "borda"
     response_timeout: int = 60
+    stream_tokens: bool = True
+    model_catalog: Dict[str, Any] = {}
+    scheduler: Dict[str, Any] = {}
+    quorum: Dict[str, Any] = {}
+    hedging: Dict[str, Any] = {}
+    response_cache: Dict[str, Any] = {}
+    single_flight: Dict[str, Any] = {}
+    retry: Dict[str, Any] = {}
+    rate_limits: Dict[str, Any] = {}
+    key_pool: Dict[str, Any] = {}
+    sqlite: Dict[str, Any] = {}
+    audit_log: Dict[str, Any] = {}
+    audit_blobs: Dict[str, Any] = {}
+    search: Dict[str, Any] = {}
+    cancellation: Dict[str, Any] = {}
+    jobs: Dict[str, Any] = {}
+    checkpoints: Dict[str, Any] = {}
+    circuit_breaker: Dict[str, Any] = {}
+    event_bus: Dict[str, Any] = {}
+    http_pool: Dict[str, Any] = {}
 
 
 class HumanFeedbackRequest(BaseModel):
@@ -99,31 +152,156 @@ async def root():
     return {"status": "ok", "service": "LLM Council API"}
 
 
+@app.get("/api/metrics/latency")
+async def get_latency_metrics():
+    """
+    Per-stage and per-model latency percentiles (seconds), event loop lag
+    and hedging counters since startup.
+    """
+    return {
+        "stages": metrics.stage_latency.summary(),
+        "models": metrics.model_latency.summary(),
+        "event_loop_lag": metrics.event_loop_lag.summary().get("event_loop"),
+        "hedging": hedging.ledger.summary()
+    }
+
+
+@app.get("/api/metrics/rate-limits")
+async def get_rate_limit_metrics():
+    """
+    Rate limiter buckets per (API key, model) with queue depth, plus queued
+    wait time percentiles per model. Long waits mean we are limit-bound
+    rather than latency-bound.
+    """
+    return {
+        "buckets": rate_limiter.limiter.snapshot(),
+        "wait": metrics.rate_limit_wait.summary()
+    }
+
+
+@app.get("/api/models/health")
+async def get_model_health():
+    """Circuit breaker state per model (closed = healthy, open = failing fast, half_open = probing)."""
+    return {"models": resilience.breakers.snapshot()}
+
+
+@app.post("/api/models/health/reset")
+async def reset_model_health(model_id: Optional[str] = None):
+    """Close the breaker of one model (?model_id=...) or of all models."""
+    resilience.breakers.reset(model_id)
+    return {"status": "success"}
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Response cache size and hit/miss/bytes counters, plus request coalescing, since startup."""
+    return {
+        **(await async_storage.storage.run(response_cache.response_cache.stats)),
+        "single_flight": single_flight.flights.stats()
+    }
+
+
+@app.delete("/api/cache")
+async def clear_cache():
+    """Drop every cached model response."""
+    deleted = await async_storage.storage.run(response_cache.response_cache.clear, write=True)
+    return {"status": "success", "deleted": deleted}
+
+
+@app.put("/api/conversations/{conversation_id}/cache-mode")
+async def set_conversation_cache_mode(conversation_id: str, request: CacheModeRequest):
+    """Choose off / read_through / replay_only caching for a conversation."""
+    if request.mode is not None and request.mode not in response_cache.CACHE_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid cache mode. Use one of {list(response_cache.CACHE_MODES)}")
+    if not await async_storage.storage.set_cache_mode(conversation_id, request.mode):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"status": "success", "mode": request.mode}
+
+
+@app.get("/api/search")
+async def search(q: str, kinds: Optional[str] = None, conversation_id: Optional[str] = None,
+                 model: Optional[str] = None, step: Optional[str] = None, since: Optional[str] = None,
+                 until: Optional[str] = None, limit: int = 20, offset: int = 0):
+    """
+    Full-text search over conversation titles, messages, final answers,
+    prompts and audit log messages, best match first. kinds is a comma list
+    of conversation, message, answer, prompt, audit; since/until are ISO
+    dates or timestamps (until is inclusive); step is an audit step or a
+    message role. Matches are marked with ** in the snippet.
+    """
+    try:
+        results = await async_storage.storage.search(
+            q,
+            kinds=[k.strip() for k in kinds.split(",") if k.strip()] if kinds else None,
+            conversation_id=conversation_id,
+            model=model,
+            step=step,
+            since=since,
+            until=until,
+            limit=min(max(1, limit), 100),
+            offset=max(0, offset),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return {"query": q, "results": results}
+
+
 @app.get("/api/audit/{conversation_id}")
-async def get_audit_logs(conversation_id: str):
-    logs = storage.storage.get_audit_logs(conversation_id)
+async def get_audit_logs(conversation_id: str, include_raw: bool = False):
+    """
+    Audit timeline. Raw payloads are left out unless include_raw=true; fetch
+    one on demand with GET /api/audit/blobs/{raw_hash}.
+    """
+    logs = await async_storage.storage.get_audit_logs(conversation_id, include_raw=include_raw)
     return logs
 
+@app.get("/api/audit/blobs/{raw_hash}")
+async def get_audit_blob(raw_hash: str):
+    """The raw_data JSON of an audit log entry."""
+    raw_data = await async_storage.storage.get_audit_blob(raw_hash)
+    if raw_data is None:
+        raise HTTPException(status_code=404, detail="Payload not found")
+    return {"raw_hash": raw_hash, "raw_data": raw_data}
+
 class AnalysisRequest(BaseModel):
     analysis: str
 
 @app.post("/api/audit/{conversation_id}/analysis")
 async def save_analysis(conversation_id: str, request: AnalysisRequest):
-    storage.storage.add_analysis_result(conversation_id, request.analysis)
+    await async_storage.storage.add_analysis_result(conversation_id, request.analysis)
     return {"status": "success"}
 
 @app.post("/api/audit/{conversation_id}/export")
 async def export_audit(conversation_id: str):
     try:
-        archive_path = audit_service.export_audit_archive(conversation_id)
+        archive_path = await async_storage.storage.run(audit_service.export_audit_archive, conversation_id)
         return {"status": "success", "archive_path": archive_path}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/audit/{conversation_id}/export")
+async def download_audit(conversation_id: str, raw: str = "pretty"):
+    """
+    The audit ZIP streamed as it is built, without a file on disk.
+    raw: 'pretty' (re-encoded, indented), 'verbatim' (payloads exactly as
+    stored) or 'none' (no payloads).
+    """
+    if raw not in audit_service.RAW_MODES:
+        raise HTTPException(status_code=400, detail=f"raw must be one of {list(audit_service.RAW_MODES)}")
+    if await async_storage.storage.get_conversation_summary(conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return StreamingResponse(
+        audit_service.iter_audit_archive(conversation_id, raw=raw),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{audit_service.archive_name(conversation_id)}"'}
+    )
+
 @app.post("/api/conversations/{conversation_id}/archive")
 async def archive_conversation(conversation_id: str):
     """Archive a conversation."""
-    success = storage.storage.archive_conversation(conversation_id)
+    success = await async_storage.storage.archive_conversation(conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "success"}
@@ -131,7 +309,7 @@ async def archive_conversation(conversation_id: str):
 @app.delete("/api/conversations/{conversation_id}/permanent")
 async def delete_conversation_permanent(conversation_id: str):
     """Delete a conversation permanently."""
-    success = storage.storage.delete_conversation(conversation_id)
+    success = await async_storage.storage.delete_conversation(conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "success", "id": conversation_id}
@@ -139,7 +317,7 @@ async def delete_conversation_permanent(conversation_id: str):
 @app.post("/api/conversations/{conversation_id}/reset")
 async def reset_conversation(conversation_id: str):
     """Reset a conversation (clear messages and state)."""
-    success = storage.storage.reset_conversation(conversation_id)
+    success = await async_storage.storage.reset_conversation(conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "success", "id": conversation_id}
@@ -147,12 +325,12 @@ async def reset_conversation(conversation_id: str):
 @app.get("/api/fail-lists")
 async def get_fail_lists():
     """Get all fail lists."""
-    return storage.storage.get_fail_lists()
+    return await async_storage.storage.get_fail_lists()
 
 @app.post("/api/fail-lists/{id}/activate")
 async def activate_fail_list(id: int):
     """Set a fail list as active."""
-    storage.storage.set_active_fail_list(id)
+    await async_storage.storage.set_active_fail_list(id)
     return {"status": "success"}
 
 @app.post("/api/models/test-availability")
@@ -175,7 +353,7 @@ async def test_models_availability(model_ids: List[str]):
     
     # Save the result as a new fail list
     name = f"Test {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-    storage.storage.save_fail_list(name, failed_models)
+    await async_storage.storage.save_fail_list(name, failed_models)
     
     return {
         "failed_models": failed_models, 
@@ -189,7 +367,7 @@ async def get_base_models(search: str = None, limit: int = 1000):
     """Get list of unique base models with optional search."""
     from .unified_model_service import unified_model_service
     
-    base_models = unified_model_service.get_base_models()
+    base_models = await async_storage.storage.run(unified_model_service.get_base_models)
     
     # Apply search if provided
     if search and search.strip():
@@ -212,7 +390,7 @@ async def get_model_variants(base_model_id: str):
     """Get all variants for a specific base model."""
     from .unified_model_service import unified_model_service
     
-    variants = unified_model_service.get_variants_for_base_model(base_model_id)
+    variants = await async_storage.storage.run(unified_model_service.get_variants_for_base_model, base_model_id)
     return variants
 
 @app.get("/api/unified-models/search")
@@ -220,14 +398,14 @@ async def search_models(q: str, limit: int = 20):
     """Global search across all unified models."""
     from .unified_model_service import unified_model_service
     
-    results = unified_model_service.search_models(q, limit)
+    results = await async_storage.storage.run(unified_model_service.search_models, q, limit)
     return results
 
 @app.get("/api/unified-models/all")
 async def get_all_unified_models():
     """Get ALL unified models for the Data Inspector."""
     from .unified_model_service import unified_model_service
-    return unified_model_service.get_all_unified_models()
+    return await async_storage.storage.run(unified_model_service.get_all_unified_models)
 
 @app.post("/api/unified-models/refresh")
 async def refresh_unified_models():
@@ -245,7 +423,7 @@ async def get_model_statistics():
     """Get statistics about unified model database."""
     from .unified_model_service import unified_model_service
     
-    stats = unified_model_service.get_model_statistics()
+    stats = await async_storage.storage.run(unified_model_service.get_model_statistics)
     return stats
 
 @app.post("/api/unified-models/update-latencies")
@@ -263,16 +441,19 @@ async def update_model_latencies():
 async def test_unified_model_latency(model_id: int):
     """Perform a live latency check for a specific unified model."""
     from .unified_model_service import unified_model_service
-    import httpx
     import time
     from datetime import datetime
     
     # Get the model from DB to get its provider ID
-    conn = storage.storage.get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM unified_models WHERE id = ?", (model_id,))
-    row = cursor.fetchone()
-    conn.close()
+    def load_model():
+        conn = storage.storage.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM unified_models WHERE id = ?", (model_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row
+
+    row = await async_storage.storage.run(load_model)
     
     if not row:
         raise HTTPException(status_code=404, detail="Model not found")
@@ -288,58 +469,125 @@ async def test_unified_model_latency(model_id: int):
     # For OpenRouter, we could try to fetch its specific metadata again
     start_time = time.time()
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            # We just do a ping or small request
-            await client.get("https://openrouter.ai/api/v1/models")
+        # We just do a ping or small request
+        await http_client.request("GET", "https://openrouter.ai/api/v1/models", timeout=5.0)
         
         latency_live = (time.time() - start_time) * 1000
         timestamp = datetime.utcnow().isoformat()
         
         # Update DB
-        conn = storage.storage.get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE unified_models 
-            SET latency_live = ?, latency_live_timestamp = ? 
-            WHERE id = ?
-        ''', (latency_live, timestamp, model_id))
-        conn.commit()
-        conn.close()
+        def save_latency():
+            conn = storage.storage.get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE unified_models 
+                SET latency_live = ?, latency_live_timestamp = ? 
+                WHERE id = ?
+            ''', (latency_live, timestamp, model_id))
+            conn.commit()
+            conn.close()
+
+        await async_storage.storage.run(save_latency, write=True)
         
         return {"status": "success", "latency_live": latency_live, "timestamp": timestamp}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-@app.get("/api/conversations", response_model=List[ConversationMetadata])
-async def list_conversations():
-    """List all conversations (metadata only)."""
-    return storage.storage.list_conversations()
+@app.get("/api/conversations", response_model=Union[List[ConversationMetadata], ConversationPage])
+async def list_conversations(limit: Optional[int] = None, cursor: Optional[str] = None):
+    """
+    List all conversations (metadata only), most recently modified first.
+    With limit, returns one page and a next_cursor to pass as cursor.
+    """
+    if limit is None and cursor is None:
+        return await async_storage.storage.list_conversations()
+    try:
+        return await async_storage.storage.list_conversation_page(limit=min(max(1, limit or 50), 500), cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.post("/api/conversations", response_model=Conversation)
 async def create_conversation(request: CreateConversationRequest):
     """Create a new conversation."""
     conversation_id = str(uuid.uuid4())
-    conversation = storage.storage.create_conversation(conversation_id)
+    conversation = await async_storage.storage.create_conversation(conversation_id)
     return conversation
 
 
 @app.delete("/api/conversations/{conversation_id}")
 async def delete_conversation(conversation_id: str):
     """Delete a conversation."""
-    success = storage.storage.delete_conversation(conversation_id)
+    success = await async_storage.storage.delete_conversation(conversation_id)
     if not success:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "conversation deleted"}
 
 
+def parse_message_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """'stage3,metadata' -> ['stage3', 'metadata']; 400 on unknown fields."""
+    if not fields:
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in storage.MESSAGE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown message fields {unknown}. Use any of {list(storage.MESSAGE_FIELDS)}")
+    return selected
+
+
 @app.get("/api/conversations/{conversation_id}", response_model=Conversation)
-async def get_conversation(conversation_id: str):
-    """Get a specific conversation with all its messages."""
-    conversation = storage.storage.get_conversation(conversation_id)
-    if conversation is None:
+async def get_conversation(conversation_id: str, message_limit: Optional[int] = None, fields: Optional[str] = None):
+    """
+    Get a specific conversation with all its messages. With message_limit
+    and/or fields only the first page of messages is returned (with ids and
+    the selected fields); continue with GET .../messages?after=next_cursor.
+    """
+    if message_limit is None and fields is None:
+        conversation = await async_storage.storage.get_conversation(conversation_id)
+        if conversation is None:
+            raise HTTPException(status_code=404, detail="Conversation not found")
+        return conversation
+
+    selected = parse_message_fields(fields)
+    summary = await async_storage.storage.get_conversation_summary(conversation_id)
+    if summary is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
-    return conversation
+    page = await async_storage.storage.get_message_page(
+        conversation_id, limit=max(1, message_limit or 50), fields=selected
+    )
+    return {**summary, **page}
+
+
+@app.get("/api/conversations/{conversation_id}/snapshots")
+async def get_session_snapshots(conversation_id: str):
+    """Append-only per-task snapshots (task, models, result) of the conversation's missions."""
+    if await async_storage.storage.get_conversation_summary(conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return {"snapshots": await async_storage.storage.get_session_snapshots(conversation_id)}
+
+
+@app.get("/api/conversations/{conversation_id}/summary")
+async def get_conversation_summary(conversation_id: str):
+    """Title, timestamps and message count without loading messages."""
+    summary = await async_storage.storage.get_conversation_summary(conversation_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return summary
+
+
+@app.get("/api/conversations/{conversation_id}/messages")
+async def get_conversation_messages(conversation_id: str, after: Optional[int] = None, limit: int = 50,
+                                    fields: Optional[str] = None):
+    """
+    Messages in order, limit at a time (max 500) after message id `after`.
+    fields selects columns, e.g. fields=role,content skips the stage payloads.
+    """
+    selected = parse_message_fields(fields)
+    if await async_storage.storage.get_conversation_summary(conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return await async_storage.storage.get_message_page(
+        conversation_id, after_id=after, limit=min(max(1, limit), 500), fields=selected
+    )
 
 
 @app.get("/api/config", response_model=CouncilConfig)
@@ -361,7 +609,7 @@ async def get_available_models_endpoint():
     models = await models_service.models_service.fetch_model_metadata()
     
     # Filter by active fail list
-    failed_models = storage.storage.get_active_fail_list()
+    failed_models = await async_storage.storage.get_active_fail_list()
     if failed_models:
         models = [m for m in models if m["id"] not in failed_models]
         
@@ -370,52 +618,52 @@ async def get_available_models_endpoint():
 @app.get("/api/templates")
 async def list_templates():
     """List all task templates."""
-    return storage.storage.list_templates()
+    return await async_storage.storage.list_templates()
 
 @app.post("/api/templates")
 async def save_template(template: Dict[str, Any]):
     """Save or update a template."""
-    storage.storage.save_template(template)
+    await async_storage.storage.save_template(template)
     return {"status": "template saved"}
 
 @app.get("/api/boards")
 async def list_boards():
     """List all AI boards."""
-    return storage.storage.list_boards()
+    return await async_storage.storage.list_boards()
 
 @app.post("/api/boards")
 async def save_board(board: Dict[str, Any]):
     """Save or update an AI board."""
-    storage.storage.save_board(board)
+    await async_storage.storage.save_board(board)
     return {"status": "board saved"}
 
 @app.delete("/api/boards/{board_id}")
 async def delete_board(board_id: str):
     """Delete an AI board."""
-    storage.storage.delete_board(board_id)
+    await async_storage.storage.delete_board(board_id)
     return {"status": "board deleted"}
 
 @app.get("/api/prompts")
 async def list_prompts():
     """List all prompts."""
-    return storage.storage.list_prompts()
+    return await async_storage.storage.list_prompts()
 
 @app.post("/api/prompts")
 async def save_prompt(prompt: Dict[str, Any]):
     """Save or update a prompt."""
-    storage.storage.save_prompt(prompt)
+    await async_storage.storage.save_prompt(prompt)
     return {"status": "prompt saved"}
 
 @app.delete("/api/prompts/{prompt_id}")
 async def delete_prompt(prompt_id: str):
     """Delete a prompt."""
-    storage.storage.delete_prompt(prompt_id)
+    await async_storage.storage.delete_prompt(prompt_id)
     return {"status": "prompt deleted"}
 
 @app.post("/api/prompts/{prompt_id}/use")
 async def track_prompt_usage(prompt_id: str):
     """Increment usage count for a prompt."""
-    storage.storage.track_prompt_usage(prompt_id)
+    await async_storage.storage.track_prompt_usage(prompt_id)
     return {"status": "usage tracked"}
 
 @app.get("/api/test-latency/{model_id:path}")
@@ -446,78 +694,180 @@ async def test_model_latency(model_id: str, x_api_key: Optional[str] = Header(No
     return {"status": "ok", "model": model_id, "latency": round(latency, 2), "response": response.get('content')}
 
 
-@app.post("/api/conversations/{conversation_id}/message")
-async def send_message(conversation_id: str, request: SendMessageRequest):
+def reserve_conversation(conversation_id: str):
     """
-    Send a message and run the council process using the Blueprint orchestrator.
-    Returns a streaming response with logs, stage results, and session state.
+    Claim the conversation for one mission, streamed or queued as a job,
+    before anything is awaited; 409 if it already has one. Release it with
+    cancellation.missions.release once the mission is registered or queued.
     """
+    if job_queue.job_queue.has_active_job(conversation_id) or not cancellation.missions.reserve(conversation_id):
+        raise HTTPException(status_code=409, detail="A mission is already queued or running for this conversation")
+
+
+async def store_user_message(conversation_id: str, content: str):
+    """Add the message that starts a mission (titling the conversation on its first one)."""
     # Check if conversation exists
-    conversation = storage.storage.get_conversation(conversation_id)
+    conversation = await async_storage.storage.get_conversation_summary(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Check if this is the first message
-    is_first_message = len(conversation["messages"]) == 0
+    is_first_message = conversation["message_count"] == 0
 
     # Determine role based on session status
-    session_state = storage.storage.get_session_state(conversation_id)
+    session_state = await async_storage.storage.get_session_state(conversation_id)
     role = "human_chairman" if session_state and session_state.get("status") == "paused" else "user"
 
     # Add user message
-    storage.storage.add_user_message(conversation_id, request.content, role=role)
+    await async_storage.storage.add_user_message(conversation_id, content, role=role)
 
     # If this is the first message, generate a title
     if is_first_message:
-        title = await generate_conversation_title(request.content)
-        storage.storage.update_conversation_title(conversation_id, title)
+        title = await generate_conversation_title(content)
+        await async_storage.storage.update_conversation_title(conversation_id, title)
 
-    async def event_generator():
-        logs_to_send = []
-        def sync_log(msg):
-            print(f"[COUNCIL] {msg}")
-            logs_to_send.append(msg)
 
+@app.post("/api/conversations/{conversation_id}/message")
+async def send_message(conversation_id: str, request: SendMessageRequest, http_request: Request = None):
+    """
+    Send a message and run the council process using the Blueprint orchestrator.
+    Returns a streaming response with logs, stage results, and session state.
+    The mission runs for as long as this request does: when the client
+    disconnects it is cancelled, in-flight model calls included. POST
+    .../jobs runs it in the background instead.
+    """
+    reserve_conversation(conversation_id)
+    try:
+        await store_user_message(conversation_id, request.content)
+    except BaseException:
+        cancellation.missions.release(conversation_id)
+        raise
+
+    async def event_generator():
+        bus = EventBus.from_config()
+        # This stream's own mission, once registered; another stream may run one on the same conversation
+        started: List[cancellation.Mission] = []
+
+        async def run_council():
+            try:
+                await job_queue.run_mission(conversation_id, request.content, bus.publish,
+                                            cache_mode=request.cache_mode, on_begin=started.append)
+            except asyncio.CancelledError:
+                # Stopped on purpose; run_mission has published the 'cancelled' event
+                pass
+            except Exception as e:
+                print(f"[ERROR] {str(e)}")
+                bus.publish({"type": "error", "message": str(e)})
+            finally:
+                cancellation.missions.release(conversation_id)
+                bus.close()
+
+        async def watch_disconnect():
+            interval = float(cancellation.get_settings()["disconnect_poll_interval"])
+            while not await http_request.is_disconnected():
+                await asyncio.sleep(interval)
+            stop_council("client disconnected")
+
+        def stop_council(reason: str):
+            if council_task.done():
+                return
+            if started:
+                started[0].cancel(reason)
+            else:
+                # Not started yet
+                council_task.cancel()
+
+        council_task = asyncio.create_task(run_council())
+        watcher = asyncio.create_task(watch_disconnect()) if http_request is not None else None
         try:
-            # Run the council process via the orchestrator
-            stage1_results, stage2_results, stage3_result, metadata = await run_full_council(
-                request.content,
-                conversation_id=conversation_id,
-                log_callback=sync_log
-            )
+            async for event in bus.stream():
+                yield format_sse(event)
+            await council_task
+        finally:
+            # The stream ended early (client gone, or the server closing it): don't leave the mission running
+            if watcher is not None:
+                watcher.cancel()
+            stop_council("client disconnected")
+            # In case the council task was cancelled before it started
+            cancellation.missions.release(conversation_id)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+        }
+    )
 
-            # Send logs collected during execution
-            for log in logs_to_send:
-                yield f"data: {json.dumps({'type': 'log', 'message': log})}\n\n"
-            
-            # Send current session state (blueprint, task index, status)
-            session_state = storage.storage.get_session_state(conversation_id)
-            if session_state:
-                yield f"data: {json.dumps({'type': 'session_state', 'data': session_state})}\n\n"
-
-            # Send stage results
-            yield f"data: {json.dumps({'type': 'stage1_complete', 'data': stage1_results})}\n\n"
-            yield f"data: {json.dumps({'type': 'stage2_complete', 'data': stage2_results, 'metadata': metadata})}\n\n"
-            yield f"data: {json.dumps({'type': 'stage3_complete', 'data': stage3_result})}\n\n"
-
-            # Add assistant message to history
-            storage.storage.add_assistant_message(
-                conversation_id,
-                stage1_results,
-                stage2_results,
-                stage3_result,
-                metadata
-            )
 
-            # Handle Breakpoints
-            if session_state and session_state.get("status") == "paused":
-                yield f"data: {json.dumps({'type': 'human_input_required', 'reason': 'breakpoint'})}\n\n"
+@app.post("/api/conversations/{conversation_id}/cancel")
+async def cancel_mission(conversation_id: str):
+    """
+    Cancel the conversation's running mission, whether it streams to a
+    client or runs as a job. In-flight model calls are stopped; the audit log
+    records what was cancelled and the tokens that saved.
+    """
+    report = cancellation.missions.cancel(conversation_id, "cancel requested")
+    if report is None:
+        raise HTTPException(status_code=409, detail="No mission is running for this conversation")
+    return {"status": "cancelling", **report}
 
-            yield f"data: {json.dumps({'type': 'complete'})}\n\n"
 
-        except Exception as e:
-            print(f"[ERROR] {str(e)}")
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+@app.post("/api/conversations/{conversation_id}/jobs")
+async def submit_job(conversation_id: str, request: SendMessageRequest):
+    """
+    Send a message and queue its council mission as a background job.
+    Follow it with GET /api/jobs/{job_id}/events, from any tab and as often
+    as needed; the mission does not depend on that connection.
+    """
+    reserve_conversation(conversation_id)
+    try:
+        await store_user_message(conversation_id, request.content)
+        return await job_queue.job_queue.submit(conversation_id, request.content, cache_mode=request.cache_mode)
+    finally:
+        # From submit() on, the queued job holds the conversation
+        cancellation.missions.release(conversation_id)
+
+
+@app.get("/api/jobs")
+async def list_jobs(conversation_id: Optional[str] = None, status: Optional[str] = None, limit: int = 50):
+    """Jobs, newest first."""
+    return await async_storage.storage.list_jobs(conversation_id=conversation_id, status=status, limit=limit)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await async_storage.storage.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = await async_storage.storage.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await job_queue.job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+    return {"status": "cancelling", "id": job_id}
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, after: int = 0):
+    """
+    A job's events as SSE, each with a seq: those already published (after
+    the given seq) and then live ones until the job ends. Reconnect with
+    after=<last seq seen> to resume without duplicates.
+    """
+    if await async_storage.storage.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def event_generator():
+        async for event in job_queue.job_queue.attach(job_id, after=after):
+            yield format_sse(event)
 
     return StreamingResponse(
         event_generator(),
@@ -530,24 +880,26 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
 
 
 @app.post("/api/conversations/{conversation_id}/human-feedback")
-async def submit_human_feedback(conversation_id: str, request: HumanFeedbackRequest):
+async def submit_human_feedback(conversation_id: str, request: HumanFeedbackRequest, http_request: Request = None):
     """
     Submit human chairman feedback. If continue_discussion is True, 
     it triggers the council to proceed to the next task or reconsider.
     """
     print(f"[FEEDBACK] Received for {conversation_id}: {request.feedback}")
-    conversation = storage.storage.get_conversation(conversation_id)
+    conversation = await async_storage.storage.get_conversation_summary(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
     # Add human feedback to conversation
-    storage.storage.add_human_feedback(conversation_id, request.feedback, request.continue_discussion)
+    await async_storage.storage.add_human_feedback(conversation_id, request.feedback, request.continue_discussion)
 
     if not request.continue_discussion:
         return {"status": "feedback recorded", "continued": False}
 
     # If continuing, we use the same streaming logic as send_message
-    return await send_message(conversation_id, SendMessageRequest(content=f"Feedback from Chairman: {request.feedback}"))
+    return await send_message(
+        conversation_id, SendMessageRequest(content=f"Feedback from Chairman: {request.feedback}"), http_request
+    )
 
 
 class RatingRequest(BaseModel):
@@ -561,11 +913,11 @@ async def end_session(conversation_id: str, request: RatingRequest):
     if not (0 <= request.rating <= 5):
         raise HTTPException(status_code=400, detail="Rating must be between 0 and 5")
 
-    conversation = storage.storage.get_conversation(conversation_id)
+    conversation = await async_storage.storage.get_conversation_summary(conversation_id)
     if conversation is None:
         raise HTTPException(status_code=404, detail="Conversation not found")
 
-    storage.storage.end_session_with_rating(conversation_id, request.rating)
+    await async_storage.storage.end_session_with_rating(conversation_id, request.rating)
     return {"status": "session ended", "rating": request.rating}
 
 # API Keys Endpoints
@@ -581,7 +933,12 @@ class ApiKeyRequest(BaseModel):
 @app.get("/api/keys")
 async def list_api_keys():
     """List all API keys."""
-    return storage.storage.list_api_keys()
+    return await async_storage.storage.list_api_keys()
+
+@app.get("/api/keys/pool")
+async def get_key_pool():
+    """Per-key in-flight requests, picks and benching (after 402/429) since startup."""
+    return {"keys": key_pool.pool.snapshot()}
 
 @app.post("/api/keys")
 async def save_api_key(request: ApiKeyRequest):
@@ -606,25 +963,28 @@ async def save_api_key(request: ApiKeyRequest):
     # Auto-check OpenRouter limit if applicable
     if request.provider == "openrouter":
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                resp = await client.get("https://openrouter.ai/api/v1/key", headers={"Authorization": f"Bearer {request.key_value}"})
-                if resp.status_code == 200:
-                    data = resp.json().get("data", {})
-                    key_data["limit_amount"] = data.get("limit")
-                    key_data["limit_remaining"] = data.get("limit_remaining")
-                    key_data["usage_amount"] = data.get("usage")
-                    key_data["limit_reset"] = data.get("limit_reset")
+            resp = await http_client.request(
+                "GET",
+                "https://openrouter.ai/api/v1/key",
+                headers={"Authorization": f"Bearer {request.key_value}"},
+                timeout=10.0
+            )
+            if resp.status_code == 200:
+                data = resp.json().get("data", {})
+                key_data["limit_amount"] = data.get("limit")
+                key_data["limit_remaining"] = data.get("limit_remaining")
+                key_data["usage_amount"] = data.get("usage")
+                key_data["limit_reset"] = data.get("limit_reset")
         except Exception as e:
             print(f"Failed to check OpenRouter key: {e}")
 
-    new_id = storage.storage.save_api_key(key_data)
+    new_id = await async_storage.storage.save_api_key(key_data)
     return {"status": "success", "id": new_id, "data": key_data}
 
 @app.put("/api/keys/{key_id}")
 async def update_api_key(key_id: int, request: ApiKeyRequest):
     """Update an existing API key."""
-    existing = storage.storage.get_api_key(key_id)
+    existing = await async_storage.storage.get_api_key(key_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Key not found")
         
@@ -647,38 +1007,41 @@ async def update_api_key(key_id: int, request: ApiKeyRequest):
         else:
             key_data["label"] = key_val
 
-    storage.storage.save_api_key(key_data)
+    await async_storage.storage.save_api_key(key_data)
     return {"status": "success", "id": key_id}
 
 @app.delete("/api/keys/{key_id}")
 async def delete_api_key(key_id: int):
     """Delete an API key."""
-    storage.storage.delete_api_key(key_id)
+    await async_storage.storage.delete_api_key(key_id)
     return {"status": "success"}
 
 @app.post("/api/keys/{key_id}/check")
 async def check_api_key(key_id: int):
     """Check/Refresh an API key's status (OpenRouter only for now)."""
-    key = storage.storage.get_api_key(key_id)
+    key = await async_storage.storage.get_api_key(key_id)
     if not key:
         raise HTTPException(status_code=404, detail="Key not found")
         
     if key["provider"] == "openrouter":
         try:
-            import httpx
-            async with httpx.AsyncClient() as client:
-                resp = await client.get("https://openrouter.ai/api/v1/key", headers={"Authorization": f"Bearer {key['key_value']}"})
-                if resp.status_code == 200:
-                    data = resp.json().get("data", {})
-                    key["limit_amount"] = data.get("limit")
-                    key["limit_remaining"] = data.get("limit_remaining")
-                    key["usage_amount"] = data.get("usage")
-                    key["limit_reset"] = data.get("limit_reset")
-                    key["last_checked"] = datetime.utcnow().isoformat()
-                    storage.storage.save_api_key(key)
-                    return {"status": "success", "data": key}
-                else:
-                    return {"status": "error", "message": f"API returned {resp.status_code}"}
+            resp = await http_client.request(
+                "GET",
+                "https://openrouter.ai/api/v1/key",
+                headers={"Authorization": f"Bearer {key['key_value']}"},
+                timeout=10.0
+            )
+            if resp.status_code == 200:
+                data = resp.json().get("data", {})
+                key["limit_amount"] = data.get("limit")
+                key["limit_remaining"] = data.get("limit_remaining")
+                key["usage_amount"] = data.get("usage")
+                key["limit_reset"] = data.get("limit_reset")
+                key["last_checked"] = datetime.utcnow().isoformat()
+                await async_storage.storage.save_api_key(key)
+                return {"status": "success", "data": key}
+            else:
+                return {"status": "error", "message": f"API returned {resp.status_code}"}
         except Exception as e:
             return {"status": "error", "message": str(e)}
             
@@ -689,11 +1052,15 @@ async def check_api_key(key_id: int):
 @app.get("/api/admin/db/tables")
 async def list_db_tables():
     """List all tables in the database."""
-    conn = storage.storage.get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    tables = [row[0] for row in cursor.fetchall()]
-    conn.close()
+    def load_tables():
+        conn = storage.storage.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        tables = [row[0] for row in cursor.fetchall()]
+        conn.close()
+        return tables
+
+    tables = await async_storage.storage.run(load_tables)
     
     # Add virtual tables
     if os.path.exists("backend/all_models_dump.json"):
@@ -758,51 +1125,54 @@ async def get_table_content(
             raise HTTPException(status_code=500, detail=f"Error reading dump file: {str(e)}")
 
     # Regular SQLite Tables
-    conn = storage.storage.get_db_connection()
-    cursor = conn.cursor()
+    def read_table():
+        conn = storage.storage.get_db_connection()
+        cursor = conn.cursor()
     
-    # Safety check: ensure table exists to prevent injection via table_name
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-    if not cursor.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Table not found")
+        # Safety check: ensure table exists to prevent injection via table_name
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+        if not cursor.fetchone():
+            conn.close()
+            raise HTTPException(status_code=404, detail="Table not found")
         
-    # Prepare filter
-    where_clause = ""
-    filter_params = []
+        # Prepare filter
+        where_clause = ""
+        filter_params = []
     
-    if filter_column and filter_value is not None:
-        # Validate column name to prevent injection
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = [info[1] for info in cursor.fetchall()]
-        if filter_column not in columns:
-            conn.close()
-            raise HTTPException(status_code=400, detail=f"Column '{filter_column}' not found")
+        if filter_column and filter_value is not None:
+            # Validate column name to prevent injection
+            cursor.execute(f"PRAGMA table_info({table_name})")
+            columns = [info[1] for info in cursor.fetchall()]
+            if filter_column not in columns:
+                conn.close()
+                raise HTTPException(status_code=400, detail=f"Column '{filter_column}' not found")
             
-        where_clause = f"WHERE {filter_column} LIKE ?"
-        filter_params = [f"%{filter_value}%"]
+            where_clause = f"WHERE {filter_column} LIKE ?"
+            filter_params = [f"%{filter_value}%"]
 
-    # Get Data
-    offset = (page - 1) * page_size
-    query = f"SELECT * FROM {table_name} {where_clause} LIMIT ? OFFSET ?"
-    params = filter_params + [page_size, offset]
+        # Get Data
+        offset = (page - 1) * page_size
+        query = f"SELECT * FROM {table_name} {where_clause} LIMIT ? OFFSET ?"
+        params = filter_params + [page_size, offset]
     
-    cursor.execute(query, tuple(params))
-    rows = [dict(row) for row in cursor.fetchall()]
+        cursor.execute(query, tuple(params))
+        rows = [dict(row) for row in cursor.fetchall()]
     
-    # Get Count
-    count_query = f"SELECT COUNT(*) FROM {table_name} {where_clause}"
-    cursor.execute(count_query, tuple(filter_params))
-    total_count = cursor.fetchone()[0]
+        # Get Count
+        count_query = f"SELECT COUNT(*) FROM {table_name} {where_clause}"
+        cursor.execute(count_query, tuple(filter_params))
+        total_count = cursor.fetchone()[0]
     
-    conn.close()
-    return {
-        "data": rows,
-        "page": page,
-        "page_size": page_size,
-        "total_count": total_count,
-        "total_pages": (total_count + page_size - 1) // page_size if page_size > 0 else 1
-    }
+        conn.close()
+        return {
+            "data": rows,
+            "page": page,
+            "page_size": page_size,
+            "total_count": total_count,
+            "total_pages": (total_count + page_size - 1) // page_size if page_size > 0 else 1
+        }
+
+    return await async_storage.storage.run(read_table)
 
 @app.post("/api/admin/db/sql")
 async def execute_sql_query(query: dict):
@@ -811,16 +1181,19 @@ async def execute_sql_query(query: dict):
     if not sql.lower().startswith("select"):
         raise HTTPException(status_code=400, detail="Only SELECT queries are allowed")
         
-    conn = storage.storage.get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql)
-        rows = [dict(row) for row in cursor.fetchall()]
-        conn.close()
-        return {"data": rows, "count": len(rows)}
-    except Exception as e:
-        conn.close()
-        raise HTTPException(status_code=400, detail=str(e))
+    def run_query():
+        conn = storage.storage.get_db_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return {"data": rows, "count": len(rows)}
+        except Exception as e:
+            conn.close()
+            raise HTTPException(status_code=400, detail=str(e))
+
+    return await async_storage.storage.run(run_query)
 
 
 if __name__ == "__main__":
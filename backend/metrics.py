@@ -0,0 +1,84 @@
+"""In-process latency metrics used to tune quorum, hedging and timeouts."""
+
+import asyncio
+import math
+import time
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, List, Optional
+
+
+def percentile(samples: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile (p in 0..100) of a list of samples."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class LatencyRecorder:
+    """Keeps a rolling window of latency samples (seconds) per key."""
+
+    def __init__(self, max_samples: int = 500):
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.max_samples))
+
+    def record(self, key: str, seconds: float):
+        self._samples[key].append(seconds)
+
+    def count(self, key: str) -> int:
+        return len(self._samples.get(key, ()))
+
+    def percentile(self, key: str, p: float) -> Optional[float]:
+        return percentile(list(self._samples.get(key, ())), p)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            key: {
+                "count": len(samples),
+                "p50": percentile(list(samples), 50),
+                "p95": percentile(list(samples), 95),
+                "max": max(samples) if samples else None,
+            }
+            for key, samples in self._samples.items()
+        }
+
+
+# Wall-clock duration of each council stage (stage1, stage2, stage3)
+stage_latency = LatencyRecorder()
+
+# Response time of each individual model call, keyed by model id
+model_latency = LatencyRecorder()
+
+# Time spent queued in the rate limiter before a model call, keyed by model id
+rate_limit_wait = LatencyRecorder()
+
+# How late the event loop ran a timer; anything above ~0 means it was blocked
+event_loop_lag = LatencyRecorder()
+
+
+class LoopLagMonitor:
+    """Sleeps `interval` seconds in a loop and records how much later than that it woke up."""
+
+    def __init__(self, recorder: LatencyRecorder, interval: float = 0.25):
+        self.recorder = recorder
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.recorder.record("event_loop", max(0.0, time.monotonic() - started - self.interval))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor(event_loop_lag)
@@ -0,0 +1,41 @@
+"""
+One-shot migration: move inline audit_logs.raw_data into the compressed
+audit_blobs table, then VACUUM to give the space back.
+
+Usage:
+    python -m backend.migrate_audit_blobs [path/to/council.db]
+"""
+
+import sys
+
+from .config import DB_PATH
+from .storage import Storage
+
+
+def database_bytes(storage: Storage) -> int:
+    conn = storage.get_db_connection()
+    page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    conn.close()
+    return page_count * page_size
+
+
+def migrate(db_path: str) -> dict:
+    storage = Storage(db_path)
+    before = database_bytes(storage)
+    result = storage.migrate_audit_blobs()
+
+    conn = storage.get_db_connection()
+    conn.execute("VACUUM")
+    conn.close()
+    after = database_bytes(storage)
+    storage.close()
+    return {**result, "bytes_before": before, "bytes_after": after}
+
+
+if __name__ == "__main__":
+    path = sys.argv[1] if len(sys.argv) > 1 else DB_PATH
+    print(f"Migrating audit payloads in {path}...")
+    result = migrate(path)
+    print(f"Moved {result['rows']} payloads into {result['blobs']} blobs.")
+    print(f"Database size: {result['bytes_before'] / 1e6:.2f} MB -> {result['bytes_after'] / 1e6:.2f} MB")
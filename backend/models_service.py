@@ -1,37 +1,80 @@
 """Service for fetching model metadata and checking availability."""
 
-import httpx
 import asyncio
+import time
 from typing import List, Dict, Any, Optional
 from .config import OPENROUTER_API_KEY
+from . import config, http_client
 
 OPENROUTER_MODELS_URL = "https://openrouter.ai/api/v1/models"
 
 class ModelsService:
     def __init__(self):
         self.base_url = OPENROUTER_MODELS_URL
+        # Last good catalog: {"models": [...], "etag": str | None}
         self._cache = {}
         self._last_fetch = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _ttl(self) -> float:
+        settings = config.get_config().get("model_catalog", {}) or {}
+        return float(settings.get("ttl_seconds", config.DEFAULT_CONFIG["model_catalog"]["ttl_seconds"]))
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _is_fresh(self) -> bool:
+        return bool(self._cache) and self._last_fetch > 0 and time.monotonic() - self._last_fetch < self._ttl()
+
+    def invalidate(self):
+        """Force the next call to revalidate the catalog with OpenRouter."""
+        self._last_fetch = 0
+
+    async def fetch_model_metadata(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Fetch all available models and their metadata from OpenRouter.
+        The catalog is cached for model_catalog.ttl_seconds; once stale it is
+        revalidated with If-None-Match, so an unchanged catalog costs a 304.
+        Concurrent callers share a single download, and the last good catalog
+        is served if OpenRouter cannot be reached.
+        """
+        if not force_refresh and self._is_fresh():
+            return list(self._cache["models"])
+
+        async with self._get_lock():
+            # Another caller may have refreshed the catalog while we waited
+            if not force_refresh and self._is_fresh():
+                return list(self._cache["models"])
+
+            headers = {}
+            if self._cache.get("etag"):
+                headers["If-None-Match"] = self._cache["etag"]
 
-    async def fetch_model_metadata(self) -> List[Dict[str, Any]]:
-        """Fetch all available models and their metadata from OpenRouter."""
-        async with httpx.AsyncClient() as client:
             try:
-                response = await client.get(self.base_url)
+                response = await http_client.request("GET", self.base_url, headers=headers, timeout=30.0)
+                if response.status_code == 304 and self._cache:
+                    self._last_fetch = time.monotonic()
+                    return list(self._cache["models"])
+
                 response.raise_for_status()
                 data = response.json()
                 models = data.get("data", [])
-                
+
                 # Add a 'free' flag and capabilities for easier filtering/display in frontend
                 for m in models:
                     pricing = m.get("pricing", {})
                     # Some models are free, check for "0" or 0.0
                     m["free"] = (
-                        pricing.get("prompt") == "0" or 
-                        pricing.get("prompt") == 0 or 
+                        pricing.get("prompt") == "0" or
+                        pricing.get("prompt") == 0 or
                         ":free" in m.get("id", "").lower()
                     )
-                    
+
                     # Add capabilities
                     desc = m.get("description", "").lower()
                     name = m.get("name", "").lower()
@@ -40,10 +83,13 @@ class ModelsService:
                         "tools": "tool" in desc or "function calling" in desc,
                         "vision": "vision" in desc or "vl" in m["id"].lower() or "multimodal" in desc
                     }
-                return models
+
+                self._cache = {"models": models, "etag": response.headers.get("etag")}
+                self._last_fetch = time.monotonic()
+                return list(models)
             except Exception as e:
                 print(f"Error fetching model metadata: {e}")
-                return []
+                return list(self._cache.get("models", []))
 
     async def check_model_availability(self, model_id: str) -> bool:
         """Check if a specific model is currently responsive."""
@@ -1,8 +1,32 @@
 """OpenRouter API client for making LLM requests."""
 
-import httpx
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, AsyncIterator, Callable
 from .config import OPENROUTER_API_KEY, OPENROUTER_API_URL
+from . import http_client, response_cache, single_flight, resilience, rate_limiter, key_pool
+
+
+def _error_details(error: Exception):
+    """Status code and headers of a failed HTTP response, or (None, None) for network errors."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None, None
+    return response.status_code, response.headers
+
+
+def _record_final_failure(breaker: "resilience.CircuitBreaker", policy: "resilience.RetryPolicy", status, error: Exception):
+    """Transient failures count against the model; client errors (bad request, auth) do not."""
+    if policy.is_retryable(status):
+        breaker.record_failure(str(error))
+    else:
+        breaker.release_probe()
+
+
+def _replacement_key(key_to_use: str, model: str, status, headers) -> Optional[str]:
+    """On 402/429 bench the key and return another one to fail over to, if any."""
+    if status not in key_pool.KEY_EXHAUSTED_STATUS or not key_to_use:
+        return None
+    return key_pool.pool.replacement(key_to_use, model, status, headers)
 
 
 async def query_model(
@@ -10,11 +34,38 @@ async def query_model(
     messages: List[Dict[str, str]],
     timeout: float = 120.0,
     max_retries: int = 2,
-    api_key: Optional[str] = None
+    api_key: Optional[str] = None,
+    cache_mode: Optional[str] = None
 ) -> Optional[Dict[str, Any]]:
     """
     Query a single model via OpenRouter API with retries for rate limits.
+    Backoff follows resilience.RetryPolicy and calls fail fast while the
+    model's circuit breaker is open. Each attempt waits its turn in the
+    (api key, model) rate limiter; a key answering 402/429 is benched and
+    the retry fails over to another eligible key. cache_mode (off/read_through/replay_only) overrides the conversation's
+    response cache mode for this call. Identical concurrent calls share one
+    upstream request.
     """
+    key = response_cache.cache_key(model, messages)
+
+    async def call():
+        if not single_flight.enabled():
+            return await _query_model(model, messages, timeout, max_retries, api_key)
+        return await single_flight.flights.do(
+            ("complete", key),
+            lambda emit: _query_model(model, messages, timeout, max_retries, api_key)
+        )
+
+    return await response_cache.through_cache(model, messages, call, mode=cache_mode, key=key)
+
+
+async def _query_model(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float,
+    max_retries: int,
+    api_key: Optional[str]
+) -> Optional[Dict[str, Any]]:
     key_to_use = api_key if api_key else OPENROUTER_API_KEY
     
     headers = {
@@ -28,47 +79,228 @@ async def query_model(
     }
 
     import asyncio
-    
-    for attempt in range(max_retries + 1):
+
+    breaker = resilience.breakers.get(model)
+    if not breaker.allow():
+        print(f"Circuit open for {model}. Failing fast.")
+        return None
+
+    policy = resilience.RetryPolicy.from_config(max_retries)
+    delay = policy.base_delay
+    for attempt in range(policy.max_retries + 1):
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(
+            await rate_limiter.limiter.acquire(key_to_use, model)
+            with key_pool.pool.lease(key_to_use):
+                response = await http_client.request(
+                    "POST",
                     OPENROUTER_API_URL,
                     headers=headers,
-                    json=payload
+                    json=payload,
+                    timeout=timeout
                 )
-                
-                if response.status_code == 429:
-                    if attempt < max_retries:
-                        wait_time = (attempt + 1) * 2
-                        print(f"Rate limited (429) for {model}. Retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
-                
-                response.raise_for_status()
+            rate_limiter.limiter.observe(key_to_use, model, response.headers, response.status_code)
+            response.raise_for_status()
+
+            data = response.json()
+            message = data['choices'][0]['message']
+            usage = data.get('usage', {})
 
-                data = response.json()
-                message = data['choices'][0]['message']
-                usage = data.get('usage', {})
-
-                return {
-                    'content': message.get('content'),
-                    'reasoning_details': message.get('reasoning_details'),
-                    'usage': {
-                        'prompt_tokens': usage.get('prompt_tokens', 0),
-                        'completion_tokens': usage.get('completion_tokens', 0),
-                        'total_tokens': usage.get('total_tokens', 0)
-                    }
+            breaker.record_success()
+            return {
+                'content': message.get('content'),
+                'reasoning_details': message.get('reasoning_details'),
+                'usage': {
+                    'prompt_tokens': usage.get('prompt_tokens', 0),
+                    'completion_tokens': usage.get('completion_tokens', 0),
+                    'total_tokens': usage.get('total_tokens', 0)
                 }
+            }
 
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
         except Exception as e:
-            if attempt < max_retries:
-                print(f"Error querying model {model} (attempt {attempt+1}): {e}. Retrying...")
-                await asyncio.sleep(1)
+            status, response_headers = _error_details(e)
+            replacement = _replacement_key(key_to_use, model, status, response_headers)
+            if attempt < policy.max_retries and replacement:
+                print(f"Key {rate_limiter.key_label(key_to_use)} returned {status} for {model}. Switching key.")
+                key_to_use = replacement
+                headers["Authorization"] = f"Bearer {key_to_use}"
+                continue
+            if attempt < policy.max_retries and policy.is_retryable(status):
+                delay = policy.next_delay(delay, response_headers)
+                print(f"Error querying model {model} (attempt {attempt+1}): {e}. Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
                 continue
             print(f"Final error querying model {model}: {e}")
+            _record_final_failure(breaker, policy, status, e)
             return None
-    
+
+    return None
+
+
+async def query_model_stream(
+    model: str,
+    messages: List[Dict[str, str]],
+    timeout: float = 120.0,
+    api_key: Optional[str] = None
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream a completion via OpenRouter's `stream: true` SSE format.
+
+    Yields {"content": str} and {"reasoning": str} deltas as they arrive and a
+    final {"usage": {...}} chunk. Raises on HTTP or mid-stream errors.
+    Waits for the (api key, model) rate limiter before connecting.
+    """
+    key_to_use = api_key if api_key else OPENROUTER_API_KEY
+
+    headers = {
+        "Authorization": f"Bearer {key_to_use}",
+        "Content-Type": "application/json",
+        "Accept": "text/event-stream",
+    }
+
+    payload = {
+        "model": model,
+        "messages": messages,
+        "stream": True,
+        "usage": {"include": True},
+    }
+
+    await rate_limiter.limiter.acquire(key_to_use, model)
+    with key_pool.pool.lease(key_to_use):
+        async with http_client.stream(
+            "POST",
+            OPENROUTER_API_URL,
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        ) as response:
+            rate_limiter.limiter.observe(key_to_use, model, response.headers, response.status_code)
+            if response.status_code >= 400:
+                await response.aread()
+                response.raise_for_status()
+
+            async for line in response.aiter_lines():
+                # Blank lines separate events; lines starting with ':' are keep-alive comments
+                if not line or line.startswith(":") or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+
+                chunk = json.loads(data)
+                if "error" in chunk:
+                    raise RuntimeError(f"Stream error from {model}: {chunk['error'].get('message', chunk['error'])}")
+
+                for choice in chunk.get("choices", []):
+                    delta = choice.get("delta", {})
+                    if delta.get("reasoning"):
+                        yield {"reasoning": delta["reasoning"]}
+                    if delta.get("content"):
+                        yield {"content": delta["content"]}
+
+                if chunk.get("usage"):
+                    yield {"usage": chunk["usage"]}
+
+
+async def query_model_streaming(
+    model: str,
+    messages: List[Dict[str, str]],
+    on_delta: Callable[[str], None],
+    timeout: float = 120.0,
+    max_retries: int = 2,
+    api_key: Optional[str] = None,
+    cache_mode: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Query a model with token streaming, forwarding each content delta to
+    on_delta. Returns the same shape as query_model once the stream ends.
+    Retries only if nothing has been forwarded yet. A cached response is
+    forwarded to on_delta as a single delta; callers joining an identical
+    in-flight stream receive its deltas from the start.
+    """
+    key = response_cache.cache_key(model, messages)
+
+    async def call():
+        if not single_flight.enabled():
+            return await _query_model_streaming(model, messages, on_delta, timeout, max_retries, api_key)
+        return await single_flight.flights.do(
+            ("stream", key),
+            lambda emit: _query_model_streaming(model, messages, emit, timeout, max_retries, api_key),
+            on_delta=on_delta
+        )
+
+    return await response_cache.through_cache(
+        model, messages, call,
+        mode=cache_mode,
+        on_hit=lambda cached: on_delta(cached.get("content") or ""),
+        key=key
+    )
+
+
+async def _query_model_streaming(
+    model: str,
+    messages: List[Dict[str, str]],
+    on_delta: Callable[[str], None],
+    timeout: float,
+    max_retries: int,
+    api_key: Optional[str]
+) -> Optional[Dict[str, Any]]:
+    import asyncio
+
+    breaker = resilience.breakers.get(model)
+    if not breaker.allow():
+        print(f"Circuit open for {model}. Failing fast.")
+        return None
+
+    key_to_use = api_key if api_key else OPENROUTER_API_KEY
+    policy = resilience.RetryPolicy.from_config(max_retries)
+    delay = policy.base_delay
+    for attempt in range(policy.max_retries + 1):
+        content_parts = []
+        reasoning_parts = []
+        usage = {}
+        try:
+            async for chunk in query_model_stream(model, messages, timeout=timeout, api_key=key_to_use):
+                if "content" in chunk:
+                    content_parts.append(chunk["content"])
+                    on_delta(chunk["content"])
+                elif "reasoning" in chunk:
+                    reasoning_parts.append(chunk["reasoning"])
+                elif "usage" in chunk:
+                    usage = chunk["usage"]
+
+            breaker.record_success()
+            return {
+                'content': "".join(content_parts),
+                'reasoning_details': "".join(reasoning_parts) or None,
+                'usage': {
+                    'prompt_tokens': usage.get('prompt_tokens', 0),
+                    'completion_tokens': usage.get('completion_tokens', 0),
+                    'total_tokens': usage.get('total_tokens', 0)
+                }
+            }
+
+        except asyncio.CancelledError:
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            status, response_headers = _error_details(e)
+            replacement = _replacement_key(key_to_use, model, status, response_headers)
+            if attempt < policy.max_retries and not content_parts and replacement:
+                print(f"Key {rate_limiter.key_label(key_to_use)} returned {status} for {model}. Switching key.")
+                key_to_use = replacement
+                continue
+            if attempt < policy.max_retries and not content_parts and policy.is_retryable(status):
+                delay = policy.next_delay(delay, response_headers)
+                print(f"Error streaming model {model} (attempt {attempt+1}): {e}. Retrying in {delay:.1f}s...")
+                await asyncio.sleep(delay)
+                continue
+            print(f"Final error streaming model {model}: {e}")
+            _record_final_failure(breaker, policy, status, e)
+            return None
+
     return None
 
 
@@ -111,74 +343,75 @@ async def get_available_models() -> List[Dict[str, Any]]:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                "https://openrouter.ai/api/v1/models",
-                headers=headers
-            )
-            response.raise_for_status()
+        response = await http_client.request(
+            "GET",
+            "https://openrouter.ai/api/v1/models",
+            headers=headers,
+            timeout=30.0
+        )
+        response.raise_for_status()
 
-            data = response.json()
-            models = []
+        data = response.json()
+        models = []
 
-            for model in data.get('data', []):
-                model_id = model.get('id', '')
-                name = model.get('name', model_id)
+        for model in data.get('data', []):
+            model_id = model.get('id', '')
+            name = model.get('name', model_id)
 
-                # Extract pricing - OpenRouter returns pricing per token
-                pricing = model.get('pricing', {})
-                prompt_price = pricing.get('prompt')
-                completion_price = pricing.get('completion')
+            # Extract pricing - OpenRouter returns pricing per token
+            pricing = model.get('pricing', {})
+            prompt_price = pricing.get('prompt')
+            completion_price = pricing.get('completion')
 
-                # Ensure prices are numeric (handle None, str cases)
-                try:
-                    prompt_price = float(prompt_price) if prompt_price is not None else 0
-                except (ValueError, TypeError):
-                    prompt_price = 0
+            # Ensure prices are numeric (handle None, str cases)
+            try:
+                prompt_price = float(prompt_price) if prompt_price is not None else 0
+            except (ValueError, TypeError):
+                prompt_price = 0
 
-                try:
-                    completion_price = float(completion_price) if completion_price is not None else 0
-                except (ValueError, TypeError):
-                    completion_price = 0
+            try:
+                completion_price = float(completion_price) if completion_price is not None else 0
+            except (ValueError, TypeError):
+                completion_price = 0
 
-                # Determine if free - only true if both prices are exactly 0 (not negative)
-                is_free = prompt_price == 0 and completion_price == 0
+            # Determine if free - only true if both prices are exactly 0 (not negative)
+            is_free = prompt_price == 0 and completion_price == 0
 
-                # Format cost display
-                if is_free:
-                    cost_display = "(FREE)"
-                else:
-                    # Show prompt price per million tokens, formatted nicely
-                    if prompt_price > 0:
-                        # Convert from per-token to per-million tokens
-                        cost_per_million = prompt_price * 1000000
-                        if cost_per_million >= 0.01:
-                            cost_str = f"${cost_per_million:.2f}"
-                        elif cost_per_million >= 0.001:
-                            cost_str = f"${cost_per_million:.3f}"
-                        elif cost_per_million >= 0.0001:
-                            cost_str = f"${cost_per_million:.4f}"
-                        else:
-                            # For very small amounts, show more precision but remove trailing zeros
-                            cost_str = f"${cost_per_million:.6f}".rstrip('0').rstrip('.')
-                        cost_display = f"({cost_str}/mT)"
-                    elif prompt_price < 0:
-                        # Handle negative prices (likely errors or special cases)
-                        cost_display = "(ERROR)"
+            # Format cost display
+            if is_free:
+                cost_display = "(FREE)"
+            else:
+                # Show prompt price per million tokens, formatted nicely
+                if prompt_price > 0:
+                    # Convert from per-token to per-million tokens
+                    cost_per_million = prompt_price * 1000000
+                    if cost_per_million >= 0.01:
+                        cost_str = f"${cost_per_million:.2f}"
+                    elif cost_per_million >= 0.001:
+                        cost_str = f"${cost_per_million:.3f}"
+                    elif cost_per_million >= 0.0001:
+                        cost_str = f"${cost_per_million:.4f}"
                     else:
-                        cost_display = "(FREE)"
-
-                models.append({
-                    'id': model_id,
-                    'name': f"{name} {cost_display}",
-                    'free': is_free,
-                    'pricing': {
-                        'prompt': prompt_price,
-                        'completion': completion_price
-                    }
-                })
-
-            return models
+                        # For very small amounts, show more precision but remove trailing zeros
+                        cost_str = f"${cost_per_million:.6f}".rstrip('0').rstrip('.')
+                    cost_display = f"({cost_str}/mT)"
+                elif prompt_price < 0:
+                    # Handle negative prices (likely errors or special cases)
+                    cost_display = "(ERROR)"
+                else:
+                    cost_display = "(FREE)"
+
+            models.append({
+                'id': model_id,
+                'name': f"{name} {cost_display}",
+                'free': is_free,
+                'pricing': {
+                    'prompt': prompt_price,
+                    'completion': completion_price
+                }
+            })
+
+        return models
 
     except Exception as e:
         print(f"Error fetching models from OpenRouter: {e}")
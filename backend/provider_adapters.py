@@ -81,105 +81,106 @@ class OpenRouterAdapter(BaseProviderAdapter):
     
     async def fetch_models(self) -> List[Dict[str, Any]]:
         """Fetch all models from OpenRouter, including provider-specific endpoints."""
-        import httpx
         import asyncio
+        from . import http_client
         
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            # 1. Fetch base models
-            response = await client.get(
-                f"{self.base_url}/models",
-                headers=headers
-            )
-            response.raise_for_status()
-            base_models = response.json().get("data", [])
-            
-            # 2. Fetch endpoints for each model
-            # Use a semaphore to limit concurrency and avoid rate limits
-            semaphore = asyncio.Semaphore(10)
-            
-            async def fetch_endpoint(model):
-                if isinstance(model, str):
-                    print(f"WARNING: model is string: {model}")
-                    return {}, []
-                model_id = model.get("id")
-                # Skip if model_id is missing
-                if not model_id:
-                    return model, []
-                    
-                url = f"{self.base_url}/models/{model_id}/endpoints"
-                async with semaphore:
-                    try:
-                        resp = await client.get(url, headers=headers)
-                        if resp.status_code == 200:
-                            data = resp.json()
-                            return model, data.get("data", [])
-                    except Exception as e:
-                        # Silently fail for individual endpoint fetch
-                        # print(f"Error fetching endpoint for {model_id}: {e}")
-                        pass
+        # 1. Fetch base models
+        response = await http_client.request(
+            "GET",
+            f"{self.base_url}/models",
+            headers=headers,
+            timeout=60.0
+        )
+        response.raise_for_status()
+        base_models = response.json().get("data", [])
+        
+        # 2. Fetch endpoints for each model
+        # Use a semaphore to limit concurrency and avoid rate limits
+        semaphore = asyncio.Semaphore(10)
+        
+        async def fetch_endpoint(model):
+            if isinstance(model, str):
+                print(f"WARNING: model is string: {model}")
+                return {}, []
+            model_id = model.get("id")
+            # Skip if model_id is missing
+            if not model_id:
                 return model, []
+                
+            url = f"{self.base_url}/models/{model_id}/endpoints"
+            async with semaphore:
+                try:
+                    resp = await http_client.request("GET", url, headers=headers, timeout=60.0)
+                    if resp.status_code == 200:
+                        data = resp.json()
+                        return model, data.get("data", [])
+                except Exception as e:
+                    # Silently fail for individual endpoint fetch
+                    # print(f"Error fetching endpoint for {model_id}: {e}")
+                    pass
+            return model, []
+        
+        tasks = [fetch_endpoint(m) for m in base_models]
+        results = await asyncio.gather(*tasks)
+        
+        all_models = []
+        for base_model, endpoints in results:
+            if not isinstance(base_model, dict):
+                continue
+                
+            # Add base model (Routed)
+            all_models.append(base_model)
             
-            tasks = [fetch_endpoint(m) for m in base_models]
-            results = await asyncio.gather(*tasks)
-            
-            all_models = []
-            for base_model, endpoints in results:
-                if not isinstance(base_model, dict):
+            # Add specific endpoints
+            if isinstance(endpoints, dict):
+                print(f"DEBUG: endpoints is dict for {base_model.get('id')}: keys={list(endpoints.keys())}")
+                # Try to see if it's wrapped
+                if "data" in endpoints and isinstance(endpoints["data"], dict) and "endpoints" in endpoints["data"]:
+                    endpoints = endpoints["data"]["endpoints"]
+                elif "endpoints" in endpoints:
+                     endpoints = endpoints["endpoints"]
+                elif "data" in endpoints:
+                     endpoints = endpoints["data"] # Fallback to previous logic if data is list
+                else:
+                     # Treat as single endpoint? or just error?
+                     endpoints = [endpoints]
+
+            for ep in endpoints:
+                if isinstance(ep, str):
+                    print(f"WARNING: endpoint is string: {ep}")
                     continue
                     
-                # Add base model (Routed)
-                all_models.append(base_model)
+                # Create a copy of base model and update with endpoint data
+                new_model = base_model.copy()
                 
-                # Add specific endpoints
-                if isinstance(endpoints, dict):
-                    print(f"DEBUG: endpoints is dict for {base_model.get('id')}: keys={list(endpoints.keys())}")
-                    # Try to see if it's wrapped
-                    if "data" in endpoints and isinstance(endpoints["data"], dict) and "endpoints" in endpoints["data"]:
-                        endpoints = endpoints["data"]["endpoints"]
-                    elif "endpoints" in endpoints:
-                         endpoints = endpoints["endpoints"]
-                    elif "data" in endpoints:
-                         endpoints = endpoints["data"] # Fallback to previous logic if data is list
-                    else:
-                         # Treat as single endpoint? or just error?
-                         endpoints = [endpoints]
-
-                for ep in endpoints:
-                    if isinstance(ep, str):
-                        print(f"WARNING: endpoint is string: {ep}")
-                        continue
-                        
-                    # Create a copy of base model and update with endpoint data
-                    new_model = base_model.copy()
-                    
-                    provider_name = ep.get("provider_name", "Unknown")
-                    # Sanitize provider name for ID suffix
-                    safe_provider = provider_name.replace(" ", "_").replace("/", "_")
-                    
-                    # Construct new unique ID: original_id:ProviderName
-                    new_model["id"] = f"{base_model['id']}:{safe_provider}"
-                    
-                    # Update name (e.g. "DeepInfra | openai/gpt-oss-120b")
-                    new_model["name"] = ep.get("name", f"{provider_name} | {base_model['name']}")
-                    
-                    # Update pricing and technical details from endpoint
-                    new_model["pricing"] = ep.get("pricing", base_model.get("pricing", {}))
-                    new_model["context_length"] = ep.get("context_length", base_model.get("context_length", 0))
-                    
-                    # Store override for normalize
-                    new_model["hosting_provider_override"] = provider_name
-                    
-                    # Store endpoint raw data for debugging/future use
-                    new_model["endpoint_data"] = ep
-                    
-                    all_models.append(new_model)
-                    
-            return all_models
+                provider_name = ep.get("provider_name", "Unknown")
+                # Sanitize provider name for ID suffix
+                safe_provider = provider_name.replace(" ", "_").replace("/", "_")
+                
+                # Construct new unique ID: original_id:ProviderName
+                new_model["id"] = f"{base_model['id']}:{safe_provider}"
+                
+                # Update name (e.g. "DeepInfra | openai/gpt-oss-120b")
+                new_model["name"] = ep.get("name", f"{provider_name} | {base_model['name']}")
+                
+                # Update pricing and technical details from endpoint
+                new_model["pricing"] = ep.get("pricing", base_model.get("pricing", {}))
+                new_model["context_length"] = ep.get("context_length", base_model.get("context_length", 0))
+                
+                # Store override for normalize
+                new_model["hosting_provider_override"] = provider_name
+                
+                # Store endpoint raw data for debugging/future use
+                new_model["endpoint_data"] = ep
+                
+                all_models.append(new_model)
+                
+        return all_models
     
     async def fetch_latencies(self, model_ids: List[str]) -> Dict[str, float]:
         """Fetch latency data from OpenRouter models endpoint."""
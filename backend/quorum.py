@@ -0,0 +1,108 @@
+"""Quorum-based early completion for parallel council stages."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import config
+
+
+@dataclass
+class QuorumPolicy:
+    """
+    Finish a stage once `min_responses` successful answers are in, then wait
+    at most `grace_seconds` for the rest. Stragglers are cancelled
+    (late_policy="cancel") or left running so their answers can still be
+    recorded in the audit log (late_policy="record").
+    """
+    enabled: bool = False
+    min_responses: int = 0  # 0 means "all of them"
+    grace_seconds: float = 10.0
+    late_policy: str = "cancel"
+
+    @classmethod
+    def from_config(cls, stage: str) -> "QuorumPolicy":
+        """Read config['quorum'], letting a per-stage block (e.g. 'stage1') override the shared values."""
+        settings = config.get_config().get("quorum", {}) or {}
+        settings = {**settings, **(settings.get(stage) or {})}
+        return cls(**{k: v for k, v in settings.items() if k in cls.__dataclass_fields__})
+
+    def required(self, total: int) -> int:
+        if not self.enabled or self.min_responses <= 0:
+            return total
+        return min(self.min_responses, total)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "min_responses": self.min_responses,
+            "grace_seconds": self.grace_seconds,
+            "late_policy": self.late_policy,
+        }
+
+
+@dataclass
+class QuorumOutcome:
+    """Results in input order; entries for stragglers are None and listed in `late`."""
+    results: List[Optional[Any]]
+    late: List[int] = field(default_factory=list)
+    elapsed: float = 0.0
+    quorum_elapsed: Optional[float] = None
+
+
+async def gather_with_quorum(
+    coros: List[Awaitable[Any]],
+    policy: QuorumPolicy,
+    on_late_result: Optional[Callable[[int, Any, float], None]] = None
+) -> QuorumOutcome:
+    """
+    Run coroutines concurrently and return once the quorum (plus grace) is met.
+    A result of None counts as a failed response and does not count toward the quorum.
+    on_late_result(index, result, elapsed) fires for stragglers that finish later
+    when late_policy is "record".
+    """
+    start = time.monotonic()
+    tasks = [asyncio.ensure_future(c) for c in coros]
+    index_of = {task: i for i, task in enumerate(tasks)}
+    results: List[Optional[Any]] = [None] * len(tasks)
+    required = policy.required(len(tasks))
+
+    pending = set(tasks)
+    successes = 0
+    quorum_elapsed = None
+    try:
+        while pending and successes < required:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                results[index_of[task]] = result
+                if result is not None:
+                    successes += 1
+
+        if pending:
+            quorum_elapsed = time.monotonic() - start
+            done, pending = await asyncio.wait(pending, timeout=policy.grace_seconds)
+            for task in done:
+                results[index_of[task]] = task.result()
+    except BaseException:
+        for task in pending:
+            task.cancel()
+        raise
+
+    late = sorted(index_of[task] for task in pending)
+    for task in pending:
+        if policy.late_policy == "record" and on_late_result:
+            def report(t, i=index_of[task]):
+                if not t.cancelled() and t.exception() is None:
+                    on_late_result(i, t.result(), time.monotonic() - start)
+            task.add_done_callback(report)
+        else:
+            task.cancel()
+
+    return QuorumOutcome(
+        results=results,
+        late=late,
+        elapsed=time.monotonic() - start,
+        quorum_elapsed=quorum_elapsed
+    )
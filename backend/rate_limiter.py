@@ -0,0 +1,184 @@
+"""Process-wide token-bucket rate limiting per (API key, model)."""
+
+import asyncio
+import time
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from . import config, metrics
+from .resilience import retry_after_seconds
+
+
+def _settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["rate_limits"], **(config.get_config().get("rate_limits") or {})}
+
+
+def configured_limit(model: str) -> Tuple[float, Optional[int]]:
+    """(requests per minute, burst) from config; 0 rpm means unlimited."""
+    settings = _settings()
+    limits = (settings.get("models") or {}).get(model)
+    if limits is None and ":free" in model:
+        limits = settings.get("free_models")
+    if limits is None:
+        limits = settings.get("default") or {}
+    return float(limits.get("requests_per_minute") or 0), limits.get("burst")
+
+
+def key_label(api_key: Optional[str]) -> str:
+    """Identify a key in metrics without exposing it."""
+    if not api_key:
+        return "default"
+    return f"...{api_key[-4:]}"
+
+
+class TokenBucket:
+    """
+    A bucket of `capacity` request tokens refilled at `rate` per second.
+    Waiters are served strictly first-come first-served (asyncio.Lock is
+    FIFO), so one burst cannot starve another conversation.
+    """
+
+    def __init__(self, model: str, rate: float = 0.0, capacity: Optional[float] = None):
+        self.model = model
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate * 60)
+        self.tokens = self.capacity
+        self.learned = False
+        self.configured: Optional[Tuple[float, Optional[int]]] = None
+        self.blocked_until = 0.0
+        self.updated_at = time.monotonic()
+        self.waiting = 0
+        self.max_waiting = 0
+        self.acquired = 0
+        self.throttled = 0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def set_limit(self, requests_per_minute: float, burst: Optional[float] = None):
+        """0 requests per minute makes the bucket unlimited."""
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst or max(1.0, requests_per_minute))
+        self.tokens = min(self.tokens, self.capacity)
+
+    def _refill(self, now: float):
+        if self.rate > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _delay(self, now: float) -> float:
+        """Seconds until a token can be taken (0 = take it now)."""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.rate <= 0 or self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting."""
+        started = time.monotonic()
+        self.waiting += 1
+        self.max_waiting = max(self.max_waiting, self.waiting)
+        try:
+            async with self._get_lock():
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    delay = self._delay(now)
+                    if delay <= 0:
+                        break
+                    await asyncio.sleep(delay)
+                if self.rate > 0:
+                    self.tokens -= 1
+        finally:
+            self.waiting -= 1
+
+        waited = time.monotonic() - started
+        self.acquired += 1
+        if waited > 0.001:
+            self.throttled += 1
+        return waited
+
+    def observe(self, headers: Mapping[str, str], status_code: Optional[int] = None):
+        """Learn from X-RateLimit-* headers and back off after a 429."""
+        now = time.monotonic()
+        limit = headers.get("x-ratelimit-limit")
+        if limit and not configured_limit(self.model)[0]:
+            try:
+                self.set_limit(float(limit))
+                self.learned = True
+            except ValueError:
+                pass
+
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is not None:
+            try:
+                self._refill(now)
+                self.tokens = min(self.tokens, float(remaining))
+            except ValueError:
+                pass
+
+        wait = retry_after_seconds(headers) if (status_code == 429 or remaining == "0") else None
+        if wait is not None:
+            self.blocked_until = max(self.blocked_until, now + wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "requests_per_minute": round(self.rate * 60, 3) if self.rate > 0 else None,
+            "burst": self.capacity if self.rate > 0 else None,
+            "learned_from_headers": self.learned,
+            "tokens": round(self.tokens, 3) if self.rate > 0 else None,
+            "blocked_for_seconds": max(0.0, self.blocked_until - time.monotonic()),
+            "queue_depth": self.waiting,
+            "max_queue_depth": self.max_waiting,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+        }
+
+
+class RateLimiter:
+    """One TokenBucket per (API key, model)."""
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def bucket(self, api_key: Optional[str], model: str) -> TokenBucket:
+        key = (api_key or "", model)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(model)
+            self._buckets[key] = bucket
+        # An explicit config limit wins over one learned from headers
+        limit = configured_limit(model)
+        if bucket.configured != limit and (limit[0] or not bucket.learned):
+            bucket.configured = limit
+            bucket.learned = False
+            bucket.set_limit(*limit)
+        return bucket
+
+    async def acquire(self, api_key: Optional[str], model: str):
+        """Wait for permission to send one request."""
+        if not _settings().get("enabled", True):
+            return
+        waited = await self.bucket(api_key, model).acquire()
+        metrics.rate_limit_wait.record(model, waited)
+
+    def observe(self, api_key: Optional[str], model: str, headers: Mapping[str, str], status_code: Optional[int] = None):
+        if headers is not None and _settings().get("enabled", True):
+            self.bucket(api_key, model).observe(headers, status_code)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{key_label(api_key)} {model}": bucket.snapshot()
+            for (api_key, model), bucket in self._buckets.items()
+        }
+
+
+# Global instance
+limiter = RateLimiter()
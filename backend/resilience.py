@@ -0,0 +1,197 @@
+"""Retry policy and per-model circuit breakers for upstream model calls."""
+
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+
+from . import config
+
+# Status codes worth retrying; other 4xx responses will not succeed on a retry
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _settings(name: str) -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG[name], **(config.get_config().get(name) or {})}
+
+
+def retry_after_seconds(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds the server asked us to wait, from Retry-After (seconds or HTTP
+    date) or X-RateLimit-Reset (epoch seconds or milliseconds).
+    """
+    now = time.time() if now is None else now
+    value = headers.get("retry-after")
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+            except (TypeError, ValueError):
+                pass
+
+    value = headers.get("x-ratelimit-reset")
+    if value:
+        try:
+            reset = float(value)
+        except ValueError:
+            return None
+        if reset > 1e12:  # OpenRouter reports milliseconds
+            reset /= 1000.0
+        return max(0.0, reset - now)
+    return None
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Backoff between attempts: the server's Retry-After / X-RateLimit-Reset
+    when given (capped at max_retry_after), otherwise decorrelated jitter
+    between base_delay and three times the previous delay, capped at max_delay.
+    """
+    max_retries: int = 2
+    base_delay: float = 0.5
+    max_delay: float = 20.0
+    max_retry_after: float = 60.0
+
+    @classmethod
+    def from_config(cls, max_retries: Optional[int] = None) -> "RetryPolicy":
+        settings = _settings("retry")
+        policy = cls(**{k: v for k, v in settings.items() if k in cls.__dataclass_fields__})
+        if max_retries is not None:
+            policy.max_retries = max_retries
+        return policy
+
+    def is_retryable(self, status_code: Optional[int]) -> bool:
+        """Network errors (no status) and transient statuses are retried."""
+        return status_code is None or status_code in RETRYABLE_STATUS
+
+    def next_delay(self, previous: float, headers: Optional[Mapping[str, str]] = None) -> float:
+        if headers is not None:
+            hinted = retry_after_seconds(headers)
+            if hinted is not None:
+                return min(hinted, self.max_retry_after)
+        return min(self.max_delay, random.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class CircuitBreaker:
+    """
+    closed -> open after failure_threshold consecutive failures. While open,
+    calls fail fast. After the cool-down one probe is let through
+    (half_open); success closes the breaker, failure re-opens it with the
+    cool-down doubled up to max_open_seconds.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.opened_at: Optional[float] = None
+        self.open_seconds = 0.0
+        self.probe_in_flight = False
+        self.last_error: Optional[str] = None
+        self.last_failure_at: Optional[float] = None
+
+    def _refresh(self, now: float):
+        if self.state == OPEN and now >= self.opened_at + self.open_seconds:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+
+    def is_open(self, now: Optional[float] = None) -> bool:
+        """True while calls would be rejected (does not claim the half-open probe)."""
+        if not _settings("circuit_breaker").get("enabled", True):
+            return False
+        self._refresh(time.monotonic() if now is None else now)
+        return self.state == OPEN or (self.state == HALF_OPEN and self.probe_in_flight)
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Whether a call may go upstream now; in half_open this claims the single probe."""
+        if not _settings("circuit_breaker").get("enabled", True):
+            return True
+        self._refresh(time.monotonic() if now is None else now)
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self):
+        """Give back the half-open probe when a call ends without a verdict (e.g. cancelled)."""
+        self.probe_in_flight = False
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.probe_in_flight = False
+        self.open_seconds = 0.0
+
+    def record_failure(self, error: str = None, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        settings = _settings("circuit_breaker")
+        self.consecutive_failures += 1
+        self.last_error = error
+        self.last_failure_at = time.time()
+
+        if self.state == HALF_OPEN:
+            self._open(now, min(self.open_seconds * 2, float(settings["max_open_seconds"])))
+        elif self.state == CLOSED and self.consecutive_failures >= int(settings["failure_threshold"]):
+            self._open(now, float(settings["open_seconds"]))
+
+    def _open(self, now: float, open_seconds: float):
+        self.state = OPEN
+        self.opened_at = now
+        self.open_seconds = open_seconds
+        self.probe_in_flight = False
+        self.trips += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        self._refresh(time.monotonic())
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+        return {
+            "state": self.state,
+            "healthy": self.state == CLOSED,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "retry_in_seconds": retry_in,
+            "last_error": self.last_error,
+            "last_failure_at": datetime.fromtimestamp(self.last_failure_at, timezone.utc).isoformat() if self.last_failure_at else None,
+        }
+
+
+class BreakerRegistry:
+    """One CircuitBreaker per model id."""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, model: str) -> CircuitBreaker:
+        if model not in self._breakers:
+            self._breakers[model] = CircuitBreaker(model)
+        return self._breakers[model]
+
+    def is_open(self, model: str) -> bool:
+        return model in self._breakers and self._breakers[model].is_open()
+
+    def reset(self, model: Optional[str] = None):
+        if model is None:
+            self._breakers.clear()
+        else:
+            self._breakers.pop(model, None)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {model: breaker.snapshot() for model, breaker in self._breakers.items()}
+
+
+# Global instance
+breakers = BreakerRegistry()
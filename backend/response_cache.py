@@ -0,0 +1,238 @@
+"""Persistent, content-addressed cache for model responses."""
+
+import contextvars
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import config, async_storage
+
+OFF = "off"
+READ_THROUGH = "read_through"
+REPLAY_ONLY = "replay_only"
+CACHE_MODES = (OFF, READ_THROUGH, REPLAY_ONLY)
+
+# Mode chosen for the conversation currently being processed; set by the orchestrator
+conversation_mode: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("response_cache_mode", default=None)
+
+
+def get_settings() -> Dict[str, Any]:
+    """Configured cache settings merged over the defaults."""
+    return {**config.DEFAULT_CONFIG["response_cache"], **(config.get_config().get("response_cache") or {})}
+
+
+def resolve_mode(mode: Optional[str] = None) -> str:
+    """Per-call mode, else the conversation's mode, else the configured default."""
+    for candidate in (mode, conversation_mode.get(), get_settings().get("mode")):
+        if candidate in CACHE_MODES:
+            return candidate
+    return OFF
+
+
+def normalize_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep only what the model sees, with surrounding whitespace trimmed."""
+    normalized = []
+    for m in messages:
+        content = m.get("content")
+        normalized.append({"role": m.get("role"), "content": content.strip() if isinstance(content, str) else content})
+    return normalized
+
+
+def cache_key(model: str, messages: List[Dict[str, Any]], params: Optional[Dict[str, Any]] = None) -> str:
+    """sha256 of (model, normalized messages, sampling params)."""
+    material = json.dumps(
+        {"model": model, "messages": normalize_messages(messages), "params": params or {}},
+        sort_keys=True, ensure_ascii=False, separators=(",", ":")
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed response cache in the response_cache table.
+
+    Entries expire after their TTL; once the stored bytes exceed max_bytes the
+    least recently used entries are evicted. Counters are kept in memory for
+    the lifetime of the process.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.replay_misses = 0
+        self.bytes_served = 0
+        self.bytes_stored = 0
+        self.evictions = 0
+        self.saved_seconds = 0.0
+        self.saved_tokens = 0
+
+    def _connection(self):
+        from .storage import storage
+        return storage.get_db_connection()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached response for key, or None if missing or expired.
+        The lookup runs on the storage reader pool; the access-time bump and
+        the removal of an expired entry are queued on the writer thread.
+        """
+        now = time.time()
+        row = await async_storage.storage.run(self._lookup, key)
+        if row is None:
+            return None
+        if row["expires_at"] is not None and row["expires_at"] <= now:
+            async_storage.storage.submit(self._delete, key)
+            return None
+        async_storage.storage.submit(self._touch, key, now)
+
+        self.hits += 1
+        self.bytes_served += row["size"]
+        self.saved_seconds += row["latency"] or 0.0
+        self.saved_tokens += row["tokens"] or 0
+        return json.loads(row["response"])
+
+    def _lookup(self, key: str):
+        conn = self._connection()
+        try:
+            return conn.execute(
+                "SELECT response, size, latency, tokens, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _touch(self, key: str, now: float):
+        conn = self._connection()
+        try:
+            conn.execute(
+                "UPDATE response_cache SET last_accessed = ?, hit_count = hit_count + 1 WHERE key = ?", (now, key)
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _delete(self, key: str):
+        conn = self._connection()
+        try:
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def put(self, key: str, model: str, response: Dict[str, Any], latency: float = 0.0, ttl: Optional[float] = None):
+        """Store a response and evict least recently used entries beyond max_bytes."""
+        settings = get_settings()
+        ttl = settings.get("ttl_seconds") if ttl is None else ttl
+        now = time.time()
+        body = json.dumps(response, ensure_ascii=False)
+        size = len(body.encode("utf-8"))
+        tokens = (response.get("usage") or {}).get("total_tokens", 0)
+
+        conn = self._connection()
+        try:
+            conn.execute(
+                """INSERT OR REPLACE INTO response_cache
+                   (key, model, response, size, latency, tokens, created_at, expires_at, last_accessed, hit_count)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 0)""",
+                (key, model, body, size, latency, tokens, now, now + ttl if ttl else None, now)
+            )
+            self.bytes_stored += size
+            self._evict(conn, int(settings.get("max_bytes") or 0), now)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _evict(self, conn, max_bytes: int, now: float):
+        self.evictions += conn.execute(
+            "DELETE FROM response_cache WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        ).rowcount
+        if max_bytes <= 0:
+            return
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM response_cache").fetchone()[0]
+        if total <= max_bytes:
+            return
+        for row in conn.execute("SELECT key, size FROM response_cache ORDER BY last_accessed ASC").fetchall():
+            if total <= max_bytes:
+                break
+            conn.execute("DELETE FROM response_cache WHERE key = ?", (row["key"],))
+            total -= row["size"]
+            self.evictions += 1
+
+    def clear(self) -> int:
+        conn = self._connection()
+        try:
+            deleted = conn.execute("DELETE FROM response_cache").rowcount
+            conn.commit()
+            return deleted
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connection()
+        try:
+            entries, total_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM response_cache"
+            ).fetchone()
+        finally:
+            conn.close()
+        lookups = self.hits + self.misses + self.replay_misses
+        return {
+            "mode": resolve_mode(),
+            "entries": entries,
+            "bytes": total_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "replay_misses": self.replay_misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "bytes_served": self.bytes_served,
+            "bytes_stored": self.bytes_stored,
+            "evictions": self.evictions,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "saved_tokens": self.saved_tokens,
+        }
+
+
+async def through_cache(
+    model: str,
+    messages: List[Dict[str, Any]],
+    call: Callable[[], Awaitable[Optional[Dict[str, Any]]]],
+    mode: Optional[str] = None,
+    params: Optional[Dict[str, Any]] = None,
+    on_hit: Optional[Callable[[Dict[str, Any]], None]] = None,
+    key: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Serve a model call from the cache according to the resolved mode.
+    read_through stores successful responses on a miss; replay_only never
+    calls the model and returns None on a miss. key may be passed when the
+    caller already computed cache_key(). All SQLite work runs on the storage
+    threads (see async_storage), never on the event loop.
+    """
+    mode = resolve_mode(mode)
+    if mode == OFF:
+        return await call()
+
+    key = key or cache_key(model, messages, params)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        cached["cached"] = True
+        if on_hit:
+            on_hit(cached)
+        return cached
+
+    if mode == REPLAY_ONLY:
+        response_cache.replay_misses += 1
+        return None
+
+    response_cache.misses += 1
+    started = time.monotonic()
+    result = await call()
+    if result is not None:
+        await async_storage.storage.run(
+            response_cache.put, key, model, result, latency=time.monotonic() - started, write=True
+        )
+    return result
+
+
+# Global instance
+response_cache = ResponseCache()
@@ -0,0 +1,142 @@
+"""Dependency-aware scheduling of Mission Blueprint tasks."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def task_key(task: Dict[str, Any], index: int) -> str:
+    """Stable id of a blueprint task; falls back to its position if the planner omitted one."""
+    return task.get("id") or f"task_{index + 1}"
+
+
+def init_task_status(session_state: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Ensure session_state['task_status'] covers every blueprint task.
+    Sessions saved before per-task status existed are migrated from current_task_index.
+    Tasks left 'running' or 'failed' by an interrupted run go back to 'pending' so they are retried.
+    """
+    tasks = session_state.get("blueprint", {}).get("tasks", [])
+    status = session_state.get("task_status")
+    if status is None:
+        done_before = session_state.get("current_task_index", 0)
+        status = {task_key(t, i): DONE if i < done_before else PENDING for i, t in enumerate(tasks)}
+
+    for i, task in enumerate(tasks):
+        key = task_key(task, i)
+        if status.get(key) in (None, RUNNING, FAILED):
+            status[key] = PENDING
+
+    session_state["task_status"] = status
+    return status
+
+
+def first_unfinished_index(tasks: List[Dict[str, Any]], status: Dict[str, str]) -> int:
+    """Index of the first task not yet done (len(tasks) when all are), kept as current_task_index."""
+    for i, task in enumerate(tasks):
+        if status.get(task_key(task, i)) != DONE:
+            return i
+    return len(tasks)
+
+
+def ready_tasks(tasks: List[Dict[str, Any]], status: Dict[str, str]) -> List[int]:
+    """
+    Indexes of pending tasks whose dependencies are done, in blueprint order.
+    Breakpoint tasks are barriers: they wait for every earlier task, and every
+    later task waits for them.
+    """
+    keys = [task_key(t, i) for i, t in enumerate(tasks)]
+    known = set(keys)
+    ready = []
+    for i, task in enumerate(tasks):
+        if status.get(keys[i]) != PENDING:
+            continue
+        deps = [d for d in task.get("depends_on") or [] if d in known]
+        if any(status.get(d) != DONE for d in deps):
+            continue
+        if any(tasks[j].get("breakpoint") and status.get(keys[j]) != DONE for j in range(i)):
+            continue
+        if task.get("breakpoint") and any(status.get(keys[j]) != DONE for j in range(i)):
+            continue
+        ready.append(i)
+    return ready
+
+
+async def run_blueprint(
+    tasks: List[Dict[str, Any]],
+    status: Dict[str, str],
+    run_task: Callable[[int], Awaitable[Any]],
+    max_parallel: int = 1,
+    on_change: Optional[Callable[[], None]] = None,
+    log_callback=None
+) -> bool:
+    """
+    Run pending tasks as their dependencies complete, at most max_parallel at a time.
+    run_task(index) executes one task. Returns True if the mission paused at a
+    breakpoint, False once every task is done. If a task raises or is cancelled,
+    no new tasks are started, running ones are allowed to finish, and the error
+    (CancelledError for a cancelled task) is re-raised.
+    """
+    max_parallel = max(1, int(max_parallel or 1))
+    running: Dict[asyncio.Task, int] = {}
+    paused = False
+    error: Optional[BaseException] = None
+
+    def notify():
+        if on_change:
+            on_change()
+
+    try:
+        while True:
+            if not paused and error is None:
+                launched = False
+                for i in ready_tasks(tasks, status)[:max_parallel - len(running)]:
+                    status[task_key(tasks[i], i)] = RUNNING
+                    running[asyncio.ensure_future(run_task(i))] = i
+                    launched = True
+
+                if not running and any(s == PENDING for s in status.values()):
+                    # Circular or otherwise unsatisfiable dependencies: fall back to blueprint order
+                    i = next(i for i, t in enumerate(tasks) if status.get(task_key(t, i)) == PENDING)
+                    if log_callback:
+                        log_callback(f"⚠️ Dependencies of '{tasks[i].get('label', task_key(tasks[i], i))}' cannot be satisfied. Running it in blueprint order.")
+                    status[task_key(tasks[i], i)] = RUNNING
+                    running[asyncio.ensure_future(run_task(i))] = i
+                    launched = True
+
+                if launched:
+                    notify()
+
+            if not running:
+                break
+
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                i = running.pop(finished)
+                key = task_key(tasks[i], i)
+                if finished.cancelled():
+                    # A task cancelled on its own (not via this run) fails like any other error
+                    status[key] = FAILED
+                    error = error or asyncio.CancelledError()
+                    continue
+                if finished.exception() is not None:
+                    status[key] = FAILED
+                    error = error or finished.exception()
+                    continue
+                status[key] = DONE
+                if tasks[i].get("breakpoint") and any(s != DONE for s in status.values()):
+                    paused = True
+            notify()
+    except BaseException:
+        for pending_task, i in running.items():
+            pending_task.cancel()
+            status[task_key(tasks[i], i)] = PENDING
+        raise
+
+    if error is not None:
+        raise error
+    return paused
@@ -0,0 +1,269 @@
+"""FTS5 full-text index over conversations, messages, final answers, prompts and audit logs."""
+
+import re
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from . import config
+
+
+def get_settings() -> Dict[str, Any]:
+    return {**config.DEFAULT_CONFIG["search"], **(config.get_config().get("search") or {})}
+
+
+# search_index rowid = source rowid * 8 + kind code, so triggers can find an entry without a scan
+KINDS = {
+    "conversation": 1,  # conversations.title
+    "message": 2,       # messages.content, for messages without a final answer
+    "answer": 3,        # messages.stage3 response (the chairman's final answer; also the message content)
+    "prompt": 4,        # prompts.title + content
+    "audit": 5,         # audit_logs.log_message
+}
+
+# The final answer of a messages row (NULL when it has none)
+ANSWER = "CASE WHEN json_valid({row}.stage3) THEN json_extract({row}.stage3, '$.response') END"
+ANSWER_MODEL = "CASE WHEN json_valid({row}.stage3) THEN json_extract({row}.stage3, '$.model') END"
+
+SCHEMA = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        body,
+        -- Indexed so filters can be part of the MATCH; bm25 only weighs body
+        kind,
+        step, -- audit step, or the message role
+        model_id,
+        conversation_id,
+        ref_id UNINDEXED, -- id of the source row
+        created_at UNINDEXED,
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_conversations_insert AFTER INSERT ON conversations
+    BEGIN
+        INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, created_at)
+        VALUES (NEW.rowid * 8 + 1, NEW.title, 'conversation', NEW.id, NEW.id, NEW.created_at);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_conversations_title AFTER UPDATE OF title ON conversations
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.rowid * 8 + 1;
+        INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, created_at)
+        VALUES (NEW.rowid * 8 + 1, NEW.title, 'conversation', NEW.id, NEW.id, NEW.created_at);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_conversations_delete AFTER DELETE ON conversations
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.rowid * 8 + 1;
+    END
+    ''',
+    f'''
+    CREATE TRIGGER IF NOT EXISTS trg_search_messages_insert AFTER INSERT ON messages
+    BEGIN
+        INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, step, created_at)
+        SELECT NEW.id * 8 + 2, NEW.content, 'message', NEW.id, NEW.conversation_id, NEW.role, NEW.created_at
+        WHERE NEW.content IS NOT NULL AND {ANSWER.format(row="NEW")} IS NULL;
+        INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, model_id, step, created_at)
+        SELECT NEW.id * 8 + 3, {ANSWER.format(row="NEW")}, 'answer', NEW.id, NEW.conversation_id,
+               {ANSWER_MODEL.format(row="NEW")}, 'stage3', NEW.created_at
+        WHERE {ANSWER.format(row="NEW")} IS NOT NULL;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_messages_delete AFTER DELETE ON messages
+    BEGIN
+        DELETE FROM search_index WHERE rowid IN (OLD.id * 8 + 2, OLD.id * 8 + 3);
+    END
+    ''',
+    # save_prompt uses INSERT OR REPLACE, whose implicit delete fires no triggers
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_prompts_replace BEFORE INSERT ON prompts
+    BEGIN
+        DELETE FROM search_index WHERE rowid = (SELECT rowid * 8 + 4 FROM prompts WHERE id = NEW.id);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_prompts_insert AFTER INSERT ON prompts
+    BEGIN
+        INSERT INTO search_index (rowid, body, kind, ref_id, created_at)
+        VALUES (NEW.rowid * 8 + 4, NEW.title || ' ' || NEW.content, 'prompt', NEW.id, NEW.created_at);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_prompts_delete AFTER DELETE ON prompts
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.rowid * 8 + 4;
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_audit_insert AFTER INSERT ON audit_logs
+    WHEN NEW.log_message IS NOT NULL
+    BEGIN
+        INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, model_id, step, created_at)
+        VALUES (NEW.id * 8 + 5, NEW.log_message, 'audit', NEW.id, NEW.conversation_id, NEW.model_id, NEW.step, NEW.timestamp);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS trg_search_audit_delete AFTER DELETE ON audit_logs
+    BEGIN
+        DELETE FROM search_index WHERE rowid = OLD.id * 8 + 5;
+    END
+    ''',
+]
+
+# Index rows that existed before the table did (the same statements the insert triggers run)
+BACKFILL = [
+    '''
+    INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, created_at)
+    SELECT rowid * 8 + 1, title, 'conversation', id, id, created_at FROM conversations
+    ''',
+    f'''
+    INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, step, created_at)
+    SELECT id * 8 + 2, content, 'message', id, conversation_id, role, created_at
+    FROM messages WHERE content IS NOT NULL AND {ANSWER.format(row="messages")} IS NULL
+    ''',
+    f'''
+    INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, model_id, step, created_at)
+    SELECT id * 8 + 3, {ANSWER.format(row="messages")}, 'answer', id, conversation_id,
+           {ANSWER_MODEL.format(row="messages")}, 'stage3', created_at
+    FROM messages WHERE {ANSWER.format(row="messages")} IS NOT NULL
+    ''',
+    '''
+    INSERT INTO search_index (rowid, body, kind, ref_id, created_at)
+    SELECT rowid * 8 + 4, title || ' ' || content, 'prompt', id, created_at FROM prompts
+    ''',
+    '''
+    INSERT INTO search_index (rowid, body, kind, ref_id, conversation_id, model_id, step, created_at)
+    SELECT id * 8 + 5, log_message, 'audit', id, conversation_id, model_id, step, timestamp
+    FROM audit_logs WHERE log_message IS NOT NULL
+    ''',
+]
+
+
+def ensure_schema(cursor) -> bool:
+    """Create the index and its triggers (backfilling on first creation); False if SQLite lacks FTS5."""
+    exists = cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'search_index'"
+    ).fetchone() is not None
+    try:
+        for statement in SCHEMA:
+            cursor.execute(statement)
+    except sqlite3.OperationalError as e:
+        if "fts5" in str(e):
+            print(f"Full-text search disabled: {e}")
+            return False
+        raise
+    if not exists:
+        for statement in BACKFILL:
+            cursor.execute(statement)
+    return True
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn user input into an FTS5 query: every term must match, a trailing *
+    makes it a prefix search, and FTS syntax characters are taken literally.
+    """
+    terms = []
+    for term in text.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', '""')
+        if re.search(r"\w", term):
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def phrase(text: str) -> Optional[str]:
+    """text as one FTS5 phrase (its tokens in order), or None if it has no tokens."""
+    if not re.search(r"\w", text):
+        return None
+    return '"' + text.replace('"', '""') + '"'
+
+
+def search(cursor, query: str, kinds: Optional[List[str]] = None, conversation_id: Optional[str] = None,
+           model: Optional[str] = None, step: Optional[str] = None, since: Optional[str] = None,
+           until: Optional[str] = None, limit: int = 20, offset: int = 0,
+           rank_window: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Best matches first (bm25 over the text). since/until compare against the
+    start of created_at, so until='2026-01-31' includes the whole day. model
+    matches the model id or its part after the provider prefix.
+
+    When a query matches more than rank_window rows, only the newest
+    rank_window matches of each kind are ranked, so a term that appears in
+    half the database costs a few thousand bm25 evaluations instead of one
+    per match.
+    """
+    terms = fts_query(query)
+    if not terms:
+        return []
+    kinds = kinds or list(KINDS)
+    unknown = [k for k in kinds if k not in KINDS]
+    if unknown:
+        raise ValueError(f"Unknown search kinds: {', '.join(unknown)}")
+    if rank_window is None:
+        rank_window = int(get_settings()["rank_window"])
+
+    # Filters on indexed columns narrow the match itself; the exact comparisons
+    # below then only run on rows that already contain the filter tokens
+    match = f"body : ({terms})"
+    conditions, params = [], {"window": rank_window, "limit": limit, "offset": offset}
+    for column, value in (("conversation_id", conversation_id), ("model_id", model), ("step", step)):
+        if value and phrase(value):
+            match += f" AND {column} : {phrase(value)}"
+    if conversation_id:
+        conditions.append("conversation_id = :conversation_id")
+        params["conversation_id"] = conversation_id
+    if model:
+        conditions.append("(model_id = :model OR model_id LIKE :model_suffix)")
+        params.update(model=model, model_suffix=f"%/{model}")
+    if step:
+        conditions.append("step = :step")
+        params["step"] = step
+    if since:
+        conditions.append("created_at >= :since")
+        params["since"] = since
+    if until:
+        conditions.append("substr(created_at, 1, :until_length) <= :until")
+        params.update(until=until, until_length=len(until))
+    filters = "".join(f" AND {condition}" for condition in conditions)
+
+    matches = cursor.execute(
+        "SELECT count(*) FROM (SELECT 1 FROM search_index WHERE search_index MATCH :match LIMIT :window + 1)",
+        {**params, "match": match}
+    ).fetchone()[0]
+    if matches <= rank_window:
+        windows = [f"rowid % 8 IN ({', '.join(str(KINDS[kind]) for kind in kinds)})"]
+    else:
+        # Oldest rowid inside each kind's window (rowid order is insertion order within a kind)
+        windows = []
+        for kind in kinds:
+            bound = cursor.execute(f'''
+                SELECT min(rowid) FROM (
+                    SELECT rowid FROM search_index
+                    WHERE search_index MATCH :match{filters}
+                    ORDER BY rowid DESC LIMIT :window
+                )
+            ''', {**params, "match": f"{match} AND kind : {kind}"}).fetchone()[0]
+            if bound is not None:
+                windows.append(f"(rowid % 8 = {KINDS[kind]} AND rowid >= {int(bound)})")
+        if not windows:
+            return []
+
+    cursor.execute(f'''
+        SELECT hits.*, conversations.title AS conversation_title
+        FROM (
+            SELECT kind, ref_id, conversation_id, model_id, step, created_at,
+                   snippet(search_index, 0, '**', '**', '…', 16) AS snippet,
+                   bm25(search_index, 1.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0) AS score
+            FROM search_index
+            WHERE search_index MATCH :match{filters} AND ({' OR '.join(windows)})
+            ORDER BY score
+            LIMIT :limit OFFSET :offset
+        ) AS hits
+        LEFT JOIN conversations ON conversations.id = hits.conversation_id
+        ORDER BY hits.score
+    ''', {**params, "match": match})
+    return [dict(row) for row in cursor.fetchall()]
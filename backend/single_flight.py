@@ -0,0 +1,102 @@
+"""Coalesce concurrent identical model requests onto one upstream call."""
+
+import asyncio
+import copy
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+from . import config
+
+
+def enabled() -> bool:
+    settings = config.get_config().get("single_flight") or {}
+    return bool(settings.get("enabled", config.DEFAULT_CONFIG["single_flight"]["enabled"]))
+
+
+class _Flight:
+    """One upstream call plus everyone waiting for it."""
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.waiters = 0
+        self.deltas: List[str] = []
+        self.listeners: List[Callable[[str], None]] = []
+
+    def emit(self, delta: str):
+        self.deltas.append(delta)
+        for listener in list(self.listeners):
+            listener(delta)
+
+    def subscribe(self, listener: Callable[[str], None]):
+        # A waiter that joins mid-stream first receives what it missed
+        for delta in self.deltas:
+            listener(delta)
+        self.listeners.append(listener)
+
+    def unsubscribe(self, listener: Optional[Callable[[str], None]]):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time. Callers that arrive while a call
+    is in flight await the same result; streamed deltas are fanned out to all
+    of them. A cancelled caller only detaches itself; the upstream call is
+    cancelled once its last caller is gone.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[Callable[[str], None]], Awaitable[Any]],
+        on_delta: Optional[Callable[[str], None]] = None
+    ) -> Any:
+        """
+        Run fn(emit) for key, or join the call already running for it.
+        fn receives an emit callback for streamed deltas. Every caller gets
+        its own copy of the result so callers can tag it independently.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(fn(flight.emit))
+            flight.task.add_done_callback(lambda _, k=key, f=flight: self._forget(k, f))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        if on_delta:
+            flight.subscribe(on_delta)
+        try:
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if not flight.task.done():
+                flight.waiters -= 1
+                flight.unsubscribe(on_delta)
+                if flight.waiters == 0:
+                    flight.task.cancel()
+            raise
+        flight.waiters -= 1
+        flight.unsubscribe(on_delta)
+        return copy.deepcopy(result)
+
+    def _forget(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": self.in_flight(), "leaders": self.leaders, "coalesced": self.coalesced}
+
+
+# Global instance
+flights = SingleFlight()
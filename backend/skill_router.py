@@ -0,0 +1,208 @@
+"""In-memory skill index used to route blueprint tasks to council models."""
+
+import asyncio
+import json
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+
+from . import config, async_storage
+
+# Skills that correspond to a capability flag; a model with the flag set
+# scores the capability bonus on top of any text match.
+CAPABILITY_ALIASES = {
+    "vision": "vision",
+    "reasoning": "reasoning",
+    "thinking": "reasoning",
+    "tools": "toolUse",
+    "tool_use": "toolUse",
+    "coding": "coding",
+    "code": "coding",
+    "creative": "creative",
+    "analysis": "analysis",
+    "long_context": "long_context",
+}
+
+# How long an empty index (no local models, catalog unreachable) is reused
+EMPTY_INDEX_RETRY_SECONDS = 60.0
+
+# The /models catalog uses different flag names than unified_models
+CATALOG_CAPABILITIES = {"thinking": "reasoning", "tools": "toolUse", "vision": "vision"}
+
+
+class SkillIndex:
+    """
+    Skill lookups over a fixed set of model profiles.
+
+    Each profile holds the lowercased name/description text, the tag set and
+    the set of capability flags of one model. Capability sets are indexed
+    up front; text matches are computed once per skill and then memoized, so
+    routing is a handful of set lookups.
+    """
+
+    def __init__(self, profiles: Dict[str, Dict[str, Any]], source: str = ""):
+        self.source = source
+        self._profiles = profiles
+        self._by_skill: Dict[str, FrozenSet[str]] = {}
+        self._by_capability: Dict[str, FrozenSet[str]] = {}
+
+        capability_members: Dict[str, set] = {}
+        for model_id, profile in profiles.items():
+            for capability in profile["capabilities"]:
+                capability_members.setdefault(capability, set()).add(model_id)
+        self._by_capability = {k: frozenset(v) for k, v in capability_members.items()}
+
+    @classmethod
+    def from_unified_models(cls, rows: Iterable[Dict[str, Any]]) -> "SkillIndex":
+        """Build the index from unified_models rows, keyed by their OpenRouter model id."""
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            technical = _json(row.get("technical"))
+            model_id = technical.get("provider_specific", {}).get("openrouter_id")
+            if not model_id:
+                continue
+            raw = _json(row.get("provider_raw_data"))
+            capabilities = {flag for flag, enabled in _json(row.get("capabilities")).items() if enabled}
+            _merge_profile(profiles, model_id,
+                           name=raw.get("name") or row.get("base_model_name", ""),
+                           description=raw.get("description", ""),
+                           tags=raw.get("tags", []),
+                           capabilities=capabilities)
+        return cls(profiles, source="unified_models")
+
+    @classmethod
+    def from_catalog(cls, models: Iterable[Dict[str, Any]]) -> "SkillIndex":
+        """Build the index from the OpenRouter /models catalog."""
+        profiles: Dict[str, Dict[str, Any]] = {}
+        for m in models:
+            flags = m.get("capabilities", {})
+            capabilities = {CATALOG_CAPABILITIES[f] for f, enabled in flags.items() if enabled and f in CATALOG_CAPABILITIES}
+            _merge_profile(profiles, m["id"],
+                           name=m.get("name", ""),
+                           description=m.get("description", ""),
+                           tags=m.get("tags", []),
+                           capabilities=capabilities)
+        return cls(profiles, source="catalog")
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def models_for(self, skill: str) -> FrozenSet[str]:
+        """Models whose name, description or tags mention the skill."""
+        skill = skill.lower()
+        if skill not in self._by_skill:
+            self._by_skill[skill] = frozenset(
+                model_id for model_id, p in self._profiles.items()
+                if skill in p["text"] or skill in p["tags"]
+            )
+        return self._by_skill[skill]
+
+    def capable(self, skill: str) -> FrozenSet[str]:
+        """Models whose capability flag matches the skill."""
+        capability = CAPABILITY_ALIASES.get(skill.lower())
+        return self._by_capability.get(capability, frozenset()) if capability else frozenset()
+
+    def score(self, model_id: str, skills: List[str]) -> int:
+        score = 0
+        for skill in skills:
+            if model_id in self.models_for(skill):
+                score += 1
+            if model_id in self.capable(skill):
+                score += 2
+        return score
+
+
+def _json(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value) if value else {}
+    except (TypeError, ValueError):
+        return {}
+
+
+def _merge_profile(profiles: Dict[str, Dict[str, Any]], model_id: str, name: str, description: str,
+                   tags: List[str], capabilities: set):
+    profile = profiles.setdefault(model_id, {"text": "", "tags": set(), "capabilities": set()})
+    profile["text"] = f"{profile['text']} {(name or '').lower()} {(description or '').lower()}".strip()
+    profile["tags"].update(t.lower() for t in tags or [])
+    profile["capabilities"].update(capabilities)
+
+
+class SkillRouter:
+    """Keeps one SkillIndex in memory and rebuilds it when it expires or is invalidated."""
+
+    def __init__(self):
+        self._index: Optional[SkillIndex] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop = None
+
+    def _ttl(self) -> float:
+        settings = config.get_config().get("model_catalog", {}) or {}
+        return float(settings.get("ttl_seconds", config.DEFAULT_CONFIG["model_catalog"]["ttl_seconds"]))
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _fresh(self) -> bool:
+        return self._index is not None and time.monotonic() < self._expires_at
+
+    def invalidate(self):
+        """Drop the index, e.g. after unified_models was refreshed."""
+        self._index = None
+
+    @staticmethod
+    def _load_unified_models() -> SkillIndex:
+        """Index built from the unified_models table (blocking; runs on a storage thread)."""
+        from .storage import storage
+        conn = storage.get_db_connection()
+        try:
+            rows = [dict(r) for r in conn.execute(
+                "SELECT base_model_name, capabilities, technical, provider_raw_data FROM unified_models"
+            ).fetchall()]
+        finally:
+            conn.close()
+        return SkillIndex.from_unified_models(rows)
+
+    async def get_index(self) -> SkillIndex:
+        """
+        Return the current index. It is built from the local unified_models
+        table; only when that table is empty is the (cached) OpenRouter
+        catalog used instead.
+        """
+        if self._fresh():
+            return self._index
+
+        async with self._get_lock():
+            if self._fresh():
+                return self._index
+
+            index = await async_storage.storage.run(self._load_unified_models)
+            if not len(index):
+                from .models_service import models_service
+                index = SkillIndex.from_catalog(await models_service.fetch_model_metadata())
+
+            # Without any model data, retry soon instead of routing blind for a whole TTL
+            self._index = index
+            self._expires_at = time.monotonic() + (self._ttl() if len(index) else EMPTY_INDEX_RETRY_SECONDS)
+            return index
+
+    async def route(self, required_skills: List[str], available_models: List[str]) -> List[str]:
+        """Order available_models by skill score, keeping only those that match at least one skill."""
+        if not required_skills:
+            return available_models
+
+        index = await self.get_index()
+        scored_models = [(model_id, index.score(model_id, required_skills)) for model_id in available_models]
+        scored_models.sort(key=lambda x: x[1], reverse=True)
+
+        matches = [m[0] for m in scored_models if m[1] > 0]
+        return matches if matches else available_models
+
+
+# Global instance
+skill_router = SkillRouter()
@@ -2,25 +2,152 @@
 
 import sqlite3
 import json
+import base64
 import os
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from .config import DB_PATH
+from .db_pool import ConnectionPool
+from . import blob_store, search_index
+
+
+# Message columns the paginated API can select; JSON ones are decoded only when selected
+MESSAGE_FIELDS = ("role", "content", "stage1", "stage2", "stage3", "metadata", "created_at")
+JSON_MESSAGE_FIELDS = ("stage1", "stage2", "stage3", "metadata")
+
+
+def encode_conversation_cursor(last_modified: str, conversation_id: str) -> str:
+    """Opaque keyset cursor for list_conversations (position after this conversation)."""
+    return base64.urlsafe_b64encode(json.dumps([last_modified, conversation_id]).encode()).decode()
+
+
+def decode_conversation_cursor(cursor: str) -> tuple:
+    try:
+        last_modified, conversation_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid conversation cursor")
+    return last_modified, conversation_id
+
+
+# Session state keys stored outside mission_state.header
+SESSION_SPLIT_KEYS = ("blueprint", "results", "task_status")
+
+
+def write_task_row(cursor, conversation_id: str, task_key: str, fields: Dict[str, Any], now: str):
+    """Upsert one mission_tasks row, setting only the given 'status'/'result' columns."""
+    columns = {"status": fields["status"]} if "status" in fields else {}
+    if "result" in fields:
+        columns["result"] = json.dumps(fields["result"])
+    assignments = "".join(f", {column} = excluded.{column}" for column in columns)
+    cursor.execute(
+        f"""INSERT INTO mission_tasks (conversation_id, task_key, {''.join(c + ', ' for c in columns)}updated_at)
+            VALUES (?, ?, {'?, ' * len(columns)}?)
+            ON CONFLICT (conversation_id, task_key) DO UPDATE SET updated_at = excluded.updated_at{assignments}""",
+        (conversation_id, task_key, *columns.values(), now)
+    )
+
+
+def write_session_state(cursor, conversation_id: str, state: Dict[str, Any]):
+    """Store a whole session state in mission_state / mission_tasks, replacing what was there."""
+    now = datetime.utcnow().isoformat()
+    header = {k: v for k, v in state.items() if k not in SESSION_SPLIT_KEYS}
+    # Remember which of the split keys the state had, so reads return the same shape
+    header.update({k: {} for k in ("results", "task_status") if k in state})
+    blueprint = state.get("blueprint")
+    cursor.execute(
+        "INSERT OR REPLACE INTO mission_state (conversation_id, header, blueprint, updated_at) VALUES (?, ?, ?, ?)",
+        (conversation_id, json.dumps(header), json.dumps(blueprint) if blueprint is not None else None, now)
+    )
+    cursor.execute("DELETE FROM mission_tasks WHERE conversation_id = ?", (conversation_id,))
+    # Partial results belong to the mission being replaced
+    cursor.execute("DELETE FROM mission_checkpoints WHERE conversation_id = ?", (conversation_id,))
+    status = state.get("task_status") or {}
+    results = state.get("results") or {}
+    for key in list(status) + [k for k in results if k not in status]:
+        fields = {"status": status.get(key)}
+        if key in results:
+            fields["result"] = results[key]
+        write_task_row(cursor, conversation_id, key, fields, now)
+
+
+def read_session_state(cursor, conversation_id: str) -> Optional[Dict[str, Any]]:
+    row = cursor.execute(
+        "SELECT header, blueprint FROM mission_state WHERE conversation_id = ?", (conversation_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    state = json.loads(row["header"])
+    if row["blueprint"] is not None:
+        state["blueprint"] = json.loads(row["blueprint"])
+    tasks = cursor.execute(
+        "SELECT task_key, status, result FROM mission_tasks WHERE conversation_id = ? ORDER BY rowid",
+        (conversation_id,)
+    ).fetchall()
+    results = {t["task_key"]: json.loads(t["result"]) for t in tasks if t["result"] is not None}
+    if results or "results" in state:
+        state["results"] = results
+    status = {t["task_key"]: t["status"] for t in tasks if t["status"] is not None}
+    if status or "task_status" in state:
+        state["task_status"] = status
+    return state
+
+
+def delete_audit_logs(cursor, conversation_id: str) -> int:
+    """
+    Delete a conversation's audit logs and the payloads no other log refers
+    to; call inside a write transaction. Returns the number of payloads deleted.
+    """
+    hashes = [row[0] for row in cursor.execute(
+        "SELECT DISTINCT raw_hash FROM audit_logs WHERE conversation_id = ? AND raw_hash IS NOT NULL",
+        (conversation_id,)
+    )]
+    cursor.execute("DELETE FROM audit_logs WHERE conversation_id = ?", (conversation_id,))
+    return blob_store.prune(cursor, hashes)
+
+
+def audit_row(conversation_id: str, step: str, task_id: str = None, model_id: str = None,
+              log_message: str = None, raw_data: Any = None, metadata: Dict = None) -> tuple:
+    """An audit_logs row, timestamped and serialized now."""
+    return (
+        conversation_id,
+        datetime.utcnow().isoformat(),
+        task_id,
+        step,
+        model_id,
+        log_message,
+        json.dumps(raw_data) if raw_data is not None else None,
+        json.dumps(metadata) if metadata else None
+    )
+
 
 class Storage:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or DB_PATH
+        # In-memory keyring: active OpenRouter keys and the eligible keys per model
+        self._keyring: Optional[List[Dict[str, Any]]] = None
+        self._eligible_by_model: Dict[str, List[Dict[str, Any]]] = {}
+        self.pool = ConnectionPool(self.db_path)
         self.init_db()
 
     def get_db_connection(self):
-        """Create a database connection."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+        """Check out a pooled WAL-mode connection; close() returns it to the pool."""
+        if self.pool.db_path != self.db_path:
+            # db_path was reassigned (tests do this); stop handing out the old file
+            self.pool.close_all()
+            self.pool = ConnectionPool(self.db_path)
+        return self.pool.connect()
+
+    def close(self):
+        """Close pooled connections, e.g. before deleting the database file."""
+        self.pool.close_all()
 
     def init_db(self):
         """Initialize the database schema."""
         os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        # The file may have been deleted and recreated; don't reuse handles or keys from the old one
+        self.close()
+        self._keyring = None
+        self._eligible_by_model = {}
         conn = self.get_db_connection()
         cursor = conn.cursor()
         
@@ -49,6 +176,8 @@ class Storage:
             FOREIGN KEY (conversation_id) REFERENCES conversations (id) ON DELETE CASCADE
         )
         ''')
+        # Keyset pagination walks a conversation's messages by id
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id, id)")
         
         # Templates table
         cursor.execute('''
@@ -112,6 +241,96 @@ class Storage:
             FOREIGN KEY (conversation_id) REFERENCES conversations (id) ON DELETE CASCADE
         )
         ''')
+
+        # Session state, split so a mission update writes only what changed:
+        # the header (status, current task, feedback, ...), the blueprint, and one row per task
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mission_state (
+            conversation_id TEXT PRIMARY KEY,
+            header TEXT NOT NULL, -- JSON: session_state without blueprint, results and task_status
+            blueprint TEXT, -- JSON
+            updated_at TEXT NOT NULL
+        )
+        ''')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mission_tasks (
+            conversation_id TEXT NOT NULL,
+            task_key TEXT NOT NULL,
+            status TEXT, -- scheduler status; NULL for sessions saved before per-task status
+            result TEXT, -- JSON
+            updated_at TEXT NOT NULL,
+            UNIQUE (conversation_id, task_key)
+        )
+        ''')
+        # Append-only: one row per finished task (its definition, models and result)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mission_snapshots (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            conversation_id TEXT NOT NULL,
+            task_key TEXT NOT NULL,
+            snapshot TEXT NOT NULL, -- JSON
+            created_at TEXT NOT NULL
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_mission_snapshots_conversation ON mission_snapshots(conversation_id, id)")
+        # Partial results of unfinished tasks, so a resumed mission only re-issues the missing calls:
+        # one row per model response and one per finished stage (model = '')
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mission_checkpoints (
+            conversation_id TEXT NOT NULL,
+            task_key TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            model TEXT NOT NULL,
+            result TEXT NOT NULL, -- JSON
+            created_at TEXT NOT NULL,
+            PRIMARY KEY (conversation_id, task_key, stage, model)
+        ) WITHOUT ROWID
+        ''')
+
+        # Missions whose run has started and not yet ended; a row left behind means a restart interrupted it
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS mission_runs (
+            conversation_id TEXT PRIMARY KEY,
+            started_at TEXT NOT NULL
+        )
+        ''')
+
+        # Compressed audit payloads keyed by sha256 of their JSON; audit_logs.raw_hash points here
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS audit_blobs (
+            hash TEXT PRIMARY KEY,
+            codec TEXT NOT NULL, -- 'zlib' or 'zstd'
+            size INTEGER NOT NULL, -- uncompressed bytes
+            stored_size INTEGER NOT NULL,
+            data BLOB NOT NULL
+        )
+        ''')
+
+        # Durable queue of council missions run by job_queue workers, and the events each one published
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            conversation_id TEXT NOT NULL,
+            payload TEXT NOT NULL, -- JSON: content, cache_mode
+            status TEXT NOT NULL, -- queued, running, completed, failed, cancelled
+            error TEXT,
+            worker TEXT,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            created_at TEXT NOT NULL,
+            started_at TEXT,
+            finished_at TEXT
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_conversation ON jobs(conversation_id, created_at)")
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS job_events (
+            job_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            event TEXT NOT NULL, -- JSON
+            PRIMARY KEY (job_id, seq)
+        ) WITHOUT ROWID
+        ''')
         
         # Add missing columns if they don't exist (for existing DBs)
         try:
@@ -134,6 +353,51 @@ class Storage:
         except sqlite3.OperationalError:
             pass # Column already exists
 
+        try:
+            cursor.execute("ALTER TABLE conversations ADD COLUMN cache_mode TEXT")
+        except sqlite3.OperationalError:
+            pass # Column already exists
+
+        try:
+            cursor.execute("ALTER TABLE audit_logs ADD COLUMN raw_hash TEXT")
+        except sqlite3.OperationalError:
+            pass # Column already exists
+
+        try:
+            cursor.execute("ALTER TABLE conversations ADD COLUMN message_count INTEGER NOT NULL DEFAULT 0")
+            cursor.execute("ALTER TABLE conversations ADD COLUMN revision_count INTEGER NOT NULL DEFAULT 0")
+            # Existing DB: count what is there once; the triggers below keep the counts current
+            cursor.execute('''
+            UPDATE conversations SET
+                message_count = (SELECT COUNT(*) FROM messages WHERE conversation_id = conversations.id),
+                revision_count = (SELECT COUNT(*) FROM messages WHERE conversation_id = conversations.id AND role = 'assistant')
+            ''')
+        except sqlite3.OperationalError:
+            pass # Columns already exist
+
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_insert_counts AFTER INSERT ON messages
+        BEGIN
+            UPDATE conversations
+            SET message_count = message_count + 1, revision_count = revision_count + (NEW.role = 'assistant')
+            WHERE id = NEW.conversation_id;
+        END
+        ''')
+        cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_messages_delete_counts AFTER DELETE ON messages
+        BEGIN
+            UPDATE conversations
+            SET message_count = message_count - 1, revision_count = revision_count - (OLD.role = 'assistant')
+            WHERE id = OLD.conversation_id;
+        END
+        ''')
+
+        # Sidebar order and its keyset cursor; audit timeline per conversation
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_conversations_recent ON conversations(archived, last_modified, id)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_conversation ON audit_logs(conversation_id, timestamp)")
+        # Whether a payload is still referenced, checked when audit logs are deleted
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_audit_logs_raw_hash ON audit_logs(raw_hash)")
+
         # Fail Lists table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS fail_lists (
@@ -208,6 +472,34 @@ class Storage:
         )
         ''')
 
+        # Response cache for model calls (see response_cache.py)
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS response_cache (
+            key TEXT PRIMARY KEY, -- sha256 of model, normalized messages and params
+            model TEXT NOT NULL,
+            response TEXT NOT NULL, -- JSON
+            size INTEGER NOT NULL, -- bytes of response
+            latency REAL, -- seconds the original call took
+            tokens INTEGER,
+            created_at REAL NOT NULL,
+            expires_at REAL,
+            last_accessed REAL NOT NULL,
+            hit_count INTEGER DEFAULT 0
+        )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_lru ON response_cache(last_accessed)")
+
+        # Full-text index over titles, messages, answers, prompts and audit logs, kept in sync by triggers
+        self.search_available = search_index.ensure_schema(cursor)
+
+        # Sessions saved as one conversations.session_state blob move to the split tables once
+        legacy = cursor.execute(
+            "SELECT id, session_state FROM conversations WHERE session_state IS NOT NULL"
+        ).fetchall()
+        for row in legacy:
+            write_session_state(cursor, row["id"], json.loads(row["session_state"]))
+            cursor.execute("UPDATE conversations SET session_state = NULL WHERE id = ?", (row["id"],))
+
         conn.commit()
         conn.close()
         
@@ -269,30 +561,263 @@ class Storage:
         }
 
     def get_session_state(self, conversation_id: str) -> Optional[Dict[str, Any]]:
-        """Get the session state for a conversation."""
+        """Get the session state for a conversation, rebuilt from its header and task rows."""
         conn = self.get_db_connection()
         cursor = conn.cursor()
-        cursor.execute("SELECT session_state FROM conversations WHERE id = ?", (conversation_id,))
-        row = cursor.fetchone()
+        state = read_session_state(cursor, conversation_id)
         conn.close()
-        
-        if row and row[0]:
-            import json
-            return json.loads(row[0])
-        return None
+        return state
 
     def update_session_state(self, conversation_id: str, state: Dict[str, Any]):
-        """Update the session state for a conversation."""
-        import json
+        """Replace the whole session state (new or reset missions); see update_session_delta for progress."""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        write_session_state(cursor, conversation_id, state)
+        cursor.execute("UPDATE conversations SET last_modified = CURRENT_TIMESTAMP WHERE id = ?", (conversation_id,))
+        conn.commit()
+        conn.close()
+
+    def update_session_delta(self, conversation_id: str, header: Optional[Dict[str, Any]] = None,
+                             tasks: Optional[Dict[str, Dict[str, Any]]] = None,
+                             snapshot: Optional[Dict[str, Any]] = None):
+        """
+        Apply part of a session state change in one transaction:
+        header keys are merged into the header, tasks maps task keys to the
+        columns to set ('status' and/or 'result'), and snapshot (with a
+        'task_key') is appended to mission_snapshots.
+        """
+        now = datetime.utcnow().isoformat()
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        if header:
+            cursor.execute(
+                """INSERT INTO mission_state (conversation_id, header, updated_at) VALUES (?, ?, ?)
+                   ON CONFLICT (conversation_id) DO UPDATE
+                   SET header = json_patch(header, excluded.header), updated_at = excluded.updated_at""",
+                (conversation_id, json.dumps(header), now)
+            )
+        for key, fields in (tasks or {}).items():
+            write_task_row(cursor, conversation_id, key, fields, now)
+        if snapshot:
+            cursor.execute(
+                "INSERT INTO mission_snapshots (conversation_id, task_key, snapshot, created_at) VALUES (?, ?, ?, ?)",
+                (conversation_id, snapshot["task_key"], json.dumps(snapshot), now)
+            )
+        cursor.execute("UPDATE conversations SET last_modified = ? WHERE id = ?", (now, conversation_id))
+        conn.commit()
+        conn.close()
+
+    def get_session_snapshots(self, conversation_id: str) -> List[Dict[str, Any]]:
+        """Per-task snapshots of a conversation's missions, oldest first."""
         conn = self.get_db_connection()
         cursor = conn.cursor()
         cursor.execute(
-            "UPDATE conversations SET session_state = ?, last_modified = CURRENT_TIMESTAMP WHERE id = ?",
-            (json.dumps(state), conversation_id)
+            "SELECT id, task_key, snapshot, created_at FROM mission_snapshots WHERE conversation_id = ? ORDER BY id",
+            (conversation_id,)
+        )
+        rows = cursor.fetchall()
+        conn.close()
+        return [
+            {"id": row["id"], "task_key": row["task_key"], "created_at": row["created_at"], **json.loads(row["snapshot"])}
+            for row in rows
+        ]
+
+    def save_checkpoint(self, conversation_id: str, task_key: str, stage: str, model: str, result: Any):
+        """Store a model response (or, with model '', a whole stage's result) of an unfinished task."""
+        conn = self.get_db_connection()
+        conn.execute(
+            """INSERT OR REPLACE INTO mission_checkpoints (conversation_id, task_key, stage, model, result, created_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (conversation_id, task_key, stage, model, json.dumps(result), datetime.utcnow().isoformat())
         )
         conn.commit()
         conn.close()
 
+    def get_checkpoints(self, conversation_id: str, task_key: str) -> Dict[str, Dict[str, Any]]:
+        """A task's checkpointed results as {stage: {model: result}}."""
+        conn = self.get_db_connection()
+        rows = conn.execute(
+            "SELECT stage, model, result FROM mission_checkpoints WHERE conversation_id = ? AND task_key = ?",
+            (conversation_id, task_key)
+        ).fetchall()
+        conn.close()
+        checkpoints: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            checkpoints.setdefault(row["stage"], {})[row["model"]] = json.loads(row["result"])
+        return checkpoints
+
+    def set_mission_running(self, conversation_id: str, running: bool):
+        """Record that a mission run started (running=True) or ended; see list_interrupted_missions."""
+        conn = self.get_db_connection()
+        if running:
+            conn.execute(
+                "INSERT OR REPLACE INTO mission_runs (conversation_id, started_at) VALUES (?, ?)",
+                (conversation_id, datetime.utcnow().isoformat())
+            )
+        else:
+            conn.execute("DELETE FROM mission_runs WHERE conversation_id = ?", (conversation_id,))
+        conn.commit()
+        conn.close()
+
+    def list_interrupted_missions(self) -> List[Dict[str, Any]]:
+        """
+        Missions whose run never ended (still in mission_runs) and whose
+        session is still 'in_progress', with their unfinished task count and
+        the user message that started the run. Missions that failed, were
+        cancelled or were migrated from legacy session_state are not
+        included. Only meaningful at startup, before anything runs.
+        """
+        conn = self.get_db_connection()
+        rows = conn.execute(
+            """SELECT s.conversation_id,
+                      (SELECT COUNT(*) FROM mission_tasks t
+                       WHERE t.conversation_id = s.conversation_id AND COALESCE(t.status, '') != 'done') AS unfinished_tasks,
+                      (SELECT content FROM messages m
+                       WHERE m.conversation_id = s.conversation_id AND m.role = 'user'
+                       ORDER BY m.id DESC LIMIT 1) AS user_query
+               FROM mission_state s
+               JOIN mission_runs r ON r.conversation_id = s.conversation_id
+               WHERE json_extract(s.header, '$.status') = 'in_progress'
+               ORDER BY s.updated_at"""
+        ).fetchall()
+        conn.close()
+        return [dict(row) for row in rows]
+
+    # Jobs (see job_queue.py); last_seq is the sequence number of a job's last stored event (0 if none)
+    JOB_SELECT = "SELECT jobs.*, (SELECT COALESCE(MAX(seq), 0) FROM job_events WHERE job_id = jobs.id) AS last_seq FROM jobs"
+
+    @staticmethod
+    def _job(row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def create_job(self, job_id: str, conversation_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        conn = self.get_db_connection()
+        conn.execute(
+            "INSERT INTO jobs (id, conversation_id, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+            (job_id, conversation_id, json.dumps(payload), datetime.utcnow().isoformat())
+        )
+        conn.commit()
+        conn.close()
+        return self.get_job(job_id)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        conn = self.get_db_connection()
+        row = conn.execute(f"{self.JOB_SELECT} WHERE id = ?", (job_id,)).fetchone()
+        conn.close()
+        return self._job(row) if row else None
+
+    def list_jobs(self, conversation_id: Optional[str] = None, status: Optional[str] = None,
+                  limit: int = 50) -> List[Dict[str, Any]]:
+        """Newest first."""
+        conditions, params = [], []
+        if conversation_id:
+            conditions.append("conversation_id = ?")
+            params.append(conversation_id)
+        if status:
+            conditions.append("status = ?")
+            params.append(status)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        conn = self.get_db_connection()
+        rows = conn.execute(
+            f"{self.JOB_SELECT} {where_clause} ORDER BY created_at DESC, rowid DESC LIMIT ?",
+            (*params, limit)
+        ).fetchall()
+        conn.close()
+        return [self._job(row) for row in rows]
+
+    def claim_next_job(self, worker: str) -> Optional[Dict[str, Any]]:
+        """
+        Mark the oldest queued job as running on worker and return it (None
+        if nothing is runnable). Jobs of a conversation that already has a
+        running job wait, so one conversation's missions never overlap.
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        claimed = None
+        while claimed is None:
+            row = cursor.execute(
+                """SELECT id FROM jobs
+                   WHERE status = 'queued'
+                     AND conversation_id NOT IN (SELECT conversation_id FROM jobs WHERE status = 'running')
+                   ORDER BY created_at, rowid LIMIT 1"""
+            ).fetchone()
+            if row is None:
+                break
+            cursor.execute(
+                """UPDATE jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1
+                   WHERE id = ? AND status = 'queued'""",
+                (worker, datetime.utcnow().isoformat(), row["id"])
+            )
+            conn.commit()
+            if cursor.rowcount:
+                claimed = row["id"]
+        conn.close()
+        return self.get_job(claimed) if claimed else None
+
+    def update_job_status(self, job_id: str, status: str, error: Optional[str] = None,
+                          only_from: Optional[List[str]] = None) -> bool:
+        """
+        Set a job's status (finished_at too, for a final one). With only_from
+        the change only applies if the job is currently in one of those
+        states; returns whether it applied.
+        """
+        finished_at = datetime.utcnow().isoformat() if status in ("completed", "failed", "cancelled") else None
+        query = "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?"
+        params: List[Any] = [status, error, finished_at, job_id]
+        if only_from:
+            query += f" AND status IN ({', '.join('?' for _ in only_from)})"
+            params += list(only_from)
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        applied = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return applied
+
+    def reset_interrupted_jobs(self, max_attempts: int) -> Dict[str, int]:
+        """
+        Jobs left 'running' by a process that stopped: queue them again, or
+        fail them once they have been started max_attempts times.
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE jobs SET status = 'queued', worker = NULL WHERE status = 'running' AND attempts < ?",
+            (max_attempts,)
+        )
+        requeued = cursor.rowcount
+        cursor.execute(
+            """UPDATE jobs SET status = 'failed', error = 'Interrupted too many times', finished_at = ?
+               WHERE status = 'running'""",
+            (datetime.utcnow().isoformat(),)
+        )
+        failed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return {"requeued": requeued, "failed": failed}
+
+    def add_job_event(self, job_id: str, seq: int, event: Dict[str, Any]):
+        conn = self.get_db_connection()
+        conn.execute("INSERT OR REPLACE INTO job_events (job_id, seq, event) VALUES (?, ?, ?)",
+                     (job_id, seq, json.dumps(event)))
+        conn.commit()
+        conn.close()
+
+    def get_job_events(self, job_id: str, after_seq: int = 0, until_seq: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Stored events of a job with after_seq < seq (<= until_seq), in order."""
+        query = "SELECT event FROM job_events WHERE job_id = ? AND seq > ?"
+        params: List[Any] = [job_id, after_seq]
+        if until_seq is not None:
+            query += " AND seq <= ?"
+            params.append(until_seq)
+        conn = self.get_db_connection()
+        rows = conn.execute(query + " ORDER BY seq", params).fetchall()
+        conn.close()
+        return [json.loads(row["event"]) for row in rows]
+
     def get_conversation(self, conversation_id: str) -> Optional[Dict[str, Any]]:
         """Load a conversation and its messages."""
         conn = self.get_db_connection()
@@ -315,12 +840,11 @@ class Storage:
                 "role": row["role"],
                 "content": row["content"]
             }
-            if row["stage1"]: msg["stage1"] = json.loads(row["stage1"])
-            if row["stage2"]: msg["stage2"] = json.loads(row["stage2"])
-            if row["stage3"]: msg["stage3"] = json.loads(row["stage3"])
-            if row["metadata"]: msg["metadata"] = json.loads(row["metadata"])
+            for field in JSON_MESSAGE_FIELDS:
+                if row[field]: msg[field] = json.loads(row[field])
             messages.append(msg)
         
+        session_state = read_session_state(cursor, conversation_id)
         conn.close()
         
         return {
@@ -328,10 +852,71 @@ class Storage:
             "title": conv_row["title"],
             "created_at": conv_row["created_at"],
             "last_modified": conv_row["last_modified"],
-            "session_state": json.loads(conv_row["session_state"]) if conv_row["session_state"] else None,
+            "session_state": session_state,
+            "cache_mode": conv_row["cache_mode"],
             "messages": messages
         }
 
+    def get_conversation_summary(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Conversation header and message count, without loading any messages (None if missing)."""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            """SELECT id, title, created_at, last_modified, cache_mode, archived, message_count, revision_count
+               FROM conversations WHERE id = ?""",
+            (conversation_id,)
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return dict(row) if row else None
+
+    def get_messages(self, conversation_id: str, after_id: Optional[int] = None, limit: Optional[int] = None,
+                     fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Messages in id order, each with its id plus the requested fields
+        (default: all of MESSAGE_FIELDS). Only selected columns are read and
+        only selected stage/metadata JSON is decoded. after_id/limit page
+        through the conversation by message id.
+        """
+        fields = list(fields) if fields else list(MESSAGE_FIELDS)
+        unknown = [f for f in fields if f not in MESSAGE_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown message fields: {', '.join(unknown)}")
+
+        query = f"SELECT id, {', '.join(fields)} FROM messages WHERE conversation_id = ?"
+        params: List[Any] = [conversation_id]
+        if after_id is not None:
+            query += " AND id > ?"
+            params.append(after_id)
+        query += " ORDER BY id ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        messages = []
+        for row in cursor.fetchall():
+            msg = {"id": row["id"]}
+            for field in fields:
+                value = row[field]
+                msg[field] = json.loads(value) if value and field in JSON_MESSAGE_FIELDS else value
+            messages.append(msg)
+        conn.close()
+        return messages
+
+    def get_message_page(self, conversation_id: str, after_id: Optional[int] = None, limit: int = 50,
+                         fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """One page of get_messages(); next_cursor is the after_id for the next page, None on the last."""
+        messages = self.get_messages(conversation_id, after_id=after_id, limit=limit + 1, fields=fields)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        return {
+            "messages": messages,
+            "next_cursor": messages[-1]["id"] if has_more else None
+        }
+
     def archive_conversation(self, conversation_id: str) -> bool:
         """Archive a conversation."""
         conn = self.get_db_connection()
@@ -343,9 +928,16 @@ class Storage:
         return updated
 
     def delete_conversation(self, conversation_id: str) -> bool:
-        """Delete a conversation permanently (includes logs via CASCADE)."""
+        """Delete a conversation permanently, with its messages and audit logs."""
         conn = self.get_db_connection()
         cursor = conn.cursor()
+        # foreign_keys is off, so ON DELETE CASCADE never applied
+        cursor.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+        delete_audit_logs(cursor, conversation_id)
+        for table in ("mission_state", "mission_tasks", "mission_snapshots", "mission_checkpoints", "mission_runs"):
+            cursor.execute(f"DELETE FROM {table} WHERE conversation_id = ?", (conversation_id,))
+        cursor.execute("DELETE FROM job_events WHERE job_id IN (SELECT id FROM jobs WHERE conversation_id = ?)", (conversation_id,))
+        cursor.execute("DELETE FROM jobs WHERE conversation_id = ?", (conversation_id,))
         cursor.execute("DELETE FROM conversations WHERE id = ?", (conversation_id,))
         deleted = cursor.rowcount > 0
         conn.commit()
@@ -357,32 +949,62 @@ class Storage:
         conn = self.get_db_connection()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
-        cursor.execute("DELETE FROM audit_logs WHERE conversation_id = ?", (conversation_id,))
+        delete_audit_logs(cursor, conversation_id)
+        for table in ("mission_state", "mission_tasks", "mission_snapshots", "mission_checkpoints", "mission_runs"):
+            cursor.execute(f"DELETE FROM {table} WHERE conversation_id = ?", (conversation_id,))
         cursor.execute("UPDATE conversations SET session_state = NULL, last_modified = CURRENT_TIMESTAMP WHERE id = ?", (conversation_id,))
         conn.commit()
         conn.close()
         return True
 
-    def list_conversations(self, include_archived: bool = False) -> List[Dict[str, Any]]:
-        """List all conversations (metadata only)."""
+    def list_conversations(self, include_archived: bool = False, limit: Optional[int] = None,
+                           cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List conversations (metadata only), most recently modified first.
+        limit/cursor page through them; see list_conversation_page().
+        """
         conn = self.get_db_connection()
-        cursor = conn.cursor()
+        db_cursor = conn.cursor()
         
-        where_clause = "" if include_archived else "WHERE archived = 0"
+        conditions, params = [], []
+        if not include_archived:
+            conditions.append("archived = 0")
+        if cursor:
+            last_modified, conv_id = decode_conversation_cursor(cursor)
+            conditions.append("(last_modified, id) < (?, ?)")
+            params += [last_modified, conv_id]
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        limit_clause = ""
+        if limit is not None:
+            limit_clause = "LIMIT ?"
+            params.append(limit)
         
-        cursor.execute(f'''
-            SELECT c.*, 
-                   (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id) as message_count,
-                   (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id AND role = 'assistant') as revision_count
-            FROM conversations c
+        # message_count/revision_count are kept current by triggers on messages
+        db_cursor.execute(f'''
+            SELECT id, title, created_at, last_modified, archived, cache_mode,
+                   message_count, revision_count
+            FROM conversations
             {where_clause}
-            ORDER BY last_modified DESC
-        ''')
-        rows = cursor.fetchall()
+            ORDER BY last_modified DESC, id DESC
+            {limit_clause}
+        ''', params)
+        rows = db_cursor.fetchall()
         conn.close()
         
         return [dict(row) for row in rows]
 
+    def list_conversation_page(self, limit: int = 50, cursor: Optional[str] = None,
+                               include_archived: bool = False) -> Dict[str, Any]:
+        """One page of list_conversations(); pass next_cursor back for the next page (None on the last)."""
+        conversations = self.list_conversations(include_archived, limit=limit + 1, cursor=cursor)
+        has_more = len(conversations) > limit
+        conversations = conversations[:limit]
+        last = conversations[-1] if conversations else None
+        return {
+            "conversations": conversations,
+            "next_cursor": encode_conversation_cursor(last["last_modified"], last["id"]) if has_more else None
+        }
+
     def save_fail_list(self, name: str, failed_models: List[str]) -> int:
         """Save a fail list, keeping only the last 5."""
         conn = self.get_db_connection()
@@ -511,45 +1133,143 @@ class Storage:
                       model_id: str = None, log_message: str = None, 
                       raw_data: Any = None, metadata: Dict = None):
         """Add a granular audit log entry."""
-        now = datetime.utcnow().isoformat()
+        self.add_audit_logs([audit_row(conversation_id, step, task_id, model_id, log_message, raw_data, metadata)])
+
+    def add_audit_logs(self, rows: List[tuple]):
+        """Insert audit_row() tuples in one transaction; raw_data goes to the audit_blobs table."""
         conn = self.get_db_connection()
         cursor = conn.cursor()
-        
-        cursor.execute(
+        # Take the write lock before checking for existing blobs, so prune_audit_blobs
+        # cannot delete one between the check and the insert of the row using it
+        cursor.execute("BEGIN IMMEDIATE")
+        stored = []
+        for row in rows:
+            raw = row[6]
+            raw_hash = blob_store.store(cursor, raw) if raw is not None else None
+            stored.append(row[:6] + (None, row[7], raw_hash))
+        cursor.executemany(
             """INSERT INTO audit_logs 
-               (conversation_id, timestamp, task_id, step, model_id, log_message, raw_data, metadata) 
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                conversation_id,
-                now,
-                task_id,
-                step,
-                model_id,
-                log_message,
-                json.dumps(raw_data) if raw_data is not None else None,
-                json.dumps(metadata) if metadata else None
-            )
+               (conversation_id, timestamp, task_id, step, model_id, log_message, raw_data, metadata, raw_hash) 
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            stored
         )
         conn.commit()
         conn.close()
 
-    def get_audit_logs(self, conversation_id: str) -> List[Dict[str, Any]]:
-        """Get all audit logs for a conversation."""
+    def get_audit_logs(self, conversation_id: str, include_raw: bool = True) -> List[Dict[str, Any]]:
+        """
+        Get all audit logs for a conversation, including ones still buffered.
+        With include_raw=False compressed payloads are not loaded; rows carry
+        raw_hash and raw_size instead, for get_audit_blob().
+        """
+        from .audit_sink import audit_sink
+        audit_sink.flush()
         conn = self.get_db_connection()
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT * FROM audit_logs WHERE conversation_id = ? ORDER BY timestamp ASC",
+            """SELECT audit_logs.*, audit_blobs.size AS raw_size
+               FROM audit_logs LEFT JOIN audit_blobs ON audit_blobs.hash = audit_logs.raw_hash
+               WHERE conversation_id = ? ORDER BY timestamp ASC""",
             (conversation_id,)
         )
-        rows = cursor.fetchall()
+        logs = [dict(row) for row in cursor.fetchall()]
+        if include_raw:
+            payloads = blob_store.load(cursor, [log["raw_hash"] for log in logs if log["raw_hash"]])
+            for log in logs:
+                if log["raw_hash"]:
+                    log["raw_data"] = payloads.get(log["raw_hash"])
         conn.close()
-        return [dict(row) for row in rows]
+        return logs
+
+    def iter_audit_logs(self, conversation_id: str, batch_size: int = 200) -> Iterator[Dict[str, Any]]:
+        """
+        get_audit_logs() as a generator over a cursor: rows (with raw_data
+        decompressed) are fetched batch_size at a time, so only one batch is
+        in memory. Holds a read connection until exhausted or closed.
+        """
+        from .audit_sink import audit_sink
+        audit_sink.flush()
+        conn = self.get_db_connection()
+        try:
+            cursor = conn.execute(
+                """SELECT audit_logs.*, audit_blobs.size AS raw_size,
+                          audit_blobs.codec AS raw_codec, audit_blobs.data AS raw_blob
+                   FROM audit_logs LEFT JOIN audit_blobs ON audit_blobs.hash = audit_logs.raw_hash
+                   WHERE conversation_id = ? ORDER BY timestamp ASC""",
+                (conversation_id,)
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    log = dict(row)
+                    codec, blob = log.pop("raw_codec"), log.pop("raw_blob")
+                    if blob is not None:
+                        log["raw_data"] = blob_store.decompress(codec, blob)
+                    yield log
+        finally:
+            conn.close()
+
+    def search(self, query: str, **filters) -> List[Dict[str, Any]]:
+        """Full-text search; see search_index.search() for the filters."""
+        if not self.search_available:
+            raise RuntimeError("Full-text search needs SQLite with FTS5")
+        from .audit_sink import audit_sink
+        audit_sink.flush()
+        conn = self.get_db_connection()
+        try:
+            return search_index.search(conn.cursor(), query, **filters)
+        finally:
+            conn.close()
+
+    def get_audit_blob(self, raw_hash: str) -> Optional[str]:
+        """The raw_data JSON stored under raw_hash."""
+        conn = self.get_db_connection()
+        payload = blob_store.load(conn.cursor(), [raw_hash]).get(raw_hash)
+        conn.close()
+        return payload
+
+    def migrate_audit_blobs(self, batch_size: int = 500) -> Dict[str, int]:
+        """Move inline audit_logs.raw_data into audit_blobs (one-shot, resumable)."""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        moved = 0
+        while True:
+            rows = cursor.execute(
+                "SELECT id, raw_data FROM audit_logs WHERE raw_data IS NOT NULL AND raw_hash IS NULL LIMIT ?",
+                (batch_size,)
+            ).fetchall()
+            if not rows:
+                break
+            cursor.execute("BEGIN IMMEDIATE")
+            for row in rows:
+                raw_hash = blob_store.store(cursor, row["raw_data"])
+                cursor.execute("UPDATE audit_logs SET raw_data = NULL, raw_hash = ? WHERE id = ?", (raw_hash, row["id"]))
+            conn.commit()
+            moved += len(rows)
+        blobs = cursor.execute("SELECT COUNT(*) FROM audit_blobs").fetchone()[0]
+        conn.close()
+        return {"rows": moved, "blobs": blobs}
+
+    def prune_audit_blobs(self) -> int:
+        """
+        Delete every payload no audit log refers to any more (a full sweep;
+        deleting a conversation already removes the payloads only it used).
+        """
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM audit_blobs WHERE hash NOT IN (SELECT raw_hash FROM audit_logs WHERE raw_hash IS NOT NULL)"
+        )
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
 
     def add_analysis_result(self, conversation_id: str, analysis: str):
         """Add an analysis result to the conversation's metadata."""
-        session_state = self.get_session_state(conversation_id) or {}
-        session_state["analysis_result"] = analysis
-        self.update_session_state(conversation_id, session_state)
+        self.update_session_delta(conversation_id, header={"analysis_result": analysis})
 
     def update_conversation_title(self, conversation_id: str, title: str):
         """Update conversation title."""
@@ -562,6 +1282,25 @@ class Storage:
         conn.commit()
         conn.close()
 
+    def get_cache_mode(self, conversation_id: str) -> Optional[str]:
+        """Get the response cache mode chosen for a conversation (None = configured default)."""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT cache_mode FROM conversations WHERE id = ?", (conversation_id,))
+        row = cursor.fetchone()
+        conn.close()
+        return row["cache_mode"] if row else None
+
+    def set_cache_mode(self, conversation_id: str, mode: Optional[str]) -> bool:
+        """Set the response cache mode for a conversation; None falls back to the configured default."""
+        conn = self.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("UPDATE conversations SET cache_mode = ? WHERE id = ?", (mode, conversation_id))
+        updated = cursor.rowcount > 0
+        conn.commit()
+        conn.close()
+        return updated
+
     # API Key Management
     def get_key_for_model(self, model_id: str) -> Optional[str]:
         """
@@ -569,12 +1308,22 @@ class Storage:
         Logic:
         1. Check if model is free (via unified_models or heuristic).
         2. If free, try to find a key labeled 'Free' or 'Budget: $0'.
-        3. Else, use a paid key (default or specific).
+        3. Else, use a paid key with limit remaining (default or specific).
         4. Fallback to any available OpenRouter key.
+        When several keys qualify, key_pool spreads calls across them. The
+        eligible keys per model are memoized, so this does no DB access
+        until a key is saved or deleted.
         """
-        conn = self.get_db_connection()
-        cursor = conn.cursor()
-        
+        from .key_pool import pool
+
+        eligible = self._eligible_by_model.get(model_id)
+        if eligible is None:
+            keys = self._load_keyring()
+            eligible = self._eligible_keys(keys, self._is_free_model(model_id)) if keys else []
+            self._eligible_by_model[model_id] = eligible
+        return pool.choose(eligible)
+
+    def _is_free_model(self, model_id: str) -> bool:
         # 1. Check if model is free
         # First check unified_models table
         is_free = False
@@ -593,25 +1342,36 @@ class Storage:
             # Or we just check if any model with this ID exists and is free
             # Since unified_models schema is complex, let's stick to heuristic + simple check if we can
             pass
+        return is_free
 
-        # 2. Get all OpenRouter keys
-        cursor.execute("SELECT * FROM api_keys WHERE provider = 'openrouter' AND is_active = 1")
-        keys = [dict(r) for r in cursor.fetchall()]
-        conn.close()
-        
-        if not keys:
-            return None
-            
-        # 3. Select key
+    def _load_keyring(self) -> List[Dict[str, Any]]:
+        """2. Get all active OpenRouter keys, read once until invalidate_keyring()."""
+        if self._keyring is None:
+            conn = self.get_db_connection()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM api_keys WHERE provider = 'openrouter' AND is_active = 1")
+            self._keyring = [dict(r) for r in cursor.fetchall()]
+            conn.close()
+            self._eligible_by_model = {}
+        return self._keyring
+
+    def invalidate_keyring(self):
+        """Drop the cached keys; called whenever api_keys changes."""
+        self._keyring = None
+        self._eligible_by_model = {}
+
+    def _eligible_keys(self, keys: List[Dict[str, Any]], is_free: bool) -> List[Dict[str, Any]]:
+        """3. The active keys a model may use, most specific tier first."""
         if is_free:
-            # Look for "free" key
+            # Look for "free" keys
+            free_keys = []
             for k in keys:
                 label = (k.get("label") or "").lower()
                 desc = (k.get("description") or "").lower()
                 if "free" in label or "free" in desc or "$0" in label or "$0" in desc:
-                    return k["key_value"]
+                    free_keys.append(k)
             # Fallback to any key
-            return keys[0]["key_value"]
+            return free_keys or keys
         else:
             # Look for paid key (avoid keys explicitly marked as free only if possible)
             paid_keys = []
@@ -624,14 +1384,11 @@ class Storage:
             if not paid_keys:
                 paid_keys = keys
                 
-            # Prefer keys with remaining limit > 0
-            for k in paid_keys:
-                limit = k.get("limit_remaining")
-                if limit is not None and limit > 0:
-                    return k["key_value"]
-            
-            # Fallback: return the first paid/default key
-            return paid_keys[0]["key_value"]
+            # Prefer keys with remaining limit > 0 (None means no limit is set)
+            with_limit = [k for k in paid_keys if k.get("limit_remaining") is None or k["limit_remaining"] > 0]
+
+            # Fallback: all paid/default keys
+            return with_limit or paid_keys
 
     def list_api_keys(self) -> List[Dict[str, Any]]:
         """List all API keys."""
@@ -698,6 +1455,11 @@ class Storage:
             
         conn.commit()
         conn.close()
+        self.invalidate_keyring()
+
+        # A saved (edited or re-checked) key gets another chance in rotation
+        from .key_pool import pool
+        pool.reinstate(key_data["key_value"])
         return key_id
 
     def delete_api_key(self, key_id: int):
@@ -707,6 +1469,7 @@ class Storage:
         cursor.execute("DELETE FROM api_keys WHERE id = ?", (key_id,))
         conn.commit()
         conn.close()
+        self.invalidate_keyring()
 
     def get_api_key(self, key_id: int) -> Optional[Dict[str, Any]]:
         """Get a specific API key."""
@@ -1,7 +1,9 @@
 import os
 import sys
+import io
 import json
 import unittest
+import zipfile
 from fastapi.testclient import TestClient
 
 # Add project root to path
@@ -27,6 +29,76 @@ class TestLLMCouncilAPI(unittest.TestCase):
         # We might not be able to delete on Windows if it's open, but that's okay for tests
         pass
 
+    def test_search_endpoint(self):
+        conv_id = self.client.post("/api/conversations", json={}).json()["id"]
+        storage.add_user_message(conv_id, "Compare photosynthesis pathways")
+        resp = self.client.get("/api/search", params={"q": "photosynthesis"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["results"][0]["conversation_id"], conv_id)
+        self.assertEqual(self.client.get("/api/search", params={"q": "x", "kinds": "bogus"}).status_code, 400)
+
+    def test_audit_export_stream(self):
+        conv_id = self.client.post("/api/conversations", json={}).json()["id"]
+        storage.add_audit_log(conv_id, "stage1_query", model_id="m1", raw_data={"content": "hi"})
+        resp = self.client.get(f"/api/audit/{conv_id}/export", params={"raw": "verbatim"})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.headers["content-type"], "application/zip")
+        self.assertIn("attachment", resp.headers["content-disposition"])
+        with zipfile.ZipFile(io.BytesIO(resp.content)) as zipf:
+            self.assertIn("conversation_history.json", zipf.namelist())
+        self.assertEqual(self.client.get(f"/api/audit/{conv_id}/export?raw=bogus").status_code, 400)
+        self.assertEqual(self.client.get("/api/audit/missing/export").status_code, 404)
+
+    def test_job_endpoints(self):
+        conv_id = self.client.post("/api/conversations", json={}).json()["id"]
+        # Not the first message, so no title is generated
+        storage.add_user_message(conv_id, "earlier")
+        job = self.client.post(f"/api/conversations/{conv_id}/jobs", json={"content": "go"}).json()
+        self.assertEqual(job["status"], "queued")
+        self.assertEqual(self.client.get(f"/api/jobs/{job['id']}").json()["payload"]["content"], "go")
+        # One mission per conversation at a time
+        self.assertEqual(self.client.post(f"/api/conversations/{conv_id}/jobs", json={"content": "again"}).status_code, 409)
+
+        self.assertEqual(self.client.post(f"/api/jobs/{job['id']}/cancel").status_code, 200)
+        self.assertEqual(self.client.post(f"/api/jobs/{job['id']}/cancel").status_code, 409)
+        self.assertEqual(self.client.get(f"/api/jobs?conversation_id={conv_id}").json()[0]["status"], "cancelled")
+        events = self.client.get(f"/api/jobs/{job['id']}/events").text
+        self.assertIn('"status": "cancelled"', events)
+        self.assertEqual(self.client.get("/api/jobs/missing").status_code, 404)
+        self.assertEqual(self.client.post(f"/api/conversations/{conv_id}/cancel").status_code, 409)
+        self.assertEqual(self.client.get("/api/jobs/missing/events").status_code, 404)
+
+    def test_conversation_list_pages(self):
+        ids = {self.client.post("/api/conversations", json={}).json()["id"] for _ in range(3)}
+        self.assertEqual(len(self.client.get("/api/conversations").json()), 3)
+
+        page = self.client.get("/api/conversations?limit=2").json()
+        self.assertEqual(len(page["conversations"]), 2)
+        rest = self.client.get(f"/api/conversations?limit=2&cursor={page['next_cursor']}").json()
+        self.assertIsNone(rest["next_cursor"])
+        self.assertEqual({c["id"] for c in page["conversations"] + rest["conversations"]}, ids)
+        self.assertEqual(self.client.get("/api/conversations?cursor=bogus").status_code, 400)
+
+    def test_conversation_pagination(self):
+        conv_id = self.client.post("/api/conversations", json={}).json()["id"]
+        for i in range(3):
+            storage.add_message(conv_id, "user", f"q{i}")
+
+        # Without paging parameters the full conversation is returned as before
+        full = self.client.get(f"/api/conversations/{conv_id}").json()
+        self.assertEqual([m["content"] for m in full["messages"]], ["q0", "q1", "q2"])
+
+        first = self.client.get(f"/api/conversations/{conv_id}?message_limit=2&fields=content").json()
+        self.assertEqual(first["message_count"], 3)
+        self.assertEqual([m["content"] for m in first["messages"]], ["q0", "q1"])
+        rest = self.client.get(f"/api/conversations/{conv_id}/messages?after={first['next_cursor']}").json()
+        self.assertEqual([m["content"] for m in rest["messages"]], ["q2"])
+        self.assertIsNone(rest["next_cursor"])
+
+        self.assertEqual(self.client.get(f"/api/conversations/{conv_id}/summary").json()["message_count"], 3)
+        self.assertEqual(self.client.get(f"/api/conversations/{conv_id}/messages?fields=bogus").status_code, 400)
+        self.assertEqual(self.client.get("/api/conversations/missing/messages").status_code, 404)
+
     def test_root_health_check(self):
         response = self.client.get("/")
         self.assertEqual(response.status_code, 200)
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.async_storage import AsyncStorage, is_write
+from backend.metrics import LatencyRecorder, LoopLagMonitor
+from backend.storage import Storage
+
+
+class TestAsyncStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "async.db"))
+        self.addCleanup(self.storage.close)
+        p = patch("backend.storage.storage", self.storage)
+        p.start()
+        self.addCleanup(p.stop)
+        self.facade = AsyncStorage()
+        self.addCleanup(self.facade.shutdown)
+
+    def test_methods_are_routed_by_name(self):
+        self.assertTrue(is_write("add_audit_log"))
+        self.assertTrue(is_write("update_session_state"))
+        self.assertFalse(is_write("get_conversation"))
+        self.assertFalse(is_write("list_conversations"))
+
+    def test_queued_writes_are_visible_to_later_reads(self):
+        async def scenario():
+            conversation = await self.facade.create_conversation("c1")
+            for i in range(20):
+                self.facade.submit("update_session_state", "c1", {"step": i})
+            return conversation, await self.facade.get_session_state("c1")
+
+        conversation, state = asyncio.run(scenario())
+        self.assertEqual(conversation["id"], "c1")
+        self.assertEqual(state, {"step": 19})
+
+    def test_cancelled_write_does_not_skip_the_read_barrier(self):
+        async def scenario():
+            await self.facade.create_conversation("c1")
+            self.facade.submit(lambda: (time.sleep(0.2), self.storage.update_session_state("c1", {"step": 1})))
+            # Cancelled while still queued behind the slow write above
+            write = asyncio.create_task(self.facade.update_session_state("c1", {"step": 2}))
+            await asyncio.sleep(0.01)
+            write.cancel()
+            await asyncio.gather(write, return_exceptions=True)
+            return await self.facade.get_session_state("c1")
+
+        self.assertEqual(asyncio.run(scenario()), {"step": 1})
+
+    def test_slow_storage_does_not_block_the_loop(self):
+        def slow_list(include_archived=False):
+            time.sleep(0.2)
+            return []
+
+        async def scenario():
+            ticks = []
+
+            async def ticker():
+                for _ in range(10):
+                    ticks.append(time.monotonic())
+                    await asyncio.sleep(0.01)
+
+            with patch.object(self.storage, "list_conversations", slow_list):
+                await asyncio.gather(self.facade.list_conversations(), ticker())
+            return ticks
+
+        ticks = asyncio.run(scenario())
+        self.assertLess(max(b - a for a, b in zip(ticks, ticks[1:])), 0.1)
+
+
+class TestLoopLagMonitor(unittest.TestCase):
+    def test_blocking_call_shows_up_as_lag(self):
+        recorder = LatencyRecorder()
+        monitor = LoopLagMonitor(recorder, interval=0.01)
+
+        async def scenario():
+            monitor.start()
+            await asyncio.sleep(0.05)
+            time.sleep(0.1)  # block the loop
+            await asyncio.sleep(0.05)
+            monitor.stop()
+
+        asyncio.run(scenario())
+        self.assertGreaterEqual(recorder.summary()["event_loop"]["max"], 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import blob_store
+from backend.storage import Storage
+
+
+class TestAuditBlobs(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "blobs.db"))
+        self.addCleanup(self.storage.close)
+        # Audit reads flush the global sink, which writes to the global storage
+        p = patch("backend.storage.storage", self.storage)
+        p.start()
+        self.addCleanup(p.stop)
+        self.storage.create_conversation("c1")
+
+    def blob_count(self):
+        conn = self.storage.get_db_connection()
+        count = conn.execute("SELECT COUNT(*) FROM audit_blobs").fetchone()[0]
+        conn.close()
+        return count
+
+    def test_round_trip_and_dedupe(self):
+        payload = {"content": "answer " * 200, "usage": {"total_tokens": 10}}
+        self.storage.add_audit_log("c1", "stage1_query", model_id="m1", raw_data=payload)
+        self.storage.add_audit_log("c1", "stage1_query", model_id="m2", raw_data=payload)
+        self.storage.add_audit_log("c1", "stage0_plan")
+
+        logs = self.storage.get_audit_logs("c1")
+        self.assertEqual(json.loads(logs[0]["raw_data"]), payload)
+        self.assertEqual(logs[0]["raw_hash"], logs[1]["raw_hash"])
+        self.assertIsNone(logs[2]["raw_data"])
+        self.assertEqual(self.blob_count(), 1)
+
+    def test_payloads_are_loaded_lazily(self):
+        self.storage.add_audit_log("c1", "stage1_query", raw_data={"content": "x" * 1000})
+        log = self.storage.get_audit_logs("c1", include_raw=False)[0]
+        self.assertIsNone(log["raw_data"])
+        self.assertGreater(log["raw_size"], 1000)
+        self.assertEqual(json.loads(self.storage.get_audit_blob(log["raw_hash"])), {"content": "x" * 1000})
+        self.assertIsNone(self.storage.get_audit_blob("missing"))
+
+    def test_migrates_inline_payloads(self):
+        conn = self.storage.get_db_connection()
+        for i in range(3):
+            conn.execute(
+                "INSERT INTO audit_logs (conversation_id, timestamp, step, raw_data) VALUES (?, ?, ?, ?)",
+                ("c1", f"2026-01-01T00:00:0{i}", "legacy", json.dumps({"n": i % 2}))
+            )
+        conn.commit()
+        conn.close()
+
+        self.assertEqual(self.storage.migrate_audit_blobs(batch_size=2), {"rows": 3, "blobs": 2})
+        self.assertEqual(self.storage.migrate_audit_blobs()["rows"], 0)
+        logs = self.storage.get_audit_logs("c1")
+        self.assertEqual([json.loads(log["raw_data"])["n"] for log in logs], [0, 1, 0])
+
+    def test_reset_prunes_orphaned_blobs(self):
+        self.storage.add_audit_log("c1", "stage1_query", raw_data={"content": "gone"})
+        self.storage.reset_conversation("c1")
+        self.assertEqual(self.blob_count(), 0)
+
+    def test_delete_keeps_payloads_other_conversations_use(self):
+        self.storage.create_conversation("c2")
+        self.storage.add_audit_log("c1", "stage1_query", raw_data={"content": "shared"})
+        self.storage.add_audit_log("c1", "stage1_query", raw_data={"content": "only c1"})
+        self.storage.add_audit_log("c2", "stage1_query", raw_data={"content": "shared"})
+
+        self.storage.delete_conversation("c1")
+        self.assertEqual(self.blob_count(), 1)
+        self.assertEqual(json.loads(self.storage.get_audit_logs("c2")[0]["raw_data"]), {"content": "shared"})
+
+    def test_concurrent_prune_cannot_orphan_a_new_row(self):
+        """A prune between the blob check and the row insert must wait for the insert."""
+        payload = {"content": "shared"}
+        self.storage.add_audit_log("c1", "stage1_query", raw_data=payload)
+        self.storage.create_conversation("c2")
+        store = blob_store.store
+        pruner = threading.Thread(target=self.storage.delete_conversation, args=("c1",))
+
+        def store_then_prune(cursor, text):
+            digest = store(cursor, text)
+            pruner.start()
+            time.sleep(0.2)
+            return digest
+
+        with patch.object(blob_store, "store", store_then_prune):
+            self.storage.add_audit_log("c2", "stage1_query", raw_data=payload)
+        pruner.join()
+
+        self.assertEqual(self.blob_count(), 1)
+        self.assertEqual(json.loads(self.storage.get_audit_logs("c2")[0]["raw_data"]), payload)
+
+    def test_zstd_falls_back_to_zlib(self):
+        with patch.object(blob_store, "zstd_available", return_value=False):
+            codec, data = blob_store.compress("hello", codec=blob_store.ZSTD)
+        self.assertEqual(codec, blob_store.ZLIB)
+        self.assertEqual(blob_store.decompress(codec, data), "hello")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import os
+import sys
+import json
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import audit_service
+from backend.storage import Storage
+
+
+class TestAuditExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "export.db"))
+        self.addCleanup(self.storage.close)
+        p = patch("backend.storage.storage", self.storage)
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.storage.create_conversation("c1")
+        self.payload = {"content": "answer ü " * 50, "usage": {"total_tokens": 10}}
+        for i in range(7):
+            self.storage.add_audit_log("c1", "stage1_query", model_id=f"openai/m{i}",
+                                       log_message=f"call {i}", raw_data=self.payload)
+        self.storage.add_audit_log("c1", "stage0_plan", metadata={"tasks": 2})
+        for i in range(5):
+            self.storage.add_message("c1", "user", f"q{i}")
+        self.storage.add_analysis_result("c1", "All good")
+
+    def archive(self, **kwargs) -> zipfile.ZipFile:
+        chunks = list(audit_service.iter_audit_archive("c1", batch_size=3, **kwargs))
+        self.assertGreater(len(chunks), 3)
+        return zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def test_pretty_matches_original_layout(self):
+        zipf = self.archive()
+        logs = sorted(n for n in zipf.namelist() if n.startswith("logs/"))
+        self.assertEqual(len(logs), 8)
+        entry = json.loads(zipf.read(logs[0]))
+        self.assertEqual(entry["raw_data"], self.payload)
+        self.assertEqual(entry["model"], "openai/m0")
+        self.assertTrue(logs[0].endswith("_000_stage1_query_m0.json"))
+
+        history = json.loads(zipf.read("conversation_history.json"))
+        self.assertEqual([m["content"] for m in history], [f"q{i}" for i in range(5)])
+        self.assertEqual(zipf.read("ANALYSIS_RESULT.txt").decode(), "All good")
+        self.assertEqual(json.loads(zipf.read("session_state.json"))["analysis_result"], "All good")
+
+    def test_verbatim_keeps_stored_payload_bytes(self):
+        stored = self.storage.get_audit_logs("c1")[0]["raw_data"]
+        zipf = self.archive(raw="verbatim")
+        name = sorted(n for n in zipf.namelist() if n.startswith("logs/"))[0]
+        text = zipf.read(name).decode("utf-8")
+        self.assertIn(stored, text)
+        self.assertEqual(json.loads(text)["raw_data"], self.payload)
+
+    def test_none_omits_payloads(self):
+        zipf = self.archive(raw="none")
+        for name in zipf.namelist():
+            if name.startswith("logs/"):
+                self.assertNotIn("raw_data", json.loads(zipf.read(name)))
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            list(audit_service.iter_audit_archive("c1", raw="gzip"))
+
+    def test_export_to_file(self):
+        path = audit_service.export_audit_archive("c1", output_dir=self.tmp.name)
+        with zipfile.ZipFile(path) as zipf:
+            self.assertIsNone(zipf.testzip())
+
+
+if __name__ == "__main__":
+    unittest.main()
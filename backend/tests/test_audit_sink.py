@@ -0,0 +1,75 @@
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import audit_sink as audit_sink_module
+from backend.async_storage import AsyncStorage
+from backend.audit_sink import AuditSink
+from backend.storage import Storage
+
+
+class TestAuditSink(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "audit.db"))
+        self.addCleanup(self.storage.close)
+        self.sink = AuditSink()
+        self.facade = AsyncStorage()
+        self.addCleanup(self.facade.shutdown)
+        self.settings = {"batch_size": 5, "flush_interval": 0.05}
+        patches = [
+            patch("backend.storage.storage", self.storage),
+            patch("backend.async_storage.storage", self.facade),
+            patch.object(audit_sink_module, "audit_sink", self.sink),
+            patch.object(audit_sink_module, "get_settings", lambda: self.settings),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_entries_are_written_in_batches(self):
+        async def scenario():
+            with patch.object(self.storage, "add_audit_logs", wraps=self.storage.add_audit_logs) as write:
+                for i in range(12):
+                    self.sink.add("c1", "stage1_query", model_id=f"m{i}", raw_data={"i": i})
+                self.assertGreater(self.sink.pending(), 0)
+                await self.sink.aflush()
+                return write.call_count
+
+        calls = asyncio.run(scenario())
+        self.assertLessEqual(calls, 3)
+        logs = self.storage.get_audit_logs("c1")
+        self.assertEqual([log["model_id"] for log in logs], [f"m{i}" for i in range(12)])
+
+    def test_interval_flush(self):
+        async def scenario():
+            self.sink.add("c1", "stage0_plan")
+            await asyncio.sleep(0.2)
+            return self.sink.pending(), self.sink.entries
+
+        self.assertEqual(asyncio.run(scenario()), (0, 1))
+
+    def test_reads_see_buffered_entries(self):
+        async def scenario():
+            self.sink.add("c1", "stage3_synthesis", log_message="done")
+            return await self.facade.get_audit_logs("c1")
+
+        logs = asyncio.run(scenario())
+        self.assertEqual([log["step"] for log in logs], ["stage3_synthesis"])
+
+    def test_without_a_loop_entries_are_written_immediately(self):
+        self.sink.add("c1", "script")
+        self.assertEqual(self.sink.pending(), 0)
+        self.assertEqual(len(self.storage.get_audit_logs("c1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import cancellation, council, job_queue
+from backend.storage import Storage
+
+
+class FakeRequest:
+    """Stands in for the HTTP request; the client goes away after `polls` checks."""
+
+    def __init__(self, polls: int):
+        self.polls = polls
+
+    async def is_disconnected(self) -> bool:
+        self.polls -= 1
+        return self.polls < 0
+
+
+class TestCancellation(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "cancel.db"))
+        self.addCleanup(self.storage.close)
+        patcher = patch("backend.storage.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings = patch("backend.cancellation.get_settings", return_value={
+            "disconnect_poll_interval": 0.05, "default_completion_tokens": 500, "chars_per_token": 4.0
+        })
+        settings.start()
+        self.addCleanup(settings.stop)
+        self.conv_id = self.storage.create_conversation()["id"]
+        self.storage.update_session_state(self.conv_id, {
+            "status": "in_progress", "blueprint": {"tasks": [{"id": "t1"}, {"id": "t2"}]},
+            "results": {}, "task_status": {"t1": "done", "t2": "running"}
+        })
+        self.started = []
+
+    async def fake_query_model_streaming(self, model, messages, on_delta, timeout=None, api_key=None):
+        self.started.append(model)
+        on_delta("x" * 400)  # 100 tokens already generated
+        await asyncio.sleep(60)
+
+    async def fake_query_model(self, model, messages, timeout=None, api_key=None):
+        if model == "fast":
+            return {"content": "ok", "usage": {"completion_tokens": 300}}
+        self.started.append(model)
+        await asyncio.sleep(60)
+
+    async def fake_council(self, content, conversation_id=None, log_callback=None, event_callback=None, cache_mode=None, resume=False):
+        await council._query("fast", [], 10)
+        # A straggler left running in its own task, plus the call the mission waits on
+        asyncio.ensure_future(council._query("straggler", [], 10))
+        await council._query("slow", [], 10, on_delta=lambda text: None)
+
+    def run_patched(self, scenario):
+        with patch.object(council, "query_model", self.fake_query_model), \
+             patch.object(council, "query_model_streaming", self.fake_query_model_streaming), \
+             patch.object(council, "run_full_council", self.fake_council):
+            return asyncio.run(scenario())
+
+    def cancel_audit(self):
+        logs = [l for l in self.storage.get_audit_logs(self.conv_id) if l["step"] == "mission_cancelled"]
+        self.assertEqual(len(logs), 1)
+        return json.loads(logs[0]["metadata"])
+
+    def test_cancel_stops_every_call_and_is_audited(self):
+        events = []
+
+        async def scenario():
+            task = asyncio.create_task(job_queue.run_mission(self.conv_id, "q", events.append))
+            await asyncio.sleep(0.1)
+            report = cancellation.missions.cancel(self.conv_id, "cancel requested")
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            mission_calls = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            await asyncio.sleep(0)
+            return report, mission_calls
+
+        report, leftover = self.run_patched(scenario)
+        self.assertEqual(sorted(self.started), ["slow", "straggler"])
+        self.assertTrue(all(t.done() for t in leftover))
+        calls = {c["model"]: c for c in report["calls_cancelled"]}
+        # Expected output is the mission's mean completion (300 tokens), minus what was already streamed
+        self.assertEqual(calls["slow"]["streamed_tokens"], 100)
+        self.assertEqual(calls["slow"]["estimated_tokens_saved"], 200)
+        self.assertEqual(calls["straggler"]["estimated_tokens_saved"], 300)
+        self.assertEqual(report["estimated_tokens_saved"], 500)
+
+        self.assertEqual(events[-1]["type"], "cancelled")
+        self.assertEqual(events[-1]["unfinished_tasks"], ["t2"])
+        self.assertEqual(self.cancel_audit()["estimated_tokens_saved"], 500)
+        self.assertEqual(self.storage.get_session_state(self.conv_id)["status"], "cancelled")
+        self.assertIsNone(cancellation.missions.get(self.conv_id))
+
+    def test_client_disconnect_cancels_the_mission(self):
+        from backend.main import send_message, SendMessageRequest
+
+        async def scenario():
+            with patch("backend.main.store_user_message"):
+                response = await send_message(self.conv_id, SendMessageRequest(content="q"), FakeRequest(polls=2))
+            frames = [frame async for frame in response.body_iterator]
+            await asyncio.sleep(0.1)
+            return frames
+
+        frames = self.run_patched(scenario)
+        self.assertIn('"type": "cancelled"', frames[-1])
+        self.assertEqual(self.cancel_audit()["reason"], "client disconnected")
+
+    def test_disconnect_cancels_its_own_mission_not_a_later_one(self):
+        from backend.main import send_message, SendMessageRequest
+
+        async def scenario():
+            with patch("backend.main.store_user_message"):
+                response = await send_message(self.conv_id, SendMessageRequest(content="q"), FakeRequest(polls=2))
+            stream = asyncio.create_task(self.drain(response))
+            await asyncio.sleep(0.03)
+            # A second mission on the same conversation replaces the first in the registry
+            other = asyncio.create_task(job_queue.run_mission(self.conv_id, "q2", lambda event: None))
+            frames = await stream
+            await asyncio.sleep(0.05)
+            other_running = not other.done()
+            cancellation.missions.cancel(self.conv_id, "cancel requested")
+            await asyncio.gather(other, return_exceptions=True)
+            return frames, other_running
+
+        frames, other_running = self.run_patched(scenario)
+        self.assertIn('"type": "cancelled"', frames[-1])
+        self.assertTrue(other_running)
+
+    @staticmethod
+    async def drain(response):
+        return [frame async for frame in response.body_iterator]
+
+    def test_no_second_message_while_a_mission_runs(self):
+        from fastapi import HTTPException
+        from backend.main import reserve_conversation
+
+        async def scenario():
+            task = asyncio.create_task(job_queue.run_mission(self.conv_id, "q", lambda event: None))
+            await asyncio.sleep(0.05)
+            try:
+                with self.assertRaises(HTTPException) as raised:
+                    reserve_conversation(self.conv_id)
+            finally:
+                cancellation.missions.cancel(self.conv_id, "cancel requested")
+                await asyncio.gather(task, return_exceptions=True)
+            return raised.exception
+
+        self.assertEqual(self.run_patched(scenario).status_code, 409)
+
+    def test_cancel_without_mission(self):
+        self.assertIsNone(cancellation.missions.cancel("nothing-running", "cancel requested"))
+
+
+if __name__ == "__main__":
+    unittest.main()
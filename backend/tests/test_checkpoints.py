@@ -0,0 +1,216 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import checkpoints, config, council
+from backend.storage import Storage
+
+CONFIG = {
+    "council_models": ["model1", "model2"],
+    "chairman_model": "chair",
+    "model_personalities": {},
+    "substitute_models": {},
+    "response_timeout": 30,
+    "consensus_strategy": "borda",
+}
+TASKS = [{"id": "t1", "label": "L1", "type": "COUNCIL_CONSENSUS", "description": "d1", "required_skills": []}]
+
+
+class FakeQueue:
+    def __init__(self, active=()):
+        self.active = set(active)
+        self.submitted = []
+
+    def has_active_job(self, conversation_id):
+        return conversation_id in self.active
+
+    async def submit(self, conversation_id, content, cache_mode=None, resume=False):
+        self.submitted.append((conversation_id, content, resume))
+
+
+class TestCheckpoints(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "checkpoints.db"))
+        self.addCleanup(self.storage.close)
+        patcher = patch("backend.storage.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+        self.hang = set()
+
+    async def fake_query_model(self, model, messages, timeout=None, api_key=None):
+        system = messages[0]["content"]
+        stage = "stage2" if "critical judge" in system else "stage3" if "Chairman" in system else "stage1"
+        if "Strategic Planner" in system:
+            return {"content": json.dumps({"mission_name": "M", "blueprint": {"tasks": TASKS}})}
+        self.calls.append((stage, model))
+        if model in self.hang:
+            await asyncio.sleep(60)
+        if stage == "stage2":
+            return {"content": "Ranking: Response B > Response A"}
+        if stage == "stage3":
+            return {"content": '{"action": "FINAL_ANSWER", "content": "Final", "reasoning": "R"}'}
+        return {"content": f"Response from {model}", "usage": {"completion_tokens": 5}}
+
+    def run_council(self, conversation_id, crash_after=None, resume=False):
+        """Run the council; with crash_after, the run is abandoned after that many seconds, as by a restart."""
+        async def scenario():
+            run = council.run_full_council("Q", conversation_id=conversation_id, resume=resume)
+            if crash_after is None:
+                return await run
+            task = asyncio.create_task(run)
+            await asyncio.sleep(crash_after)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        with patch.object(config, "get_config", return_value=CONFIG), \
+             patch.object(council, "query_model", self.fake_query_model):
+            return asyncio.run(scenario())
+
+    def test_resumed_task_only_reissues_missing_calls(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.hang = {"model2"}
+        self.run_council(conv_id, crash_after=0.3)
+        self.assertEqual(self.storage.get_session_state(conv_id)["status"], "in_progress")
+        saved = self.storage.get_checkpoints(conv_id, "t1")
+        self.assertEqual(list(saved), ["stage1"])
+        self.assertEqual(saved["stage1"]["model1"]["content"], "Response from model1")
+
+        self.hang, self.calls = set(), []
+        stage1, stage2, stage3, _ = self.run_council(conv_id, resume=True)
+        # model1's Stage 1 answer came from the checkpoint; everything after it was still needed
+        self.assertEqual(self.calls, [("stage1", "model2"), ("stage2", "model1"), ("stage2", "model2"), ("stage3", "chair")])
+        self.assertEqual([r["response"] for r in stage1], ["Response from model1", "Response from model2"])
+        self.assertEqual(len(stage2), 2)
+        self.assertEqual(stage3["response"], "Final")
+        self.assertEqual(self.storage.get_session_state(conv_id)["status"], "completed")
+
+        saved = self.storage.get_checkpoints(conv_id, "t1")
+        self.assertEqual(saved["stage2"][checkpoints.STAGE]["label_to_model"], {"Response A": "model1", "Response B": "model2"})
+        self.assertIn("chair", saved["stage3"])
+
+    def test_resumed_mission_audits_each_response_once(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.hang = {"model2"}
+        self.run_council(conv_id, crash_after=0.3)
+        self.hang = set()
+        self.run_council(conv_id, resume=True)
+
+        audited = [(log["step"], log["model_id"]) for log in self.storage.get_audit_logs(conv_id)
+                   if log["step"] in ("stage1_query", "stage2_ranking", "stage3_synthesis")]
+        self.assertEqual(sorted(audited), sorted([
+            ("stage1_query", "model1"), ("stage1_query", "model2"),
+            ("stage2_ranking", "model1"), ("stage2_ranking", "model2"),
+            ("stage3_synthesis", "chair"),
+        ]))
+        # The response restored from the checkpoint still has its payload in the audit trail
+        first = next(log for log in self.storage.get_audit_logs(conv_id) if log["model_id"] == "model1")
+        self.assertEqual(json.loads(first["raw_data"])["content"], "Response from model1")
+
+    def test_restored_responses_are_not_audited_again(self):
+        conv_id = self.storage.create_conversation()["id"]
+        checkpoint = checkpoints.TaskCheckpoint(conv_id, "t1", {
+            "stage1": {"model1": {"content": "Response from model1"}},
+            "stage3": {"chair": {"content": '{"action": "FINAL_ANSWER", "content": "Final", "reasoning": "R"}'}},
+        })
+
+        async def scenario():
+            stage1 = await council.stage1_collect_responses("Q", conversation_id=conv_id, task_id="t1", checkpoint=checkpoint)
+            await council.stage3_synthesize_final("Q", stage1, [], conversation_id=conv_id, task_id="t1", checkpoint=checkpoint)
+
+        with patch.object(config, "get_config", return_value=CONFIG), \
+             patch.object(council, "query_model", self.fake_query_model), \
+             patch.object(checkpoints.async_storage.storage, "submit"):
+            asyncio.run(scenario())
+
+        audited = [(log["step"], log["model_id"]) for log in self.storage.get_audit_logs(conv_id)
+                   if log["step"] in ("stage1_query", "stage3_synthesis")]
+        self.assertEqual(audited, [("stage1_query", "model2")])
+
+    def test_finished_stages_are_restored_whole(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.hang = {"chair"}
+        self.run_council(conv_id, crash_after=0.3)
+        self.hang, self.calls = set(), []
+        self.run_council(conv_id, resume=True)
+        self.assertEqual(self.calls, [("stage3", "chair")])
+
+    def test_new_mission_drops_old_checkpoints(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.storage.save_checkpoint(conv_id, "t1", "stage1", "model1", {"content": "old"})
+        self.storage.update_session_state(conv_id, {"status": "in_progress", "blueprint": {"tasks": TASKS}})
+        self.assertEqual(self.storage.get_checkpoints(conv_id, "t1"), {})
+
+    def test_startup_resumes_or_marks_interrupted_missions(self):
+        def mission(user_message=None, status="in_progress", task_status="running", running=True):
+            conv_id = self.storage.create_conversation()["id"]
+            if user_message:
+                self.storage.add_user_message(conv_id, user_message)
+            self.storage.update_session_state(conv_id, {
+                "status": status, "blueprint": {"tasks": TASKS}, "results": {}, "task_status": {"t1": task_status}
+            })
+            self.storage.set_mission_running(conv_id, running)
+            return conv_id
+
+        resumable = mission("reset the mission plan")
+        no_message = mission()
+        finished = mission("q", task_status="done")
+        with_job = mission("q")
+        paused = mission("q", status="paused")
+        # Never started by this version (e.g. migrated from legacy session_state), or ended with a failure
+        not_running = mission("q", running=False)
+
+        queue = FakeQueue(active=[with_job])
+        counts = asyncio.run(checkpoints.recover_interrupted_missions(queue))
+        self.assertEqual(counts, {"resumed": 1, "marked": 2})
+        self.assertEqual(queue.submitted, [(resumable, "reset the mission plan", True)])
+        status = {c: self.storage.get_session_state(c)["status"]
+                  for c in (resumable, no_message, finished, with_job, paused, not_running)}
+        self.assertEqual(status, {
+            resumable: "in_progress", no_message: "interrupted", finished: "interrupted",
+            with_job: "in_progress", paused: "paused", not_running: "in_progress"
+        })
+
+        with patch("backend.checkpoints.get_settings", return_value={"enabled": True, "on_startup": "mark"}):
+            counts = asyncio.run(checkpoints.recover_interrupted_missions(FakeQueue()))
+        self.assertEqual(counts, {"resumed": 0, "marked": 2})
+        self.assertEqual(self.storage.get_session_state(resumable)["status"], "interrupted")
+        # Marked missions are not picked up again on the next start
+        self.assertEqual(asyncio.run(checkpoints.recover_interrupted_missions(FakeQueue())), {"resumed": 0, "marked": 0})
+
+    def test_failed_mission_is_not_resumed_on_startup(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.storage.add_user_message(conv_id, "Q")
+        with patch.object(council, "query_model", self.fake_query_model), \
+             patch.object(council, "execute_blueprint_task", side_effect=RuntimeError("provider down")), \
+             patch.object(config, "get_config", return_value=CONFIG):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(council.run_full_council("Q", conversation_id=conv_id))
+
+        self.assertEqual(self.storage.get_session_state(conv_id)["status"], "failed")
+        queue = FakeQueue()
+        self.assertEqual(asyncio.run(checkpoints.recover_interrupted_missions(queue)), {"resumed": 0, "marked": 0})
+        self.assertEqual(queue.submitted, [])
+
+    def test_interrupted_run_is_found_on_startup(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.storage.add_user_message(conv_id, "Q")
+        self.hang = {"model2"}
+        self.run_council(conv_id, crash_after=0.3)
+        queue = FakeQueue()
+        self.assertEqual(asyncio.run(checkpoints.recover_interrupted_missions(queue)), {"resumed": 1, "marked": 0})
+        self.assertEqual(queue.submitted, [(conv_id, "Q", True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.storage import Storage
+
+
+class TestConversationList(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "list.db")
+        self.storage = Storage(self.path)
+        self.addCleanup(self.storage.close)
+
+    def test_counters_follow_messages(self):
+        conv_id = self.storage.create_conversation()["id"]
+        self.storage.add_user_message(conv_id, "q")
+        self.storage.add_assistant_message(conv_id, [], [], {"response": "a"}, {})
+        self.storage.add_user_message(conv_id, "q2")
+        listed = self.storage.list_conversations()[0]
+        self.assertEqual((listed["message_count"], listed["revision_count"]), (3, 1))
+
+        self.storage.reset_conversation(conv_id)
+        summary = self.storage.get_conversation_summary(conv_id)
+        self.assertEqual((summary["message_count"], summary["revision_count"]), (0, 0))
+
+    def test_existing_databases_are_backfilled(self):
+        self.storage.close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TRIGGER trg_messages_insert_counts")
+        conn.execute("DROP TRIGGER trg_messages_delete_counts")
+        conn.execute("ALTER TABLE conversations DROP COLUMN revision_count")
+        conn.execute("ALTER TABLE conversations DROP COLUMN message_count")
+        conn.execute("INSERT INTO conversations (id, created_at, last_modified) VALUES ('old', 'x', 'x')")
+        conn.executemany(
+            "INSERT INTO messages (conversation_id, role, content, created_at) VALUES ('old', ?, 'm', 'x')",
+            [("user",), ("assistant",), ("assistant",)]
+        )
+        conn.commit()
+        conn.close()
+
+        self.storage.init_db()
+        summary = self.storage.get_conversation_summary("old")
+        self.assertEqual((summary["message_count"], summary["revision_count"]), (3, 2))
+
+    def test_keyset_pages(self):
+        conn = self.storage.get_db_connection()
+        # Two conversations share a last_modified to exercise the id tie-break
+        stamps = ["2026-01-01", "2026-01-02", "2026-01-02", "2026-01-03", "2026-01-04"]
+        for i, stamp in enumerate(stamps):
+            conn.execute("INSERT INTO conversations (id, created_at, last_modified) VALUES (?, ?, ?)", (f"c{i}", stamp, stamp))
+        conn.commit()
+        conn.close()
+
+        seen, cursor = [], None
+        while True:
+            page = self.storage.list_conversation_page(limit=2, cursor=cursor)
+            seen += [c["id"] for c in page["conversations"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, [c["id"] for c in self.storage.list_conversations()])
+        self.assertEqual(seen, ["c4", "c3", "c2", "c1", "c0"])
+
+        with self.assertRaises(ValueError):
+            self.storage.list_conversation_page(cursor="not-a-cursor")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -21,6 +21,7 @@ class TestLLMCouncilBackend(unittest.TestCase):
         self.storage = Storage(self.test_db)
 
     def tearDown(self):
+        self.storage.close()
         if os.path.exists(self.test_db):
             os.remove(self.test_db)
 
@@ -0,0 +1,51 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.storage import Storage
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "pool.db"))
+        self.addCleanup(self.storage.close)
+
+    def test_pragmas_are_applied(self):
+        conn = self.storage.get_db_connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+        self.assertGreater(conn.execute("PRAGMA busy_timeout").fetchone()[0], 0)
+        conn.close()
+
+    def test_connections_are_reused(self):
+        opened = self.storage.pool.opened
+        for _ in range(20):
+            self.storage.list_conversations()
+        self.assertEqual(self.storage.pool.opened, opened)
+        self.assertGreaterEqual(self.storage.pool.reused, 20)
+
+    def test_nested_checkouts_get_separate_connections(self):
+        outer = self.storage.get_db_connection()
+        inner = self.storage.get_db_connection()
+        self.assertIsNot(outer._conn, inner._conn)
+        inner.close()
+        outer.close()
+
+    def test_close_discards_uncommitted_work(self):
+        conn = self.storage.get_db_connection()
+        conn.execute("INSERT INTO settings (key, value) VALUES ('k', '\"v\"')")
+        conn.close()
+        self.assertIsNone(self.storage.get_setting("k"))
+        with self.assertRaises(Exception):
+            conn.execute("SELECT 1")
+
+
+if __name__ == "__main__":
+    unittest.main()
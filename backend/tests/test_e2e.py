@@ -34,6 +34,7 @@ class TestE2EFlow(unittest.TestCase):
 
     def tearDown(self):
         self.storage_patcher.stop()
+        self.storage.close()
         if os.path.exists(self.test_db):
             try:
                 os.remove(self.test_db)
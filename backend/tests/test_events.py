@@ -0,0 +1,88 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.events import EventBus
+
+
+async def drain(bus):
+    return [event async for event in bus.stream()]
+
+
+class TestEventBus(unittest.TestCase):
+    def test_events_stream_in_order_until_closed(self):
+        async def scenario():
+            bus = EventBus(max_events=10, heartbeat_interval=5)
+            bus.publish({"type": "log", "message": "a"})
+            bus.publish({"type": "stage1_complete", "data": []})
+            bus.close()
+            bus.publish({"type": "log", "message": "after close"})
+            return await drain(bus)
+
+        events = asyncio.run(scenario())
+        self.assertEqual([e["type"] for e in events], ["log", "stage1_complete"])
+
+    def test_full_queue_drops_lossy_events_first(self):
+        """A slow consumer must not grow the buffer; stage results survive, logs are dropped."""
+        async def scenario():
+            bus = EventBus(max_events=3, heartbeat_interval=5)
+            for i in range(10):
+                bus.publish({"type": "log", "message": str(i)})
+            bus.publish({"type": "stage2_complete", "data": []})
+            bus.close()
+            return bus, await drain(bus)
+
+        bus, events = asyncio.run(scenario())
+        types = [e["type"] for e in events]
+        self.assertIn("stage2_complete", types)
+        self.assertIn("events_dropped", types)
+        self.assertLessEqual(len([t for t in types if t == "log"]), 3)
+        self.assertGreater(bus.dropped, 0)
+
+    def test_full_queue_evicts_oldest_lossy_event_not_stage_results(self):
+        async def scenario():
+            bus = EventBus(max_events=3, heartbeat_interval=5)
+            bus.publish({"type": "stage1_complete", "data": []})
+            bus.publish({"type": "log", "message": "old"})
+            bus.publish({"type": "log", "message": "new"})
+            bus.publish({"type": "stage2_complete", "data": []})
+            bus.close()
+            return await drain(bus)
+
+        events = [e for e in asyncio.run(scenario()) if e["type"] != "events_dropped"]
+        self.assertEqual(
+            [(e["type"], e.get("message")) for e in events],
+            [("stage1_complete", None), ("log", "new"), ("stage2_complete", None)],
+        )
+
+    def test_full_queue_without_lossy_events_drops_oldest(self):
+        async def scenario():
+            bus = EventBus(max_events=2, heartbeat_interval=5)
+            bus.publish({"type": "stage1_complete", "data": []})
+            bus.publish({"type": "stage2_complete", "data": []})
+            bus.publish({"type": "stage3_complete", "data": []})
+            bus.close()
+            return await drain(bus)
+
+        types = [e["type"] for e in asyncio.run(scenario()) if e["type"] != "events_dropped"]
+        self.assertEqual(types, ["stage2_complete", "stage3_complete"])
+
+    def test_heartbeat_while_idle(self):
+        async def scenario():
+            bus = EventBus(max_events=10, heartbeat_interval=0.01)
+            stream = bus.stream()
+            first = await stream.__anext__()
+            bus.close()
+            await stream.aclose()
+            return first
+
+        self.assertEqual(asyncio.run(scenario())["type"], "heartbeat")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import council, hedging
+from backend.hedging import HedgePolicy, HedgeLedger
+
+
+def fake_query(delays, results=None):
+    """Build a _query replacement answering each model after its delay."""
+    calls, cancelled = [], []
+
+    async def query(model, messages, timeout, api_key=None, on_delta=None):
+        calls.append(model)
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        result = (results or {}).get(model, f"from {model}")
+        if result is None:
+            return None
+        if on_delta:
+            on_delta(result)
+        return {"content": result, "usage": {"total_tokens": 10}}
+    return query, calls, cancelled
+
+
+class TestHedging(unittest.TestCase):
+    def setUp(self):
+        self.ledger = HedgeLedger()
+        patches = [
+            patch.object(hedging, "ledger", self.ledger),
+            patch("backend.storage.storage.get_key_for_model", return_value="k"),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def run_query(self, query, policy, on_delta=None, conversation_id="c1"):
+        with patch.object(council, "_query", query), patch.object(HedgePolicy, "from_config", return_value=policy):
+            return asyncio.run(council.query_with_substitute(
+                "primary", [], 5, {"primary": "sub"}, on_delta=on_delta, conversation_id=conversation_id
+            ))
+
+    def test_slow_primary_is_hedged_and_cancelled(self):
+        query, calls, cancelled = fake_query({"primary": 1.0, "sub": 0.01})
+        policy = HedgePolicy(enabled=True, default_delay_seconds=0.05, min_delay_seconds=0)
+        deltas = []
+
+        res = self.run_query(query, policy, on_delta=deltas.append)
+
+        self.assertEqual(res["content"], "from sub")
+        self.assertTrue(res["hedged"])
+        self.assertTrue(res["is_substitute"])
+        self.assertEqual(res["original_model"], "primary")
+        self.assertEqual(cancelled, ["primary"])
+        self.assertEqual(deltas, ["from sub"])
+        self.assertEqual(self.ledger.substitute_won, 1)
+        self.assertEqual(self.ledger.spent("c1"), 10)
+
+    def test_fast_primary_never_hedges(self):
+        query, calls, _ = fake_query({"primary": 0.01, "sub": 0.01})
+        policy = HedgePolicy(enabled=True, default_delay_seconds=0.5, min_delay_seconds=0)
+
+        res = self.run_query(query, policy)
+
+        self.assertEqual(res["content"], "from primary")
+        self.assertNotIn("hedged", res)
+        self.assertEqual(calls, ["primary"])
+        self.assertEqual(self.ledger.fired, 0)
+
+    def test_both_failing_does_not_retry_substitute(self):
+        query, calls, _ = fake_query({"primary": 0.1, "sub": 0.01}, results={"primary": None, "sub": None})
+        policy = HedgePolicy(enabled=True, default_delay_seconds=0.01, min_delay_seconds=0)
+
+        self.assertIsNone(self.run_query(query, policy))
+        self.assertEqual(sorted(calls), ["primary", "sub"])
+
+    def test_budget_caps_hedging(self):
+        query, calls, _ = fake_query({"primary": 0.1, "sub": 0.01})
+        policy = HedgePolicy(enabled=True, default_delay_seconds=0.01, min_delay_seconds=0, max_extra_tokens=10)
+        self.ledger.record("c1", substitute_won=True, extra_tokens=10)
+
+        res = self.run_query(query, policy)
+
+        self.assertEqual(res["content"], "from primary")
+        self.assertEqual(calls, ["primary"])
+        self.assertEqual(self.ledger.skipped_over_budget, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
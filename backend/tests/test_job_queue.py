@@ -0,0 +1,194 @@
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import job_queue
+from backend.job_queue import JobQueue
+from backend.storage import Storage
+
+
+class TestJobStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "jobs.db"))
+        self.addCleanup(self.storage.close)
+
+    def test_claim_runs_one_job_per_conversation(self):
+        self.storage.create_job("j1", "c1", {"content": "a"})
+        self.storage.create_job("j2", "c1", {"content": "b"})
+        self.storage.create_job("j3", "c2", {"content": "c"})
+
+        self.assertEqual(self.storage.claim_next_job("w1")["id"], "j1")
+        # j2 waits for j1, since both belong to c1
+        self.assertEqual(self.storage.claim_next_job("w2")["id"], "j3")
+        self.assertIsNone(self.storage.claim_next_job("w3"))
+
+        self.storage.update_job_status("j1", "completed")
+        job = self.storage.claim_next_job("w1")
+        self.assertEqual((job["id"], job["status"], job["attempts"]), ("j2", "running", 1))
+        self.assertIsNotNone(self.storage.get_job("j1")["finished_at"])
+
+    def test_interrupted_jobs_are_requeued_then_failed(self):
+        self.storage.create_job("j1", "c1", {"content": "a"})
+        self.storage.claim_next_job("w1")
+        self.assertEqual(self.storage.reset_interrupted_jobs(max_attempts=2), {"requeued": 1, "failed": 0})
+        self.storage.claim_next_job("w1")
+        self.assertEqual(self.storage.reset_interrupted_jobs(max_attempts=2), {"requeued": 0, "failed": 1})
+        self.assertEqual(self.storage.get_job("j1")["status"], "failed")
+
+    def test_events_and_cleanup(self):
+        self.storage.create_conversation("c1")
+        self.storage.create_job("j1", "c1", {"content": "a"})
+        for seq in (1, 2, 3):
+            self.storage.add_job_event("j1", seq, {"type": "log", "seq": seq})
+        self.assertEqual([e["seq"] for e in self.storage.get_job_events("j1", after_seq=1)], [2, 3])
+        self.assertEqual([e["seq"] for e in self.storage.get_job_events("j1", 0, until_seq=2)], [1, 2])
+        self.assertEqual(self.storage.get_job("j1")["last_seq"], 3)
+        self.assertFalse(self.storage.update_job_status("j1", "cancelled", only_from=["running"]))
+
+        self.storage.delete_conversation("c1")
+        self.assertIsNone(self.storage.get_job("j1"))
+        self.assertEqual(self.storage.get_job_events("j1"), [])
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "queue.db"))
+        self.addCleanup(self.storage.close)
+        patcher = patch("backend.storage.storage", self.storage)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        settings = patch("backend.job_queue.get_settings",
+                         return_value={"workers": 2, "poll_interval": 0.05, "max_attempts": 2})
+        settings.start()
+        self.addCleanup(settings.stop)
+
+    async def collect(self, queue, job_id, after=0):
+        return [e async for e in queue.attach(job_id, after=after) if e["type"] != "heartbeat"]
+
+    def test_jobs_run_in_background_and_replay(self):
+        release = None
+
+        async def mission(conversation_id, content, publish, cache_mode=None, resume=False):
+            publish({"type": "stage1_complete", "data": content})
+            publish({"type": "log", "message": "lossy"})
+            await release.wait()
+            publish({"type": "complete"})
+
+        async def scenario():
+            nonlocal release
+            release = asyncio.Event()
+            queue = JobQueue()
+            await queue.start()
+            job = await queue.submit("c1", "hello")
+            self.assertTrue(queue.has_active_job("c1"))
+
+            # Two tabs attach; one from the start, one after the first event
+            first = asyncio.create_task(self.collect(queue, job["id"]))
+            await asyncio.sleep(0.2)
+            late = asyncio.create_task(self.collect(queue, job["id"], after=2))
+            await asyncio.sleep(0.05)
+            release.set()
+            events, late_events = await first, await late
+            await queue.stop()
+            replay = await self.collect(queue, job["id"])
+            return job, events, late_events, replay
+
+        with patch.object(job_queue, "run_mission", mission):
+            job, events, late_events, replay = asyncio.run(scenario())
+
+        types = [e["type"] for e in events]
+        self.assertEqual(types, ["job_status", "job_status", "stage1_complete", "log", "complete", "job_status"])
+        self.assertEqual([e["seq"] for e in events], list(range(1, 7)))
+        self.assertEqual(events[-1]["status"], "completed")
+        # The late tab replays stored events after seq 2 (not the lossy log) and then follows live ones
+        self.assertEqual([e["seq"] for e in late_events], [3, 5, 6])
+        # Lossy events are not stored
+        self.assertEqual([e["type"] for e in replay], ["job_status", "job_status", "stage1_complete", "complete", "job_status"])
+        self.assertEqual(self.storage.get_job(job["id"])["status"], "completed")
+
+    def test_cancel_running_and_queued_jobs(self):
+        async def mission(conversation_id, content, publish, cache_mode=None, resume=False):
+            await asyncio.sleep(60)
+
+        async def scenario():
+            queue = JobQueue()
+            await queue.start()
+            running = await queue.submit("c1", "slow")
+            await asyncio.sleep(0.2)
+            queued = await queue.submit("c1", "next")
+            self.assertTrue(await queue.cancel(queued["id"]))
+            self.assertTrue(await queue.cancel(running["id"]))
+            await asyncio.sleep(0.1)
+            again = await queue.cancel(running["id"])
+            events = await self.collect(queue, running["id"])
+            await queue.stop()
+            return running, queued, again, events
+
+        with patch.object(job_queue, "run_mission", mission):
+            running, queued, again, events = asyncio.run(scenario())
+
+        self.assertFalse(again)
+        self.assertEqual(events[-1], {"type": "job_status", "status": "cancelled", "seq": events[-1]["seq"]})
+        self.assertEqual(self.storage.get_job(running["id"])["status"], "cancelled")
+        self.assertEqual(self.storage.get_job(queued["id"])["status"], "cancelled")
+
+    def test_stop_requeues_running_jobs(self):
+        async def mission(conversation_id, content, publish, cache_mode=None, resume=False):
+            await asyncio.sleep(60)
+
+        async def scenario():
+            queue = JobQueue()
+            await queue.start()
+            job = await queue.submit("c1", "slow")
+            await asyncio.sleep(0.2)
+            await queue.stop()
+            return job
+
+        with patch.object(job_queue, "run_mission", mission):
+            job = asyncio.run(scenario())
+        stored = self.storage.get_job(job["id"])
+        self.assertEqual((stored["status"], stored["attempts"]), ("queued", 1))
+
+    def test_concurrent_submits_queue_one_job(self):
+        from fastapi import HTTPException
+        from backend.main import submit_job, SendMessageRequest
+
+        self.storage.create_conversation("c1")
+
+        async def slow_store(conversation_id, content):
+            # Titling the first message takes a model call; both requests are inside it at once
+            await asyncio.sleep(0.05)
+
+        async def scenario():
+            request = SendMessageRequest(content="q")
+            return await asyncio.gather(
+                submit_job("c1", request), submit_job("c1", request), return_exceptions=True
+            )
+
+        with patch.object(job_queue, "job_queue", JobQueue()), \
+             patch("backend.main.store_user_message", slow_store):
+            outcomes = asyncio.run(scenario())
+            # Once the request is done, the queued job holds the conversation
+            with self.assertRaises(HTTPException):
+                asyncio.run(submit_job("c1", SendMessageRequest(content="again")))
+
+        jobs = [o for o in outcomes if isinstance(o, dict)]
+        errors = [o for o in outcomes if isinstance(o, HTTPException)]
+        self.assertEqual(len(jobs), 1)
+        self.assertEqual([e.status_code for e in errors], [409])
+        self.assertEqual(len(self.storage.list_jobs(conversation_id="c1")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
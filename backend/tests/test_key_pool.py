@@ -0,0 +1,132 @@
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from collections import Counter
+from unittest.mock import patch
+
+import httpx
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import key_pool, openrouter, resilience
+from backend.key_pool import KeyPool
+from backend.storage import Storage
+
+OK_BODY = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+
+
+def keys(*values):
+    return [{"key_value": v} for v in values]
+
+
+class TestKeyPool(unittest.TestCase):
+    def test_round_robin_when_idle(self):
+        pool = KeyPool()
+        picks = Counter(pool.choose(keys("a", "b", "c")) for _ in range(9))
+        self.assertEqual(picks, {"a": 3, "b": 3, "c": 3})
+
+    def test_least_in_flight_wins(self):
+        pool = KeyPool()
+        with pool.lease("a"), pool.lease("b"):
+            self.assertEqual(pool.choose(keys("a", "b", "c")), "c")
+        self.assertEqual(pool.snapshot()["...a"]["in_flight"], 0)
+
+    def test_benched_key_leaves_rotation(self):
+        pool = KeyPool()
+        pool.bench("a", 429, {"retry-after": "60"})
+        self.assertEqual({pool.choose(keys("a", "b")) for _ in range(4)}, {"b"})
+
+        pool.bench("b", 402)
+        # All keys benched: the one that comes back first is used
+        self.assertEqual(pool.choose(keys("a", "b")), "a")
+
+        pool.reinstate("b")
+        self.assertEqual(pool.choose(keys("a", "b")), "b")
+
+
+class TestEligibleKeys(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "keys.db"))
+        self.pool = KeyPool()
+        p = patch.object(key_pool, "pool", self.pool)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def add(self, value, description="", limit_remaining=None):
+        self.storage.save_api_key({
+            "provider": "openrouter", "key_value": value, "label": value,
+            "description": description, "limit_remaining": limit_remaining
+        })
+
+    def test_paid_models_spread_over_keys_with_credit(self):
+        self.add("paid-1", limit_remaining=5)
+        self.add("paid-2")
+        self.add("paid-3", limit_remaining=0)
+        self.add("free-1", description="free tier")
+        picks = {self.storage.get_key_for_model("openai/gpt-4o") for _ in range(6)}
+        self.assertEqual(picks, {"paid-1", "paid-2"})
+
+    def test_free_models_prefer_free_keys(self):
+        self.add("paid-1")
+        self.add("free-1", description="free tier")
+        self.add("free-2", description="$0 budget")
+        picks = {self.storage.get_key_for_model("x/y:free") for _ in range(6)}
+        self.assertEqual(picks, {"free-1", "free-2"})
+
+    def test_keyring_is_cached_until_keys_change(self):
+        self.add("paid-1")
+        self.storage.get_key_for_model("openai/gpt-4o")
+        with patch.object(self.storage, "get_db_connection", side_effect=AssertionError("hit the DB")):
+            for _ in range(5):
+                self.assertEqual(self.storage.get_key_for_model("openai/gpt-4o"), "paid-1")
+                self.assertEqual(self.storage.get_key_for_model("x/y:free"), "paid-1")
+
+        key_id = self.storage.list_api_keys()[0]["id"]
+        self.storage.save_api_key({"id": key_id, "provider": "openrouter", "key_value": "paid-2", "label": "paid-2"})
+        self.assertEqual(self.storage.get_key_for_model("openai/gpt-4o"), "paid-2")
+
+        self.storage.delete_api_key(key_id)
+        self.assertIsNone(self.storage.get_key_for_model("openai/gpt-4o"))
+
+
+class TestKeyFailover(unittest.TestCase):
+    def setUp(self):
+        resilience.breakers.reset()
+        self.addCleanup(resilience.breakers.reset)
+        self.pool = KeyPool()
+        p = patch.object(key_pool, "pool", self.pool)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def test_429_switches_to_another_key(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request.headers["authorization"])
+            if request.headers["authorization"] == "Bearer k1":
+                return httpx.Response(429, headers={"Retry-After": "30"})
+            return httpx.Response(200, json=OK_BODY)
+
+        async def runner():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("backend.http_client.get_http_client", return_value=client), \
+                    patch("backend.storage.storage.get_key_for_model", side_effect=lambda m: self.pool.choose(keys("k1", "k2"))):
+                try:
+                    return await openrouter.query_model("m-keys", [{"role": "user", "content": "x"}], api_key="k1", cache_mode="off")
+                finally:
+                    await client.aclose()
+
+        result = asyncio.run(runner())
+        self.assertEqual(result["content"], "hi")
+        self.assertEqual(seen, ["Bearer k1", "Bearer k2"])
+        self.assertTrue(self.pool.is_benched("k1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import sys
+import tempfile
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.storage import Storage
+
+
+class TestMessagePages(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "pages.db"))
+        self.addCleanup(self.storage.close)
+        self.conv_id = self.storage.create_conversation()["id"]
+        for i in range(5):
+            self.storage.add_message(self.conv_id, "user", f"q{i}")
+            self.storage.add_message(self.conv_id, "assistant", f"a{i}", stage1=[{"model": "m1", "response": f"r{i}"}],
+                                     stage3={"response": f"final{i}"})
+
+    def test_summary(self):
+        summary = self.storage.get_conversation_summary(self.conv_id)
+        self.assertEqual(summary["message_count"], 10)
+        self.assertEqual(summary["id"], self.conv_id)
+        self.assertIsNone(self.storage.get_conversation_summary("missing"))
+
+    def test_keyset_pages_cover_every_message_once(self):
+        contents, cursor = [], None
+        while True:
+            page = self.storage.get_message_page(self.conv_id, after_id=cursor, limit=3)
+            contents += [m["content"] for m in page["messages"]]
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        full = self.storage.get_conversation(self.conv_id)["messages"]
+        self.assertEqual(contents, [m["content"] for m in full])
+
+    def test_field_selection(self):
+        messages = self.storage.get_messages(self.conv_id, fields=["role", "stage3"], limit=2)
+        self.assertEqual(set(messages[1]), {"id", "role", "stage3"})
+        self.assertEqual(messages[1]["stage3"], {"response": "final0"})
+        self.assertIsNone(messages[0]["stage3"])
+        with self.assertRaises(ValueError):
+            self.storage.get_messages(self.conv_id, fields=["id; DROP TABLE messages"])
+
+
+if __name__ == "__main__":
+    unittest.main()
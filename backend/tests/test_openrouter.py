@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import openrouter
+
+
+def sse_body(chunks):
+    lines = [": OPENROUTER PROCESSING", ""]
+    for chunk in chunks:
+        lines.append(f"data: {json.dumps(chunk)}")
+        lines.append("")
+    lines.append("data: [DONE]")
+    lines.append("")
+    return "\n".join(lines).encode()
+
+
+class TestOpenRouterClient(unittest.TestCase):
+    def run_with_transport(self, handler, coro_factory):
+        async def runner():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("backend.http_client.get_http_client", return_value=client):
+                try:
+                    return await coro_factory()
+                finally:
+                    await client.aclose()
+        return asyncio.run(runner())
+
+    def test_query_model_streaming_forwards_deltas(self):
+        """Streaming should forward each content delta and return the assembled result."""
+        body = sse_body([
+            {"choices": [{"delta": {"reasoning": "thinking"}}]},
+            {"choices": [{"delta": {"content": "Hel"}}]},
+            {"choices": [{"delta": {"content": "lo"}}]},
+            {"choices": [{"delta": {}}], "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}},
+        ])
+
+        def handler(request):
+            payload = json.loads(request.content)
+            self.assertTrue(payload["stream"])
+            return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+
+        deltas = []
+        result = self.run_with_transport(
+            handler,
+            lambda: openrouter.query_model_streaming("m1", [{"role": "user", "content": "hi"}], deltas.append, api_key="k")
+        )
+
+        self.assertEqual(deltas, ["Hel", "lo"])
+        self.assertEqual(result["content"], "Hello")
+        self.assertEqual(result["reasoning_details"], "thinking")
+        self.assertEqual(result["usage"]["total_tokens"], 5)
+
+    def test_query_model_streaming_mid_stream_error(self):
+        """An error chunk after content was forwarded fails the call without retrying."""
+        body = sse_body([
+            {"choices": [{"delta": {"content": "partial"}}]},
+            {"error": {"message": "provider crashed"}},
+        ])
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, content=body)
+
+        result = self.run_with_transport(
+            handler,
+            lambda: openrouter.query_model_streaming("m1", [], lambda _: None, api_key="k")
+        )
+        self.assertIsNone(result)
+        self.assertEqual(len(calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
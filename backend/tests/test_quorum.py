@@ -0,0 +1,96 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.metrics import percentile
+from backend.quorum import QuorumPolicy, gather_with_quorum
+
+
+async def answer(value, delay):
+    await asyncio.sleep(delay)
+    return value
+
+
+class TestQuorum(unittest.TestCase):
+    def test_disabled_waits_for_everyone(self):
+        async def scenario():
+            coros = [answer("a", 0.01), answer(None, 0.02), answer("c", 0.05)]
+            return await gather_with_quorum(coros, QuorumPolicy(enabled=False))
+
+        outcome = asyncio.run(scenario())
+        self.assertEqual(outcome.results, ["a", None, "c"])
+        self.assertEqual(outcome.late, [])
+        self.assertIsNone(outcome.quorum_elapsed)
+
+    def test_quorum_then_grace_cancels_stragglers(self):
+        """Once k answers are in, only the grace period is spent waiting for the rest."""
+        cancelled = []
+
+        async def slow():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+            return "slow"
+
+        async def scenario():
+            policy = QuorumPolicy(enabled=True, min_responses=2, grace_seconds=0.05)
+            outcome = await gather_with_quorum([answer("a", 0.01), answer("b", 0.02), answer("c", 0.03), slow()], policy)
+            await asyncio.sleep(0)
+            return outcome
+
+        outcome = asyncio.run(scenario())
+        self.assertEqual(outcome.results, ["a", "b", "c", None])
+        self.assertEqual(outcome.late, [3])
+        self.assertLess(outcome.elapsed, 1)
+        self.assertEqual(cancelled, [True])
+
+    def test_failures_do_not_count_toward_quorum(self):
+        async def scenario():
+            policy = QuorumPolicy(enabled=True, min_responses=2, grace_seconds=0)
+            return await gather_with_quorum([answer(None, 0.01), answer("b", 0.02), answer("c", 0.03)], policy)
+
+        outcome = asyncio.run(scenario())
+        self.assertEqual(outcome.results, [None, "b", "c"])
+        self.assertEqual(outcome.late, [])
+
+    def test_record_policy_reports_late_answers(self):
+        late = []
+
+        async def scenario():
+            policy = QuorumPolicy(enabled=True, min_responses=1, grace_seconds=0, late_policy="record")
+            outcome = await gather_with_quorum(
+                [answer("fast", 0.01), answer("late", 0.05)],
+                policy,
+                on_late_result=lambda i, result, elapsed: late.append((i, result))
+            )
+            await asyncio.sleep(0.1)
+            return outcome
+
+        outcome = asyncio.run(scenario())
+        self.assertEqual(outcome.results, ["fast", None])
+        self.assertEqual(outcome.late, [1])
+        self.assertEqual(late, [(1, "late")])
+
+
+class TestPercentile(unittest.TestCase):
+    def test_nearest_rank_with_even_sample_count(self):
+        samples = [6.0, 1.0, 5.0, 2.0, 4.0, 3.0]
+        self.assertEqual(percentile(samples, 50), 3.0)
+        self.assertEqual(percentile(samples, 95), 6.0)
+        self.assertEqual(percentile(samples, 0), 1.0)
+        self.assertEqual(percentile(samples, 100), 6.0)
+
+    def test_nearest_rank_with_odd_sample_count(self):
+        self.assertEqual(percentile([3.0, 1.0, 2.0], 50), 2.0)
+        self.assertIsNone(percentile([], 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import sys
+import time
+import asyncio
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import config
+from backend.rate_limiter import RateLimiter, TokenBucket, configured_limit
+
+
+def limits(**settings):
+    return patch.object(config, "get_config", return_value={"rate_limits": settings})
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_unlimited_bucket_never_waits(self):
+        bucket = TokenBucket("m")
+
+        async def scenario():
+            return [await bucket.acquire() for _ in range(50)]
+
+        self.assertLess(max(asyncio.run(scenario())), 0.01)
+        self.assertEqual(bucket.throttled, 0)
+
+    def test_waiters_are_served_in_arrival_order(self):
+        bucket = TokenBucket("m")
+        bucket.set_limit(600, burst=1)  # one token every 0.1s
+        order = []
+
+        async def caller(i):
+            await bucket.acquire()
+            order.append(i)
+
+        async def scenario():
+            tasks = [asyncio.ensure_future(caller(i)) for i in range(4)]
+            await asyncio.sleep(0)
+            depth = bucket.waiting
+            await asyncio.gather(*tasks)
+            return depth
+
+        started = time.monotonic()
+        depth = asyncio.run(scenario())
+        self.assertEqual(order, [0, 1, 2, 3])
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+        self.assertGreaterEqual(depth, 3)
+        self.assertEqual(bucket.throttled, 3)
+        self.assertEqual(bucket.waiting, 0)
+
+    def test_learns_limit_and_backs_off_from_headers(self):
+        with limits():
+            bucket = TokenBucket("some/model")
+            bucket.observe({"x-ratelimit-limit": "30", "x-ratelimit-remaining": "5"})
+            self.assertTrue(bucket.learned)
+            self.assertEqual(bucket.rate, 0.5)
+            self.assertLessEqual(bucket.tokens, 5)
+
+            bucket.observe({"retry-after": "2"}, status_code=429)
+            self.assertGreater(bucket._delay(time.monotonic()), 1.5)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_limits_come_from_config(self):
+        with limits(models={"a/b": {"requests_per_minute": 60, "burst": 3}}):
+            self.assertEqual(configured_limit("a/b"), (60.0, 3))
+            self.assertEqual(configured_limit("x/y:free")[0], config.DEFAULT_CONFIG["rate_limits"]["free_models"]["requests_per_minute"])
+            self.assertEqual(configured_limit("x/y"), (0.0, None))
+
+            limiter = RateLimiter()
+            bucket = limiter.bucket("key-1234", "a/b")
+            self.assertEqual((bucket.rate, bucket.capacity), (1.0, 3))
+            self.assertIsNot(limiter.bucket("key-5678", "a/b"), bucket)
+            self.assertIn("...1234 a/b", limiter.snapshot())
+
+    def test_config_limit_overrides_learned_limit(self):
+        limiter = RateLimiter()
+        with limits():
+            limiter.observe("k", "a/b", {"x-ratelimit-limit": "10"})
+            self.assertTrue(limiter.bucket("k", "a/b").learned)
+        with limits(models={"a/b": {"requests_per_minute": 120}}):
+            bucket = limiter.bucket("k", "a/b")
+            self.assertFalse(bucket.learned)
+            self.assertEqual(bucket.rate, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import os
+import sys
+import asyncio
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import openrouter, resilience
+from backend.resilience import CircuitBreaker, RetryPolicy, retry_after_seconds, CLOSED, OPEN, HALF_OPEN
+
+OK_BODY = {"choices": [{"message": {"content": "hi"}}], "usage": {"total_tokens": 3}}
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_retry_after_headers(self):
+        self.assertEqual(retry_after_seconds({"retry-after": "3"}), 3.0)
+        self.assertEqual(retry_after_seconds({"retry-after": "Wed, 21 Oct 2015 07:28:05 GMT"}, now=1445412480), 5.0)
+        self.assertEqual(retry_after_seconds({"x-ratelimit-reset": "1700000004000"}, now=1700000000), 4.0)
+        self.assertIsNone(retry_after_seconds({}))
+
+    def test_server_hint_wins_and_is_capped(self):
+        policy = RetryPolicy(max_retry_after=10)
+        self.assertEqual(policy.next_delay(0.5, {"retry-after": "2"}), 2.0)
+        self.assertEqual(policy.next_delay(0.5, {"retry-after": "600"}), 10)
+
+    def test_decorrelated_jitter_stays_in_bounds(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=4)
+        delay = policy.base_delay
+        for _ in range(50):
+            new = policy.next_delay(delay)
+            self.assertGreaterEqual(new, 0.5)
+            self.assertLessEqual(new, min(4, max(0.5, delay * 3)))
+            delay = new
+
+    def test_client_errors_are_not_retryable(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable(None))
+        self.assertTrue(policy.is_retryable(429))
+        self.assertTrue(policy.is_retryable(503))
+        self.assertFalse(policy.is_retryable(400))
+        self.assertFalse(policy.is_retryable(401))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_probes_and_closes(self):
+        breaker = CircuitBreaker("m")
+        threshold = resilience._settings("circuit_breaker")["failure_threshold"]
+        open_seconds = resilience._settings("circuit_breaker")["open_seconds"]
+        for _ in range(threshold):
+            breaker.record_failure("boom", now=0)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertFalse(breaker.allow(now=1))
+
+        later = open_seconds + 1
+        self.assertTrue(breaker.allow(now=later))
+        self.assertEqual(breaker.state, HALF_OPEN)
+        self.assertFalse(breaker.allow(now=later))  # only one probe at a time
+
+        breaker.record_failure("still down", now=later)
+        self.assertEqual(breaker.state, OPEN)
+        self.assertEqual(breaker.open_seconds, open_seconds * 2)
+        self.assertEqual(breaker.trips, 2)
+
+        self.assertTrue(breaker.allow(now=later + open_seconds * 2 + 1))
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+        self.assertEqual(breaker.consecutive_failures, 0)
+
+
+class TestQueryModelResilience(unittest.TestCase):
+    def setUp(self):
+        resilience.breakers.reset()
+        self.addCleanup(resilience.breakers.reset)
+
+    def run_query(self, handler, model="m-res", max_retries=2):
+        async def runner():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("backend.http_client.get_http_client", return_value=client):
+                try:
+                    return await openrouter.query_model(model, [{"role": "user", "content": "x"}], max_retries=max_retries, api_key="k", cache_mode="off")
+                finally:
+                    await client.aclose()
+        return asyncio.run(runner())
+
+    def test_429_honours_retry_after(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0"})
+            return httpx.Response(200, json=OK_BODY)
+
+        result = self.run_query(handler)
+        self.assertEqual(result["content"], "hi")
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(resilience.breakers.get("m-res").state, CLOSED)
+
+    def test_bad_request_is_not_retried_and_does_not_trip(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(400, json={"error": "bad"})
+
+        self.assertIsNone(self.run_query(handler))
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(resilience.breakers.get("m-res").consecutive_failures, 0)
+
+    def test_open_breaker_fails_fast(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(503)
+
+        threshold = resilience._settings("circuit_breaker")["failure_threshold"]
+        for _ in range(threshold):
+            self.assertIsNone(self.run_query(handler, max_retries=0))
+        self.assertEqual(len(calls), threshold)
+        self.assertTrue(resilience.breakers.is_open("m-res"))
+
+        self.assertIsNone(self.run_query(handler, max_retries=0))
+        self.assertEqual(len(calls), threshold)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend import response_cache
+from backend.response_cache import ResponseCache, cache_key, through_cache
+from backend.storage import Storage
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.storage = Storage(os.path.join(self.tmp.name, "cache.db"))
+        self.cache = ResponseCache()
+        self.settings = {"mode": "read_through", "max_bytes": 0, "ttl_seconds": 3600}
+        patches = [
+            patch("backend.storage.storage", self.storage),
+            patch.object(response_cache, "response_cache", self.cache),
+            patch.object(response_cache, "get_settings", lambda: self.settings),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.calls = 0
+
+    def call(self, content="answer"):
+        async def fetch():
+            self.calls += 1
+            return {"content": content, "usage": {"total_tokens": 7}}
+        return fetch
+
+    def run_cached(self, messages, mode=None, content="answer"):
+        return asyncio.run(through_cache("m1", messages, self.call(content), mode=mode))
+
+    def test_key_ignores_whitespace_and_extra_fields(self):
+        a = cache_key("m1", [{"role": "user", "content": " hi \n"}])
+        b = cache_key("m1", [{"role": "user", "content": "hi", "name": "x"}])
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, cache_key("m2", [{"role": "user", "content": "hi"}]))
+        self.assertNotEqual(a, cache_key("m1", [{"role": "user", "content": "hi"}], {"temperature": 0.2}))
+
+    def test_read_through_then_hit(self):
+        messages = [{"role": "user", "content": "hi"}]
+        first = self.run_cached(messages)
+        second = self.run_cached(messages)
+
+        self.assertEqual(self.calls, 1)
+        self.assertNotIn("cached", first)
+        self.assertTrue(second["cached"])
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(stats["saved_tokens"], 7)
+        self.assertGreater(stats["bytes_served"], 0)
+
+    def test_sqlite_work_stays_off_the_event_loop(self):
+        threads = []
+        for name in ("_lookup", "_touch", "put"):
+            original = getattr(self.cache, name)
+
+            def traced(*args, _original=original, **kwargs):
+                threads.append(threading.current_thread())
+                return _original(*args, **kwargs)
+            setattr(self.cache, name, traced)
+
+        messages = [{"role": "user", "content": "hi"}]
+        self.run_cached(messages)
+        self.run_cached(messages)
+        self.assertTrue(threads)
+        self.assertNotIn(threading.main_thread(), threads)
+
+    def test_replay_only_never_calls_the_model(self):
+        self.assertIsNone(self.run_cached([{"role": "user", "content": "new"}], mode="replay_only"))
+        self.assertEqual(self.calls, 0)
+        self.assertEqual(self.cache.replay_misses, 1)
+
+    def test_off_bypasses_cache(self):
+        messages = [{"role": "user", "content": "hi"}]
+        self.run_cached(messages, mode="off")
+        self.run_cached(messages, mode="off")
+        self.assertEqual(self.calls, 2)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_conversation_mode_applies_without_per_call_mode(self):
+        self.settings["mode"] = "off"
+        token = response_cache.conversation_mode.set("replay_only")
+        try:
+            self.assertIsNone(self.run_cached([{"role": "user", "content": "hi"}]))
+        finally:
+            response_cache.conversation_mode.reset(token)
+        self.assertEqual(self.calls, 0)
+
+    def test_expired_entries_are_not_served(self):
+        self.settings["ttl_seconds"] = -1
+        messages = [{"role": "user", "content": "hi"}]
+        self.run_cached(messages)
+        self.run_cached(messages)
+        self.assertEqual(self.calls, 2)
+
+    def test_lru_eviction_keeps_recently_used(self):
+        self.run_cached([{"role": "user", "content": "a"}], content="x" * 100)
+        self.run_cached([{"role": "user", "content": "b"}], content="y" * 100)
+        self.run_cached([{"role": "user", "content": "a"}])  # touch a
+        self.settings["max_bytes"] = 300
+        self.run_cached([{"role": "user", "content": "c"}], content="z" * 100)
+
+        self.assertEqual(self.cache.evictions, 1)
+        self.calls = 0
+        self.run_cached([{"role": "user", "content": "a"}])
+        self.assertEqual(self.calls, 0)
+        self.run_cached([{"role": "user", "content": "b"}])
+        self.assertEqual(self.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
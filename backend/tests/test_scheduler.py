@@ -0,0 +1,109 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.scheduler import init_task_status, ready_tasks, run_blueprint, DONE, PENDING, FAILED
+
+
+def blueprint(*tasks):
+    return {"blueprint": {"tasks": list(tasks)}, "results": {}}
+
+
+def task(task_id, depends_on=(), breakpoint=False):
+    return {"id": task_id, "label": task_id, "type": "SINGLE_SPECIALIST", "depends_on": list(depends_on), "breakpoint": breakpoint}
+
+
+class TestScheduler(unittest.TestCase):
+    def run_mission(self, state, max_parallel, delay=0.05, fail=()):
+        tasks = state["blueprint"]["tasks"]
+        status = init_task_status(state)
+        order, active, peak = [], [0], [0]
+
+        async def run_task(i):
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+            try:
+                await asyncio.sleep(delay)
+                if tasks[i]["id"] in fail:
+                    raise RuntimeError("boom")
+                order.append(tasks[i]["id"])
+            finally:
+                active[0] -= 1
+
+        paused = asyncio.run(run_blueprint(tasks, status, run_task, max_parallel=max_parallel))
+        return paused, status, order, peak[0]
+
+    def test_independent_tasks_run_concurrently_up_to_cap(self):
+        state = blueprint(task("a"), task("b"), task("c"), task("d"), task("final", ["a", "b", "c", "d"]))
+        paused, status, order, peak = self.run_mission(state, max_parallel=3)
+
+        self.assertFalse(paused)
+        self.assertEqual(peak, 3)
+        self.assertEqual(order[-1], "final")
+        self.assertTrue(all(s == DONE for s in status.values()))
+
+    def test_dependencies_are_respected(self):
+        state = blueprint(task("a"), task("b", ["c"]), task("c", ["a"]))
+        _, _, order, _ = self.run_mission(state, max_parallel=3, delay=0.01)
+        self.assertEqual(order, ["a", "c", "b"])
+
+    def test_breakpoint_is_a_barrier_and_resume_continues(self):
+        state = blueprint(task("a"), task("b"), task("review", breakpoint=True), task("c"))
+        paused, status, order, _ = self.run_mission(state, max_parallel=4, delay=0.01)
+
+        self.assertTrue(paused)
+        self.assertEqual(sorted(order[:2]), ["a", "b"])
+        self.assertEqual(order[2], "review")
+        self.assertEqual(status["c"], PENDING)
+
+        paused, status, order, _ = self.run_mission(state, max_parallel=4, delay=0.01)
+        self.assertFalse(paused)
+        self.assertEqual(order, ["c"])
+
+    def test_failed_task_blocks_dependents_and_is_retried(self):
+        state = blueprint(task("a"), task("b", ["a"]), task("c"))
+        with self.assertRaises(RuntimeError):
+            self.run_mission(state, max_parallel=2, delay=0.01, fail=("a",))
+        self.assertEqual(state["task_status"], {"a": FAILED, "b": PENDING, "c": DONE})
+
+        _, status, order, _ = self.run_mission(state, max_parallel=2, delay=0.01)
+        self.assertEqual(order, ["a", "b"])
+
+    def test_cancelled_task_is_failed_and_others_still_finish(self):
+        state = blueprint(task("a"), task("b", ["a"]), task("c"))
+        tasks = state["blueprint"]["tasks"]
+        status = init_task_status(state)
+        order = []
+
+        async def run_task(i):
+            if tasks[i]["id"] == "a":
+                raise asyncio.CancelledError()
+            await asyncio.sleep(0.02)
+            order.append(tasks[i]["id"])
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run_blueprint(tasks, status, run_task, max_parallel=2))
+        self.assertEqual(order, ["c"])
+        self.assertEqual(status, {"a": FAILED, "b": PENDING, "c": DONE})
+
+    def test_legacy_session_migrates_from_current_task_index(self):
+        state = blueprint(task("a"), task("b"), task("c"))
+        state["current_task_index"] = 2
+        status = init_task_status(state)
+        self.assertEqual(status, {"a": DONE, "b": DONE, "c": PENDING})
+        self.assertEqual(ready_tasks(state["blueprint"]["tasks"], status), [2])
+
+    def test_cycles_fall_back_to_blueprint_order(self):
+        state = blueprint(task("a", ["b"]), task("b", ["a"]))
+        paused, status, order, _ = self.run_mission(state, max_parallel=2, delay=0.01)
+        self.assertFalse(paused)
+        self.assertEqual(order, ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
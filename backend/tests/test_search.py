@@ -0,0 +1,82 @@
+import os
+import sys
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.search_index import fts_query
+from backend.storage import Storage
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "search.db")
+        self.storage = Storage(self.path)
+        self.addCleanup(self.storage.close)
+        # Searches flush the global audit sink, which writes to the global storage
+        p = patch("backend.storage.storage", self.storage)
+        p.start()
+        self.addCleanup(p.stop)
+
+        self.conv_id = self.storage.create_conversation()["id"]
+        self.storage.update_conversation_title(self.conv_id, "Quantum roadmap")
+        self.storage.add_user_message(self.conv_id, "How do qubits decohere?")
+        self.storage.add_assistant_message(
+            self.conv_id, [], [], {"model": "openai/gpt-4o", "response": "Qubits decohere through noise."}, {}
+        )
+        self.storage.add_audit_log(self.conv_id, "stage1_query", model_id="anthropic/claude",
+                                   log_message="claude explained decoherence")
+        self.storage.add_audit_log(self.conv_id, "stage2_ranking", model_id="openai/gpt-4o",
+                                   log_message="gpt ranked decoherence answers")
+
+    def kinds(self, query, **filters):
+        return sorted(r["kind"] for r in self.storage.search(query, **filters))
+
+    def test_sources_are_indexed(self):
+        self.assertEqual(self.kinds("decohere"), ["answer", "message"])
+        self.assertEqual(self.kinds("quantum"), ["conversation"])
+        result = self.storage.search("noise")[0]
+        self.assertEqual(result["snippet"], "Qubits decohere through **noise**.")
+        self.assertEqual(result["conversation_title"], "Quantum roadmap")
+
+    def test_filters(self):
+        self.assertEqual(self.kinds("decoherence", step="stage1_query"), ["audit"])
+        self.assertEqual(len(self.storage.search("decoherence", model="gpt-4o")), 1)
+        self.assertEqual(self.kinds("decohere*", kinds=["audit"]), ["audit", "audit"])
+        self.assertEqual(self.storage.search("decohere", since="2999-01-01"), [])
+        self.assertEqual(len(self.storage.search("decohere", until="2999-01-01")), 2)
+        with self.assertRaises(ValueError):
+            self.storage.search("x", kinds=["bogus"])
+
+    def test_index_follows_changes(self):
+        self.storage.save_prompt({"id": "p1", "title": "Decoherence explainer", "content": "Explain it"})
+        self.storage.save_prompt({"id": "p1", "title": "Entanglement explainer", "content": "Explain it"})
+        self.assertEqual(self.kinds("explainer"), ["prompt"])
+        self.assertEqual(self.kinds("decoherence", kinds=["prompt"]), [])
+
+        self.storage.delete_conversation(self.conv_id)
+        self.assertEqual(self.kinds("decohere*"), [])
+
+    def test_existing_rows_are_backfilled(self):
+        self.storage.close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("DROP TABLE search_index")
+        conn.commit()
+        conn.close()
+        self.storage.init_db()
+        self.assertEqual(self.kinds("decohere"), ["answer", "message"])
+
+    def test_query_syntax_is_literal(self):
+        self.assertEqual(fts_query('qubit* "AND (x'), '"qubit"* """AND" "(x"')
+        self.assertEqual(self.storage.search('NEAR( "unbalanced'), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
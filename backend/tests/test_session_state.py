@@ -0,0 +1,83 @@
+import os
+import sys
+import json
+import sqlite3
+import tempfile
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.storage import Storage
+
+
+def mission_state():
+    return {
+        "mission_name": "M",
+        "blueprint": {"tasks": [{"id": "t1"}, {"id": "t2"}]},
+        "current_task_index": 0,
+        "results": {},
+        "status": "in_progress",
+    }
+
+
+class TestSessionState(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "state.db")
+        self.storage = Storage(self.path)
+        self.addCleanup(self.storage.close)
+        self.conv_id = self.storage.create_conversation()["id"]
+
+    def test_round_trip_keeps_the_shape(self):
+        self.storage.update_session_state(self.conv_id, mission_state())
+        self.assertEqual(self.storage.get_session_state(self.conv_id), mission_state())
+        self.storage.update_session_state(self.conv_id, {"step": 1})
+        self.assertEqual(self.storage.get_session_state(self.conv_id), {"step": 1})
+        self.assertIsNone(self.storage.get_session_state("missing"))
+
+    def test_deltas_touch_only_what_changed(self):
+        self.storage.update_session_state(self.conv_id, mission_state())
+        self.storage.update_session_delta(self.conv_id, tasks={"t1": {"status": "running"}, "t2": {"status": "pending"}})
+        self.storage.update_session_delta(
+            self.conv_id, tasks={"t1": {"result": "answer"}},
+            snapshot={"task_key": "t1", "models": ["m1"], "result": "answer"}
+        )
+        self.storage.update_session_delta(self.conv_id, header={"current_task_index": 1}, tasks={"t1": {"status": "done"}})
+
+        state = self.storage.get_session_state(self.conv_id)
+        self.assertEqual(state["results"], {"t1": "answer"})
+        self.assertEqual(state["task_status"], {"t1": "done", "t2": "pending"})
+        self.assertEqual(state["current_task_index"], 1)
+        self.assertEqual(state["blueprint"], mission_state()["blueprint"])
+
+        self.storage.add_analysis_result(self.conv_id, "looks good")
+        self.assertEqual(self.storage.get_session_state(self.conv_id)["analysis_result"], "looks good")
+
+        snapshots = self.storage.get_session_snapshots(self.conv_id)
+        self.assertEqual([(s["task_key"], s["models"]) for s in snapshots], [("t1", ["m1"])])
+
+    def test_legacy_blobs_are_migrated(self):
+        legacy = {**mission_state(), "results": {"t1": "old"}, "current_task_index": 1}
+        self.storage.close()
+        conn = sqlite3.connect(self.path)
+        conn.execute("UPDATE conversations SET session_state = ? WHERE id = ?", (json.dumps(legacy), self.conv_id))
+        conn.commit()
+        conn.close()
+
+        self.storage.init_db()
+        # No task_status before per-task status existed: the scheduler derives it from current_task_index
+        self.assertEqual(self.storage.get_session_state(self.conv_id), legacy)
+
+    def test_reset_clears_state_and_snapshots(self):
+        self.storage.update_session_state(self.conv_id, mission_state())
+        self.storage.update_session_delta(self.conv_id, snapshot={"task_key": "t1"})
+        self.storage.reset_conversation(self.conv_id)
+        self.assertIsNone(self.storage.get_session_state(self.conv_id))
+        self.assertEqual(self.storage.get_session_snapshots(self.conv_id), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
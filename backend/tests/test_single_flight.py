@@ -0,0 +1,96 @@
+import os
+import sys
+import asyncio
+import unittest
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.single_flight import SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        calls = []
+
+        async def upstream(emit):
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return {"content": "answer"}
+
+        async def scenario():
+            flights = SingleFlight()
+            results = await asyncio.gather(*[flights.do("k", upstream) for _ in range(3)])
+            return flights, results
+
+        flights, results = asyncio.run(scenario())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r["content"] for r in results], ["answer"] * 3)
+        self.assertIsNot(results[0], results[1])
+        self.assertEqual((flights.leaders, flights.coalesced, flights.in_flight()), (1, 2, 0))
+
+    def test_late_joiner_receives_all_deltas(self):
+        async def upstream(emit):
+            emit("a")
+            await asyncio.sleep(0.02)
+            emit("b")
+            return {"content": "ab"}
+
+        async def scenario():
+            flights = SingleFlight()
+            first, second = [], []
+            leader = asyncio.ensure_future(flights.do("k", upstream, on_delta=first.append))
+            await asyncio.sleep(0.01)
+            await flights.do("k", upstream, on_delta=second.append)
+            await leader
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        self.assertEqual(first, ["a", "b"])
+        self.assertEqual(second, ["a", "b"])
+
+    def test_cancelling_one_waiter_keeps_the_call_alive(self):
+        async def upstream(emit):
+            await asyncio.sleep(0.05)
+            return {"content": "answer"}
+
+        async def scenario():
+            flights = SingleFlight()
+            a = asyncio.ensure_future(flights.do("k", upstream))
+            b = asyncio.ensure_future(flights.do("k", upstream))
+            await asyncio.sleep(0.01)
+            a.cancel()
+            result = await b
+            return a.cancelled(), result
+
+        a_cancelled, result = asyncio.run(scenario())
+        self.assertTrue(a_cancelled)
+        self.assertEqual(result["content"], "answer")
+
+    def test_last_waiter_leaving_cancels_upstream(self):
+        cancelled = []
+
+        async def upstream(emit):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def scenario():
+            flights = SingleFlight()
+            a = asyncio.ensure_future(flights.do("k", upstream))
+            b = asyncio.ensure_future(flights.do("k", upstream))
+            await asyncio.sleep(0.01)
+            a.cancel()
+            b.cancel()
+            await asyncio.sleep(0.01)
+            return flights.in_flight()
+
+        self.assertEqual(asyncio.run(scenario()), 0)
+        self.assertEqual(cancelled, [True])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+# Add project root to path
+root_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(root_dir)
+
+from backend.models_service import ModelsService
+from backend.skill_router import SkillIndex, SkillRouter
+from backend.storage import Storage
+
+
+CATALOG = [
+    {"id": "a/vision-model", "name": "Vision Pro", "description": "A multimodal vision model", "pricing": {"prompt": "0.1"}},
+    {"id": "b/coder", "name": "Coder", "description": "Great at coding and reasoning", "pricing": {"prompt": "0"}},
+    {"id": "c/plain", "name": "Plain", "description": "General chat", "pricing": {"prompt": "0.1"}},
+]
+
+
+class TestSkillIndex(unittest.TestCase):
+    def test_scores_text_and_capabilities(self):
+        models = [dict(m, capabilities={"vision": "vision" in m["description"], "thinking": "reasoning" in m["description"]}) for m in CATALOG]
+        index = SkillIndex.from_catalog(models)
+
+        self.assertEqual(index.models_for("coding"), frozenset({"b/coder"}))
+        self.assertEqual(index.score("a/vision-model", ["vision"]), 3)
+        self.assertEqual(index.score("b/coder", ["reasoning"]), 3)
+        self.assertEqual(index.score("c/plain", ["vision", "reasoning"]), 0)
+        self.assertEqual(index.score("unknown/model", ["vision"]), 0)
+
+    def test_builds_from_unified_models_rows(self):
+        rows = [{
+            "base_model_name": "coder",
+            "capabilities": json.dumps({"coding": True, "vision": False}),
+            "technical": json.dumps({"provider_specific": {"openrouter_id": "b/coder"}}),
+            "provider_raw_data": json.dumps({"name": "Coder", "description": "Writes code"}),
+        }, {
+            "base_model_name": "orphan",
+            "capabilities": "{}",
+            "technical": "{}",
+            "provider_raw_data": None,
+        }]
+        index = SkillIndex.from_unified_models(rows)
+
+        self.assertEqual(len(index), 1)
+        self.assertEqual(index.capable("code"), frozenset({"b/coder"}))
+        self.assertEqual(index.score("b/coder", ["coding"]), 2)
+
+
+class TestSkillRouter(unittest.TestCase):
+    def test_index_is_built_off_the_event_loop(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        storage = Storage(os.path.join(tmp.name, "router.db"))
+        self.addCleanup(storage.close)
+        threads = []
+
+        def from_unified_models(rows):
+            threads.append(threading.current_thread())
+            return SkillIndex.from_catalog(CATALOG)
+
+        with patch("backend.storage.storage", storage), \
+             patch.object(SkillIndex, "from_unified_models", from_unified_models):
+            ranked = asyncio.run(SkillRouter().route(["coding"], ["c/plain", "b/coder"]))
+
+        self.assertEqual(ranked, ["b/coder"])
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+class TestModelsServiceCache(unittest.TestCase):
+    def test_catalog_is_cached_and_revalidated_with_etag(self):
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304)
+            return httpx.Response(200, json={"data": [dict(m) for m in CATALOG]}, headers={"ETag": '"v1"'})
+
+        async def scenario():
+            service = ModelsService()
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with patch("backend.http_client.get_http_client", return_value=client), \
+                 patch("backend.config.get_config", return_value={"model_catalog": {"ttl_seconds": 3600}}):
+                first = await service.fetch_model_metadata()
+                second = await service.fetch_model_metadata()
+                service.invalidate()
+                third = await service.fetch_model_metadata()
+            await client.aclose()
+            return first, second, third
+
+        first, second, third = asyncio.run(scenario())
+        self.assertEqual(len(requests), 2)
+        self.assertEqual(requests[1].headers["if-none-match"], '"v1"')
+        self.assertEqual([m["id"] for m in first], [m["id"] for m in third])
+        self.assertEqual(second, first)
+        self.assertTrue(first[1]["free"])
+
+
+if __name__ == "__main__":
+    unittest.main()
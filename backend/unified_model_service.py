@@ -246,7 +246,29 @@ class UnifiedModelService:
             return []
         finally:
             conn.close()
-    
+
+    def get_latency_for_model(self, model_id: str) -> Optional[float]:
+        """Get the known latency (ms) for a council model id, preferring the live measurement."""
+        conn = self.storage.get_db_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT latency_live, latency_ms FROM unified_models
+                WHERE json_extract(technical, '$.provider_specific.openrouter_id') = ?
+                LIMIT 1
+            ''', (model_id,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return row['latency_live'] or row['latency_ms']
+
+        except Exception as e:
+            print(f"Error fetching latency for {model_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
     def search_models(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search models by query string."""
         if not query.strip():
@@ -345,6 +367,10 @@ class UnifiedModelService:
                     saved_count += 1
             
             print(f"Successfully saved {saved_count} models to database")
+
+            # Routing decisions must see the new catalogue
+            from .skill_router import skill_router
+            skill_router.invalidate()
             
             # Update latencies
             await self.update_latencies()
@@ -0,0 +1,98 @@
+"""
+Benchmark: database size and audit read time with inline audit raw_data (the
+previous layout) vs. compressed, content-addressed blobs.
+
+Writes the audit trail of synthetic missions (stage1 answers with reasoning,
+stage2 rankings, stage3 syntheses) inline, measures, migrates with
+backend.migrate_audit_blobs and measures again.
+
+Usage:
+    python benchmarks/bench_audit_blobs.py [--missions 20] [--members 5] [--tasks 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.migrate_audit_blobs import database_bytes, migrate
+from backend.storage import Storage, audit_row
+
+WORDS = "the council weighs each answer for accuracy depth clarity and evidence before ranking".split()
+
+
+def text(words: int) -> str:
+    return " ".join(random.choice(WORDS) for _ in range(words))
+
+
+def mission_rows(conversation_id: str, members: int, tasks: int):
+    rows = []
+    for t in range(tasks):
+        for m in range(members):
+            response = {"content": text(400), "reasoning_details": text(1200), "usage": {"total_tokens": 2400}}
+            rows.append(audit_row(conversation_id, "stage1_query", f"t{t}", f"model-{m}", "answer", response))
+        for m in range(members):
+            ranking = {"content": "Ranking: " + " > ".join(f"Response {chr(65 + i)}" for i in range(members)), "usage": {"total_tokens": 900}}
+            rows.append(audit_row(conversation_id, "stage2_ranking", f"t{t}", f"model-{m}", "ranking", ranking))
+        rows.append(audit_row(conversation_id, "stage3_synthesis", f"t{t}", "chair", "synthesis", {"content": text(600)}))
+    return rows
+
+
+def write_inline(storage: Storage, rows):
+    """The previous layout: JSON straight into audit_logs.raw_data."""
+    conn = storage.get_db_connection()
+    conn.executemany(
+        """INSERT INTO audit_logs (conversation_id, timestamp, task_id, step, model_id, log_message, raw_data, metadata)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        rows
+    )
+    conn.commit()
+    conn.close()
+
+
+def time_reads(storage: Storage, conversation_ids, include_raw: bool) -> float:
+    start = time.perf_counter()
+    for cid in conversation_ids:
+        storage.get_audit_logs(cid, include_raw=include_raw)
+    return time.perf_counter() - start
+
+
+def main(args):
+    random.seed(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "audit.db")
+        storage = Storage(path)
+        conversation_ids = [f"c{i}" for i in range(args.missions)]
+        rows = 0
+        for cid in conversation_ids:
+            mission = mission_rows(cid, args.members, args.tasks)
+            write_inline(storage, mission)
+            rows += len(mission)
+        inline_bytes = database_bytes(storage)
+        inline_read = time_reads(storage, conversation_ids, include_raw=True)
+        storage.close()
+
+        result = migrate(path)
+        storage = Storage(path)
+        blob_read = time_reads(storage, conversation_ids, include_raw=True)
+        list_read = time_reads(storage, conversation_ids, include_raw=False)
+        storage.close()
+
+    print(f"{args.missions} missions x {args.tasks} tasks x {args.members} members = {rows} audit rows")
+    print(f"{'layout':<22}{'db size (MB)':>14}{'read all (s)':>14}")
+    print(f"{'inline raw_data':<22}{inline_bytes / 1e6:>14.2f}{inline_read:>14.3f}")
+    print(f"{'blobs, with payloads':<22}{result['bytes_after'] / 1e6:>14.2f}{blob_read:>14.3f}")
+    print(f"{'blobs, timeline only':<22}{'':>14}{list_read:>14.3f}")
+    print(f"Size reduction: {inline_bytes / result['bytes_after']:.1f}x ({result['rows']} payloads in {result['blobs']} blobs)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--missions", type=int, default=20)
+    parser.add_argument("--members", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=3)
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+"""
+Benchmark: peak Python memory and time of the audit ZIP export, building it
+from fully loaded logs (the previous export) vs. streaming it from a cursor.
+
+Writes one large synthetic mission (see bench_audit_blobs.py), then exports
+it both ways under tracemalloc. The streamed export is measured in each raw
+mode; its peak should stay flat as --tasks grows.
+
+Usage:
+    python benchmarks/bench_audit_export.py [--members 5] [--tasks 40]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import audit_service
+from backend import storage as storage_module
+from backend.storage import Storage
+from bench_audit_blobs import mission_rows
+
+
+def export_loaded(storage: Storage, conversation_id: str, path: str):
+    """The previous export: every log and message in memory, then zipped."""
+    logs = storage.get_audit_logs(conversation_id)
+    messages = storage.get_messages(conversation_id)
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for i, log in enumerate(logs):
+            zipf.writestr(audit_service.log_entry_name(i, log), audit_service.log_entry(log, "pretty"))
+        history = [{"role": m["role"], "content": m["content"], "timestamp": m["created_at"]} for m in messages]
+        zipf.writestr("conversation_history.json", json.dumps(history, indent=2))
+        zipf.writestr("session_state.json", json.dumps(storage.get_session_state(conversation_id), indent=2))
+
+
+def export_streamed(conversation_id: str, path: str, raw: str):
+    with open(path, 'wb') as f:
+        for chunk in audit_service.iter_audit_archive(conversation_id, raw=raw):
+            f.write(chunk)
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "export.db"))
+        storage_module.storage = storage
+        storage.create_conversation("c1")
+        rows = mission_rows("c1", args.members, args.tasks)
+        for row in rows:
+            storage.add_audit_log(row[0], row[3], task_id=row[2], model_id=row[4], log_message=row[5],
+                                  raw_data=json.loads(row[6]))
+        for t in range(args.tasks):
+            storage.add_message("c1", "user", f"task {t}")
+
+        results = [("loaded, pretty", *measure(export_loaded, storage, "c1", os.path.join(tmp, "old.zip")))]
+        for raw in audit_service.RAW_MODES:
+            results.append((f"streamed, {raw}", *measure(export_streamed, "c1", os.path.join(tmp, f"{raw}.zip"), raw)))
+        storage.close()
+
+    print(f"1 mission x {args.tasks} tasks x {args.members} members = {len(rows)} audit rows")
+    print(f"{'export':<20}{'time (s)':>10}{'peak (MB)':>12}")
+    for name, elapsed, peak in results:
+        print(f"{name:<20}{elapsed:>10.3f}{peak / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=40)
+    main(parser.parse_args())
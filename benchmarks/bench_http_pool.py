@@ -0,0 +1,131 @@
+"""
+Benchmark: mission wall-clock with the shared HTTP client vs. a fresh client per call.
+
+Runs a local mock OpenRouter server that charges an artificial handshake cost for
+every NEW connection (standing in for DNS + TCP + TLS) plus a per-request latency,
+then replays the request pattern of a mission (tasks x stages x council members).
+
+Usage:
+    python benchmarks/bench_http_pool.py [--members 6] [--tasks 4] [--handshake-ms 150] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend import http_client, openrouter
+
+MOCK_BODY = json.dumps({
+    "choices": [{"message": {"content": "ok"}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+}).encode()
+
+
+class MockOpenRouter:
+    """Minimal HTTP/1.1 keep-alive server with a simulated connection setup cost."""
+
+    def __init__(self, handshake_ms: float, latency_ms: float):
+        self.handshake = handshake_ms / 1000
+        self.latency = latency_ms / 1000
+        self.connections = 0
+        self.server = None
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        await asyncio.sleep(self.handshake)
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                if length:
+                    await reader.readexactly(length)
+                await asyncio.sleep(self.latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+                    + f"Content-Length: {len(MOCK_BODY)}\r\n\r\n".encode()
+                    + MOCK_BODY
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> str:
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/api/v1/chat/completions"
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+async def per_call_query(url, model, messages):
+    """The previous behaviour: a brand-new client (and connection) for every call."""
+    async with httpx.AsyncClient(timeout=30.0) as client:
+        response = await client.post(url, json={"model": model, "messages": messages})
+        response.raise_for_status()
+        return response.json()
+
+
+async def pooled_query(url, model, messages):
+    return await openrouter.query_model(model, messages, timeout=30.0, max_retries=0, api_key="bench")
+
+
+async def run_mission(query_fn, url, members, tasks):
+    """Each task runs Stage 1 and Stage 2 across all members, then the chairman (Stage 3)."""
+    messages = [{"role": "user", "content": "benchmark"}]
+    models = [f"mock/member-{i}" for i in range(members)]
+    start = time.perf_counter()
+    for _ in range(tasks):
+        for _stage in ("stage1", "stage2"):
+            await asyncio.gather(*[query_fn(url, m, messages) for m in models])
+        await query_fn(url, "mock/chairman", messages)
+    return time.perf_counter() - start
+
+
+async def main(args):
+    server = MockOpenRouter(args.handshake_ms, args.latency_ms)
+    url = await server.start()
+    openrouter.OPENROUTER_API_URL = url
+    calls = args.tasks * (2 * args.members + 1)
+
+    try:
+        server.connections = 0
+        per_call = await run_mission(per_call_query, url, args.members, args.tasks)
+        per_call_conns = server.connections
+
+        await http_client.start_http_client()
+        server.connections = 0
+        pooled = await run_mission(pooled_query, url, args.members, args.tasks)
+        pooled_conns = server.connections
+        await http_client.close_http_client()
+    finally:
+        await server.stop()
+
+    print(f"Mission: {args.tasks} tasks x ({args.members} members x 2 stages + chairman) = {calls} calls")
+    print(f"Simulated handshake {args.handshake_ms:.0f} ms, response latency {args.latency_ms:.0f} ms")
+    print(f"{'mode':<12}{'wall-clock (s)':>16}{'connections':>14}")
+    print(f"{'per-call':<12}{per_call:>16.3f}{per_call_conns:>14}")
+    print(f"{'pooled':<12}{pooled:>16.3f}{pooled_conns:>14}")
+    print(f"Speedup: {per_call / pooled:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=6)
+    parser.add_argument("--tasks", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=150.0)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    asyncio.run(main(parser.parse_args()))
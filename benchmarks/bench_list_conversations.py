@@ -0,0 +1,136 @@
+"""
+Benchmark: loading the conversation list with per-row COUNT(*) subqueries and
+no messages index (the previous query) vs. trigger-maintained counters,
+indexes and keyset pages.
+
+Builds a synthetic database of --conversations conversations with on average
+--messages messages each (user/assistant rounds with stage payloads), then
+times the old full-list query, the new full list, the first sidebar page and
+walking every page. Without an index every COUNT(*) scans all messages, so
+the unindexed old query is timed on --sample conversations and scaled up
+(10k conversations take several minutes otherwise).
+
+Usage:
+    python benchmarks/bench_list_conversations.py [--conversations 10000] [--messages 12] [--page 50] [--sample 200]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.storage import Storage
+
+OLD_LIST_QUERY = '''
+    SELECT c.*,
+           (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id) as message_count,
+           (SELECT COUNT(*) FROM messages WHERE conversation_id = c.id AND role = 'assistant') as revision_count
+    FROM conversations c
+    WHERE archived = 0 {sample}
+    ORDER BY last_modified DESC
+'''
+
+
+def build(storage: Storage, conversations: int, messages: int):
+    random.seed(7)
+    start = datetime(2026, 1, 1)
+    stage = json.dumps([{"model": f"m{i}", "response": "answer " * 100} for i in range(3)])
+    conn = storage.get_db_connection()
+    for c in range(conversations):
+        stamp = (start + timedelta(minutes=random.randrange(500000))).isoformat()
+        conn.execute(
+            "INSERT INTO conversations (id, title, created_at, last_modified, session_state) VALUES (?, ?, ?, ?, ?)",
+            (f"conv-{c:05d}", f"Conversation {c}", stamp, stamp, json.dumps({"tasks": ["t"] * 20}))
+        )
+        rows = []
+        for m in range(random.randint(0, 2 * messages)):
+            assistant = m % 2 == 1
+            rows.append((f"conv-{c:05d}", "assistant" if assistant else "user", "text",
+                         stage if assistant else None, stamp))
+        conn.executemany(
+            "INSERT INTO messages (conversation_id, role, content, stage1, created_at) VALUES (?, ?, ?, ?, ?)",
+            rows
+        )
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def old_list(storage: Storage, conversations: int, sample: int) -> float:
+    conn = storage.get_db_connection()
+    # The previous schema had no index on messages.conversation_id
+    conn.execute("DROP INDEX IF EXISTS idx_messages_conversation")
+    conn.execute("DROP INDEX IF EXISTS idx_conversations_recent")
+    sample = min(sample, conversations)
+    start = time.perf_counter()
+    conn.execute(OLD_LIST_QUERY.format(sample=f"AND rowid <= {sample}")).fetchall()
+    elapsed = (time.perf_counter() - start) * conversations / sample
+    conn.close()
+    storage.init_db()  # recreate the indexes
+    return elapsed
+
+
+def old_list_indexed(storage: Storage) -> float:
+    conn = storage.get_db_connection()
+    start = time.perf_counter()
+    conn.execute(OLD_LIST_QUERY.format(sample="")).fetchall()
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def walk_pages(storage: Storage, page: int) -> int:
+    pages, cursor = 0, None
+    while True:
+        result = storage.list_conversation_page(limit=page, cursor=cursor)
+        pages += 1
+        cursor = result["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "list.db"))
+        build(storage, args.conversations, args.messages)
+        conn = storage.get_db_connection()
+        message_rows = conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        conn.close()
+
+        results = [
+            ("old query, no index *", old_list(storage, args.conversations, args.sample)),
+            ("old query, indexed", timed(lambda: old_list_indexed(storage), repeat=1)),
+            ("list_conversations()", timed(storage.list_conversations)),
+            (f"first page ({args.page})", timed(lambda: storage.list_conversation_page(limit=args.page))),
+            ("walk all pages", timed(lambda: walk_pages(storage, args.page), repeat=1)),
+        ]
+        storage.close()
+
+    print(f"{args.conversations} conversations, {message_rows} messages")
+    print(f"{'query':<26}{'ms':>10}")
+    for name, seconds in results:
+        print(f"{name:<26}{seconds * 1000:>10.1f}")
+    print(f"* timed on {min(args.sample, args.conversations)} conversations and scaled")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--conversations", type=int, default=10000)
+    parser.add_argument("--messages", type=int, default=12)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--sample", type=int, default=200)
+    main(parser.parse_args())
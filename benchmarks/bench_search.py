@@ -0,0 +1,101 @@
+"""
+Benchmark: full-text search latency on a database with --audit audit rows,
+compared with the LIKE '%term%' scan the admin table viewer does.
+
+Builds synthetic missions (audit log messages, user questions and final
+answers drawn from a small vocabulary plus a few rare terms), then times
+/api/search-style queries: a rare term, a common term, a prefix, a
+multi-term query and filtered queries.
+
+Usage:
+    python benchmarks/bench_search.py [--audit 100000] [--repeat 20]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.storage import Storage, audit_row
+
+WORDS = ("model answer ranking council consensus evidence claim source latency token cost review "
+         "chairman plan task strategy synthesis draft revision critique argument").split()
+RARE = ["photosynthesis", "thermodynamics", "cryptography", "metallurgy"]
+STEPS = ["stage0_plan", "stage1_query", "stage2_ranking", "stage3_synthesis", "chairman_decision"]
+MODELS = ["openai/gpt-4o", "anthropic/claude-3.5-sonnet", "google/gemini-pro", "meta-llama/llama-3-70b"]
+
+
+def sentence(n: int) -> str:
+    words = [random.choice(WORDS) for _ in range(n)]
+    if random.random() < 0.01:
+        words[random.randrange(n)] = random.choice(RARE)
+    return " ".join(words)
+
+
+def build(storage: Storage, audit_rows: int):
+    random.seed(7)
+    start = datetime(2026, 1, 1)
+    per_mission = 50
+    for m in range(audit_rows // per_mission):
+        conv_id = storage.create_conversation()["id"]
+        storage.add_user_message(conv_id, sentence(15))
+        storage.add_assistant_message(conv_id, [], [], {"model": random.choice(MODELS), "response": sentence(80)}, {})
+        rows = []
+        for i in range(per_mission):
+            stamp = (start + timedelta(minutes=m * 60 + i)).isoformat()
+            row = audit_row(conv_id, random.choice(STEPS), f"t{i % 3}", random.choice(MODELS), sentence(12))
+            rows.append((row[0], stamp) + row[2:])
+        storage.add_audit_logs(rows)
+
+
+def timed_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def like_scan(storage: Storage, term: str):
+    conn = storage.get_db_connection()
+    conn.execute("SELECT * FROM audit_logs WHERE log_message LIKE ?", (f"%{term}%",)).fetchall()
+    conn.close()
+
+
+def main(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "search.db"))
+        started = time.perf_counter()
+        build(storage, args.audit)
+        print(f"Built {args.audit} audit rows in {time.perf_counter() - started:.1f}s")
+
+        queries = [
+            ("rare term", "photosynthesis", {}),
+            ("common term", "consensus", {}),
+            ("prefix", "cryptog*", {}),
+            ("two terms", "chairman critique", {}),
+            ("step + model filter", "ranking", {"step": "stage2_ranking", "model": "gpt-4o"}),
+            ("date range", "evidence", {"since": "2026-02-01", "until": "2026-02-28"}),
+            ("answers only", "synthesis", {"kinds": ["answer"]}),
+        ]
+        print(f"{'query':<22}{'search ms':>12}{'hits':>8}")
+        for name, query, filters in queries:
+            ms = timed_ms(lambda: storage.search(query, **filters), args.repeat)
+            hits = len(storage.search(query, **filters))
+            print(f"{name:<22}{ms:>12.2f}{hits:>8}")
+        print(f"{'LIKE scan (rare)':<22}{timed_ms(lambda: like_scan(storage, 'photosynthesis'), args.repeat):>12.2f}")
+        storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audit", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
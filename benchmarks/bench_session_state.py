@@ -0,0 +1,111 @@
+"""
+Benchmark: session state writes for one mission, rewriting the whole JSON
+blob on every change (the previous behaviour) vs. header + per-task deltas.
+
+A mission of --tasks tasks runs sequentially; each task causes the writes
+run_full_council makes: status change on launch, result + snapshot on
+completion, status change on completion. Reports payload bytes written and
+wall time.
+
+Usage:
+    python benchmarks/bench_session_state.py [--tasks 10 25 50] [--result-kb 4]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.storage import SESSION_SPLIT_KEYS, Storage
+
+
+def new_mission(tasks: int):
+    blueprint = {"tasks": [
+        {"id": f"t{i}", "label": f"Task {i}", "description": "Investigate and report. " * 20,
+         "depends_on": [f"t{i - 1}"] if i else [], "breakpoint": False}
+        for i in range(tasks)
+    ]}
+    return {"mission_name": "Bench", "blueprint": blueprint, "current_task_index": 0,
+            "results": {}, "status": "in_progress", "task_status": {f"t{i}": "pending" for i in range(tasks)}}
+
+
+def run_blob(storage: Storage, conversation_id: str, tasks: int, result: str) -> int:
+    """Whole-state rewrite per change, as update_session_state did for every save."""
+    state = new_mission(tasks)
+    written = 0
+
+    def save():
+        nonlocal written
+        blob = json.dumps(state)
+        written += len(blob)
+        conn = storage.get_db_connection()
+        conn.execute("UPDATE conversations SET session_state = ? WHERE id = ?", (blob, conversation_id))
+        conn.commit()
+        conn.close()
+
+    save()
+    for i in range(tasks):
+        state["task_status"][f"t{i}"] = "running"
+        save()
+        state["results"][f"t{i}"] = result
+        state["task_status"][f"t{i}"] = "done"
+        state["current_task_index"] = i + 1
+        save()
+    state["status"] = "completed"
+    save()
+    return written
+
+
+def run_delta(storage: Storage, conversation_id: str, tasks: int, result: str) -> int:
+    state = new_mission(tasks)
+    written = len(json.dumps(state))
+    storage.update_session_state(conversation_id, copy.deepcopy(state))
+
+    def header():
+        return {k: v for k, v in state.items() if k not in SESSION_SPLIT_KEYS}
+
+    def delta(tasks=None, snapshot=None, with_header=True):
+        nonlocal written
+        h = header() if with_header else None
+        written += len(json.dumps([h, tasks, snapshot]))
+        storage.update_session_delta(conversation_id, h, tasks, snapshot)
+
+    for i in range(tasks):
+        key = f"t{i}"
+        delta({key: {"status": "running"}})
+        snapshot = {"task_key": key, "task": state["blueprint"]["tasks"][i], "models": ["m1", "m2"], "result": result}
+        delta({key: {"result": result}}, snapshot, with_header=False)
+        state["current_task_index"] = i + 1
+        delta({key: {"status": "done"}})
+    state["status"] = "completed"
+    delta()
+    return written
+
+
+def main(args):
+    result = "word " * (args.result_kb * 1024 // 5)
+    print(f"{'tasks':>6}{'blob KB':>12}{'blob ms':>10}{'delta KB':>12}{'delta ms':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = Storage(os.path.join(tmp, "state.db"))
+        for tasks in args.tasks:
+            timings = []
+            for run in (run_blob, run_delta):
+                conversation_id = storage.create_conversation()["id"]
+                start = time.perf_counter()
+                written = run(storage, conversation_id, tasks, result)
+                timings.append((written / 1024, (time.perf_counter() - start) * 1000))
+            (blob_kb, blob_ms), (delta_kb, delta_ms) = timings
+            print(f"{tasks:>6}{blob_kb:>12.0f}{blob_ms:>10.1f}{delta_kb:>12.0f}{delta_ms:>10.1f}")
+        storage.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, nargs="+", default=[10, 25, 50])
+    parser.add_argument("--result-kb", type=int, default=4)
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+Benchmark: storage operations per second with a fresh rollback-journal connection
+per call (the previous behaviour) vs. pooled WAL-mode connections.
+
+Replays the storage pattern of a mission: audit log inserts, session state
+updates and conversation reads, from one thread and from several threads writing
+concurrently (as parallel conversations do).
+
+Usage:
+    python benchmarks/bench_sqlite_pool.py [--ops 2000] [--threads 4]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.storage import Storage
+
+
+class UnpooledStorage(Storage):
+    """The previous behaviour: sqlite3.connect per call with default pragmas."""
+
+    def get_db_connection(self):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+
+def workload(storage: Storage, conversation_id: str, ops: int):
+    """One op = an audit insert, a session state write or a conversation read, in rotation."""
+    for i in range(ops):
+        kind = i % 3
+        if kind == 0:
+            storage.add_audit_log(conversation_id, "stage1", task_id="t1", model_id="m", log_message="x" * 200, raw_data={"i": i})
+        elif kind == 1:
+            storage.update_session_state(conversation_id, {"current_task_index": i, "task_status": {"t1": "running"}})
+        else:
+            storage.get_conversation(conversation_id)
+
+
+def run(storage_cls, db_path: str, ops: int, threads: int) -> float:
+    storage = storage_cls(db_path)
+    conversation_ids = [storage.create_conversation()["id"] for _ in range(threads)]
+
+    workers = [
+        threading.Thread(target=workload, args=(storage, cid, ops // threads))
+        for cid in conversation_ids
+    ]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+    storage.close()
+    return (ops // threads) * threads / elapsed
+
+
+def main(args):
+    print(f"{args.ops} ops (audit insert / session state write / conversation read)")
+    print(f"{'mode':<12}{'threads':>9}{'ops/sec':>12}")
+    for threads in (1, args.threads):
+        results = {}
+        for name, cls in (("per-call", UnpooledStorage), ("pooled-wal", Storage)):
+            with tempfile.TemporaryDirectory() as tmp:
+                results[name] = run(cls, os.path.join(tmp, "bench.db"), args.ops, threads)
+            print(f"{name:<12}{threads:>9}{results[name]:>12.0f}")
+        print(f"Speedup ({threads} thread{'s' if threads > 1 else ''}): {results['pooled-wal'] / results['per-call']:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=4)
+    main(parser.parse_args())
@@ -7,6 +7,7 @@ const AuditViewer = ({ conversationId, onClose }) => {
   const [analysis, setAnalysis] = useState('');
   const [saving, setSaving] = useState(false);
   const [exporting, setExporting] = useState(false);
+  const [rawPayloads, setRawPayloads] = useState({});
 
   useEffect(() => {
     fetchLogs();
@@ -23,6 +24,17 @@ const AuditViewer = ({ conversationId, onClose }) => {
     }
   };
 
+  // Raw payloads are not part of the timeline response; load one when it is expanded
+  const loadRaw = async (rawHash) => {
+    if (!rawHash || rawPayloads[rawHash]) return;
+    try {
+      const data = await fetch(`/api/audit/blobs/${rawHash}`).then(res => res.json());
+      setRawPayloads(prev => ({ ...prev, [rawHash]: data.raw_data }));
+    } catch (err) {
+      console.error("Failed to fetch raw payload", err);
+    }
+  };
+
   const handleSaveAnalysis = async () => {
     setSaving(true);
     try {
@@ -38,14 +50,15 @@ const AuditViewer = ({ conversationId, onClose }) => {
     setSaving(false);
   };
 
-  const handleExport = async () => {
+  // The browser downloads the streamed ZIP straight to disk; payloads go in exactly as stored
+  const handleExport = () => {
     setExporting(true);
-    try {
-      const res = await fetch(`/api/audit/${conversationId}/export`, { method: 'POST' }).then(res => res.json());
-      alert(`Archive created: ${res.archive_path}`);
-    } catch (err) {
-      alert('Failed to export archive');
-    }
+    const link = document.createElement('a');
+    link.href = `/api/audit/${conversationId}/export?raw=verbatim`;
+    link.download = '';
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
     setExporting(false);
   };
 
@@ -91,11 +104,13 @@ const AuditViewer = ({ conversationId, onClose }) => {
                   <div className="text-sm font-bold text-gray-200 mb-1">{log.log_message}</div>
                   <div className="text-xs text-gray-500 mb-2">Model: {log.model_id?.split('/').pop() || 'N/A'} | Task: {log.task_id || 'N/A'}</div>
                   
-                  {log.raw_data && (
-                    <details className="mt-2">
+                  {(log.raw_data || log.raw_hash) && (
+                    <details className="mt-2" onToggle={(e) => e.target.open && loadRaw(log.raw_hash)}>
                       <summary className="text-xs text-blue-400 cursor-pointer hover:underline">View Raw Response Data</summary>
                       <pre className="mt-2 p-2 bg-black rounded text-[10px] text-green-400 overflow-x-auto max-h-64">
-                        {JSON.stringify(JSON.parse(log.raw_data), null, 2)}
+                        {(log.raw_data || rawPayloads[log.raw_hash])
+                          ? JSON.stringify(JSON.parse(log.raw_data || rawPayloads[log.raw_hash]), null, 2)
+                          : 'Loading...'}
                       </pre>
                     </details>
                   )}
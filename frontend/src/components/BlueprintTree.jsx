@@ -33,6 +33,8 @@ export default function BlueprintTree({ sessionState }) {
 
     const { tasks } = sessionState.blueprint;
     const currentIndex = sessionState.current_task_index || 0;
+    const taskStatus = sessionState.task_status || {};
+    const taskIds = new Set(tasks.map((t) => t.id));
 
     const newNodes = [
       {
@@ -47,11 +49,14 @@ export default function BlueprintTree({ sessionState }) {
     const newEdges = [];
 
     tasks.forEach((task, index) => {
-      const isCompleted = index < currentIndex;
-      const isActive = index === currentIndex;
+      // Per-task status from the DAG scheduler; older sessions only have current_task_index
+      const status = taskStatus[task.id];
+      const isCompleted = status ? status === 'done' : index < currentIndex;
+      const isActive = status ? status === 'running' : index === currentIndex;
+      const isFailed = status === 'failed';
       
       const nodeStyle = {
-        background: isActive ? '#007bff' : (isCompleted ? '#28a745' : '#6c757d'),
+        background: isFailed ? '#dc3545' : (isActive ? '#007bff' : (isCompleted ? '#28a745' : '#6c757d')),
         color: '#fff',
         borderRadius: '8px',
         border: isActive ? '3px solid #ffc107' : 'none',
@@ -76,15 +81,18 @@ export default function BlueprintTree({ sessionState }) {
         style: nodeStyle
       });
 
-      // Connect to previous task or start
-      const sourceId = index === 0 ? 'start' : tasks[index - 1].id;
-      newEdges.push({
-        id: `e-${sourceId}-${task.id}`,
-        source: sourceId,
-        target: task.id,
-        animated: isActive,
-        style: { stroke: isCompleted ? '#28a745' : (isActive ? '#007bff' : '#ccc') },
-        markerEnd: { type: MarkerType.ArrowClosed, color: isCompleted ? '#28a745' : (isActive ? '#007bff' : '#ccc') }
+      // Connect to the tasks it depends on, or to the previous task / start
+      const dependencies = (task.depends_on || []).filter((dep) => taskIds.has(dep));
+      const sourceIds = dependencies.length ? dependencies : [index === 0 ? 'start' : tasks[index - 1].id];
+      sourceIds.forEach((sourceId) => {
+        newEdges.push({
+          id: `e-${sourceId}-${task.id}`,
+          source: sourceId,
+          target: task.id,
+          animated: isActive,
+          style: { stroke: isCompleted ? '#28a745' : (isActive ? '#007bff' : '#ccc') },
+          markerEnd: { type: MarkerType.ArrowClosed, color: isCompleted ? '#28a745' : (isActive ? '#007bff' : '#ccc') }
+        });
       });
     });
 